@@ -0,0 +1,144 @@
+import asyncio
+import os
+import weakref
+
+import httpx
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from api.requests import observe
+from utils import cassette
+
+_max_concurrency = int(os.getenv("ASYNC_MAX_CONCURRENCY") or 64)
+_clients = weakref.WeakKeyDictionary()
+
+
+def configure(max_concurrency):
+    """
+    Меняет лимит одновременных запросов. Действует на клиентов,
+    созданных после вызова.
+    """
+    global _max_concurrency
+    _max_concurrency = max_concurrency
+
+
+def _client():
+    # httpx.AsyncClient и семафор привязаны к циклу событий, поэтому держим их по циклу
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(loop)
+    if entry is None:
+        limits = httpx.Limits(
+            max_connections=_max_concurrency,
+            max_keepalive_connections=int(os.getenv("HTTP_POOL_MAXSIZE") or 32),
+        )
+        entry = (httpx.AsyncClient(limits=limits, timeout=None), asyncio.Semaphore(_max_concurrency))
+        _clients[loop] = entry
+    return entry
+
+
+async def aclose():
+    """Закрывает клиент текущего цикла событий."""
+    entry = _clients.pop(asyncio.get_running_loop(), None)
+    if entry:
+        await entry[0].aclose()
+
+
+def _prepared(request, form_body):
+    """Запрос httpx в виде requests.PreparedRequest: его ждут хуки логирования и кассета."""
+    prepared = requests.PreparedRequest()
+    prepared.method = request.method
+    prepared.url = str(request.url)
+    prepared.headers = CaseInsensitiveDict(request.headers)
+    try:
+        body = request.content or None
+    except httpx.RequestNotRead:
+        body = b"<multipart>"
+    # requests отдаёт формы строкой, а JSON и multipart — байтами
+    if body and form_body:
+        body = body.decode("utf-8", errors="replace")
+    prepared.body = body
+    return prepared
+
+
+def _to_response(raw, form_body):
+    """
+    Превращает ответ httpx в requests.Response, чтобы тесты и хуки логирования
+    работали с ним так же, как с ответами синхронных хелперов.
+    """
+    response = requests.Response()
+    response.status_code = raw.status_code
+    response.reason = raw.reason_phrase
+    response.headers = CaseInsensitiveDict(raw.headers)
+    response.url = str(raw.url)
+    response.encoding = raw.charset_encoding
+    response._content = raw.content
+    response.elapsed = raw.elapsed
+    response.request = _prepared(raw.request, form_body)
+    return response
+
+
+async def _send(method, url, params=None, headers=None, json=None, data=None, files=None):
+    client, semaphore = _client()
+    kwargs = {"params": params, "headers": headers, "json": json, "files": files}
+    if isinstance(data, (str, bytes)):
+        kwargs["content"] = data
+    else:
+        kwargs["data"] = data
+    request = client.build_request(method, url, **kwargs)
+    form_body = data is not None and not files
+    # Кассета (utils/cassette.py) работает и для асинхронных запросов: при
+    # воспроизведении ответ берётся из неё без сети, при записи дописывается в неё
+    recording = cassette.current()
+    if recording is not None and cassette.mode() == "replay":
+        return recording.replay(_prepared(request, form_body), None)
+    async with semaphore:
+        raw = await client.send(request)
+    response = _to_response(raw, form_body)
+    if recording is not None:
+        recording.record(response.request, response)
+    return response
+
+
+async def get(url, params=None, headers=None, data=None):
+    response = await _send("GET", url, params=params, headers=headers, data=data)
+    observe(response)
+    return response
+
+
+async def post(url, json=None, data=None, headers=None, files=None):
+    default_headers = {
+        "accept": "application/json",
+        "Content-Type": "application/json" if json else "application/x-www-form-urlencoded"
+    }
+    if headers:
+        default_headers.update(headers)
+
+    response = await _send(
+        "POST",
+        url,
+        headers=default_headers if not files else headers,
+        json=json,
+        data=data,
+        files=files
+    )
+    observe(response, curl=True)
+    return response
+
+
+async def delete(url, params=None, headers=None):
+    response = await _send("DELETE", url, params=params, headers=headers)
+    observe(response)
+    return response
+
+
+async def patch(url, json, headers=None):
+    default_headers = {
+        "Content-Type": "application/json",
+        "accept": "application/json"
+    }
+    if headers:
+        default_headers.update(headers)
+
+    response = await _send("PATCH", url, headers=default_headers, json=json)
+    observe(response, curl=True)
+    return response
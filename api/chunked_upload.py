@@ -0,0 +1,215 @@
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api import requests
+from utils import resource
+
+# Размер части по умолчанию и каталог манифестов (переопределяется UPLOAD_MANIFEST_DIR)
+CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MANIFEST_DIR = resource.path(".uploads")
+# Ответы, после которых часть стоит отправить ещё раз
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class ChunkUploadError(Exception):
+    """Загрузка не завершена; отправленные части записаны в манифест, повторный upload() продолжит с них."""
+
+
+def manifest_dir():
+    return os.getenv("UPLOAD_MANIFEST_DIR") or DEFAULT_MANIFEST_DIR
+
+
+class Manifest:
+    """
+    Состояние загрузки на диске: файл (путь, размер, mtime, sha256), сессия
+    на сервере и полученные им части. Сохраняется после каждой части
+    через временный файл, поэтому переживает обрыв процесса.
+    """
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_file(cls, file_path, base_url, chunk_size, directory=None):
+        stat = os.stat(file_path)
+        identity = {
+            "file": os.path.abspath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "base_url": base_url,
+            "chunk_size": chunk_size,
+        }
+        key = hashlib.sha256(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:16]
+        path = os.path.join(directory or manifest_dir(), f"{key}.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        # Файл изменился или манифест от другой загрузки — начинаем заново
+        if any(data.get(name) != value for name, value in identity.items()):
+            data = dict(identity, sha256=None, upload_id=None, received=[])
+        return cls(path, data)
+
+    @property
+    def received(self):
+        return set(self.data["received"])
+
+    def update(self, **fields):
+        with self._lock:
+            self.data.update(fields)
+            self._save()
+
+    def mark(self, index):
+        with self._lock:
+            if index not in self.data["received"]:
+                self.data["received"].append(index)
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        partial = f"{self.path}.{threading.get_ident()}.part"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(partial, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def file_sha256(file_path, chunk_size=CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ChunkedUploader:
+    """
+    Загрузка видео частями: POST /translate/upload/session открывает сессию,
+    части по chunk_size уходят PUT-запросами в workers потоков, каждая
+    повторяется до attempts раз с экспоненциальной паузой при сетевой
+    ошибке или временном статусе, POST .../complete собирает файл и
+    возвращает перевод, как /translate/upload/.
+
+    Если загрузка оборвалась, повторный upload() того же файла берёт сессию
+    из манифеста, спрашивает у сервера полученные части и отправляет только
+    недостающие. В памяти одновременно не больше workers частей.
+
+    Эндпоинты загрузки частями есть только в заглушке (standin/).
+    """
+
+    def __init__(self, base_url, access_token, chunk_size=CHUNK_SIZE, workers=4, attempts=5, backoff=0.5,
+                 manifest_dir=None):
+        self.base_url = base_url
+        self.access_token = access_token
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.attempts = attempts
+        self.backoff = backoff
+        self.manifest_dir = manifest_dir
+        self._lock = threading.Lock()
+        self.stats = {"sent": 0, "skipped": 0, "retries": 0, "bytes": 0}
+
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.access_token}", "accept": "application/json"}
+
+    def _session_url(self, upload_id, suffix=""):
+        return f"{self.base_url}/translate/upload/{upload_id}/{suffix}"
+
+    def _open_session(self, manifest, file_path):
+        """upload_id сессии и множество частей, которые сервер уже получил."""
+        upload_id = manifest.data["upload_id"]
+        if upload_id:
+            response = requests.get_request(self._session_url(upload_id), headers=self._headers())
+            if response.status_code == 200:
+                received = response.json()["received"]
+                manifest.update(received=received)
+                return upload_id, set(received)
+            # Сессия истекла или не найдена — открываем новую
+
+        if manifest.data["sha256"] is None:
+            manifest.update(sha256=file_sha256(file_path))
+        response = requests.post_request(
+            f"{self.base_url}/translate/upload/session/",
+            json={
+                "filename": os.path.basename(file_path),
+                "size": manifest.data["size"],
+                "chunk_size": self.chunk_size,
+                "sha256": manifest.data["sha256"],
+            },
+            headers=self._headers()
+        )
+        if response.status_code != 200:
+            raise ChunkUploadError(f"Не удалось открыть сессию загрузки: {response.status_code}, {response.text}")
+        upload_id = response.json()["upload_id"]
+        manifest.update(upload_id=upload_id, received=[])
+        return upload_id, set()
+
+    def _read_chunk(self, file_path, index):
+        with open(file_path, "rb") as f:
+            f.seek(index * self.chunk_size)
+            return f.read(self.chunk_size)
+
+    def _send_chunk(self, file_path, upload_id, index, manifest):
+        """Возвращает None при успехе или причину неудачи после всех попыток."""
+        chunk = self._read_chunk(file_path, index)
+        headers = dict(self._headers(), **{"X-Chunk-Sha256": hashlib.sha256(chunk).hexdigest()})
+        reason = None
+        for attempt in range(self.attempts):
+            if attempt:
+                with self._lock:
+                    self.stats["retries"] += 1
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = requests.put_request(
+                    self._session_url(upload_id, f"chunk/{index}"), data=chunk, headers=headers
+                )
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+                continue
+            if response.status_code == 200:
+                manifest.mark(index)
+                with self._lock:
+                    self.stats["sent"] += 1
+                    self.stats["bytes"] += len(chunk)
+                return None
+            reason = f"{response.status_code}, {response.text[:200]}"
+            if response.status_code not in RETRY_STATUSES:
+                break
+        return reason
+
+    def upload(self, file_path):
+        manifest = Manifest.for_file(file_path, self.base_url, self.chunk_size, self.manifest_dir)
+        upload_id, received = self._open_session(manifest, file_path)
+        chunks = max(1, -(-manifest.data["size"] // self.chunk_size))
+        pending = [index for index in range(chunks) if index not in received]
+        with self._lock:
+            self.stats["skipped"] += chunks - len(pending)
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="chunk") as executor:
+            # Части уходят в контексте вызывающего потока: так трафик и кассета относят их к текущему тесту
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._send_chunk, file_path, upload_id, index, manifest)
+                for index in pending
+            ]
+            reasons = [future.result() for future in futures]
+            failed = {index: reason for index, reason in zip(pending, reasons) if reason is not None}
+        if failed:
+            details = "; ".join(f"часть {index}: {reason}" for index, reason in sorted(failed.items())[:5])
+            raise ChunkUploadError(f"Не отправлено частей: {len(failed)} из {chunks} ({details})")
+
+        response = requests.post_request(self._session_url(upload_id, "complete/"), headers=self._headers())
+        if response.status_code != 200:
+            raise ChunkUploadError(f"Не удалось завершить загрузку: {response.status_code}, {response.text}")
+        manifest.remove()
+        return response.json()
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import time
+
+from api import session
+from api.requests import observe
+from utils.attach import _is_text
+
+# Размер куска при чтении тела ответа
+CHUNK_SIZE = 256 * 1024
+# Текстовые ответы (субтитры, JSON с ошибкой) до этого размера сохраняются целиком для проверок
+TEXT_LIMIT = 1024 * 1024
+# Сколько первых байт нужно для определения формата по сигнатуре
+HEAD_SIZE = 64
+
+# (смещение, сигнатура, MIME-тип)
+SIGNATURES = (
+    (4, b"ftyp", "video/mp4"),
+    (0, b"\x1a\x45\xdf\xa3", "video/webm"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF8", "image/gif"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"\xef\xbb\xbfWEBVTT", "text/vtt"),
+    (0, b"WEBVTT", "text/vtt"),
+)
+
+
+def sniff(head):
+    """MIME-тип по первым байтам содержимого или None, если сигнатура неизвестна."""
+    for offset, signature, mime_type in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return mime_type
+    # RIFF....WEBP
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class Download:
+    """
+    Итог потоковой загрузки: статус, заголовки, размер, sha256 и MIME-тип
+    по сигнатуре. Бинарное тело в памяти не хранится; текстовое (до
+    TEXT_LIMIT) доступно через text и json().
+    """
+
+    def __init__(self, response, size, sha256, mime_type, content):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.size = size
+        self.sha256 = sha256
+        self.mime_type = mime_type
+        self._content = content
+
+    @property
+    def content_type(self):
+        return self.headers.get("Content-Type", "")
+
+    @property
+    def text(self):
+        if self._content is None:
+            return None
+        return self._content.decode(self.response.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def download(url, params=None, headers=None, chunk_size=CHUNK_SIZE, text_limit=TEXT_LIMIT):
+    """
+    GET с потоковым чтением тела: по мере поступления кусков считаются
+    размер и sha256, по первым байтам определяется формат, поэтому
+    память не зависит от размера файла.
+    """
+    started = time.perf_counter()
+    response = session.request("GET", url=url, params=params, headers=headers, stream=True)
+    keep_text = _is_text(response.headers.get("Content-Type"))
+    digest = hashlib.sha256()
+    head = b""
+    kept = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size):
+            digest.update(chunk)
+            size += len(chunk)
+            if len(head) < HEAD_SIZE:
+                head += chunk[:HEAD_SIZE - len(head)]
+            if keep_text:
+                kept.append(chunk)
+                if size > text_limit:
+                    keep_text, kept = False, []
+    finally:
+        response.close()
+
+    content = b"".join(kept) if keep_text else None
+    # Наблюдателям отдаётся только сохранённый текст, размер бинарного тела — через body_size
+    response._content = content if content is not None else b""
+    response.body_size = size
+    timings = getattr(response, "timings", None)
+    if timings is not None:
+        timings["total"] = time.perf_counter() - started
+    observe(response)
+    return Download(response, size, digest.hexdigest(), sniff(head), content)
@@ -0,0 +1,136 @@
+import hashlib
+import io
+import os
+import uuid
+
+from urllib3.fields import RequestField
+
+# Размер куска, которым файл читается при отправке
+CHUNK_SIZE = 256 * 1024
+
+
+class _FilePart:
+    """Содержимое файла: читается кусками с позиции start, длина известна заранее."""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.start = fileobj.tell()
+        try:
+            self.length = os.fstat(fileobj.fileno()).st_size - self.start
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            # BytesIO и подобные: длина по концу потока
+            fileobj.seek(0, io.SEEK_END)
+            self.length = fileobj.tell() - self.start
+            fileobj.seek(self.start)
+
+    def chunks(self, chunk_size):
+        self.fileobj.seek(self.start)
+        left = self.length
+        while left > 0:
+            chunk = self.fileobj.read(min(chunk_size, left))
+            if not chunk:
+                raise IOError(f"Файл {getattr(self.fileobj, 'name', '')} укоротился во время отправки")
+            left -= len(chunk)
+            yield chunk
+
+
+def _unpack(name, value):
+    """(имя файла, содержимое, MIME-тип, заголовки) из значения поля, как их разбирает requests."""
+    if not isinstance(value, tuple):
+        return None, value, None, None
+    if not 2 <= len(value) <= 4:
+        raise ValueError(
+            f"Поле {name}: ожидается (имя файла, содержимое[, MIME-тип[, заголовки]]), получено элементов: {len(value)}"
+        )
+    filename, content, mime_type, headers = value + (None,) * (4 - len(value))
+    return filename, content, mime_type, headers
+
+
+class MultipartEncoder:
+    """
+    Тело multipart/form-data, которое не собирается в памяти целиком:
+    заголовки частей готовятся заранее, а файлы читаются кусками по
+    CHUNK_SIZE прямо во время отправки. Длина известна до отправки,
+    поэтому запрос уходит с Content-Length, а не chunked.
+
+    fields — как files= у requests: {имя: (имя файла, файл или bytes/str)},
+    {имя: (имя файла, содержимое, MIME-тип)}, {имя: (имя файла, содержимое,
+    MIME-тип, заголовки)} или {имя: значение}; значение, кроме bytes, уходит
+    как str(значение). Байты на проводе совпадают с тем, что собрал бы requests.
+    """
+
+    def __init__(self, fields, boundary=None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._parts = []
+        for name, value in fields.items():
+            filename, content, mime_type, headers = _unpack(name, value)
+            field = RequestField(name=name, data=b"", filename=filename, headers=headers)
+            field.make_multipart(content_type=mime_type)
+            self._parts.append(f"--{self.boundary}\r\n".encode() + field.render_headers().encode())
+            if hasattr(content, "read"):
+                self._parts.append(_FilePart(content))
+            elif isinstance(content, (bytes, bytearray)):
+                self._parts.append(bytes(content))
+            else:
+                self._parts.append(str(content).encode())
+            self._parts.append(b"\r\n")
+        self._parts.append(f"--{self.boundary}--\r\n".encode())
+        self._length = sum(part.length if isinstance(part, _FilePart) else len(part) for part in self._parts)
+        self._chunks = None
+        self._pending = b""
+        self._position = 0
+
+    def __len__(self):
+        return self._length
+
+    def _iter_chunks(self, chunk_size=CHUNK_SIZE):
+        for part in self._parts:
+            if isinstance(part, _FilePart):
+                yield from part.chunks(chunk_size)
+            elif part:
+                yield part
+
+    def __iter__(self):
+        return self._iter_chunks()
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # requests перематывает тело при повторной отправке (редирект 307/308)
+        if offset != 0 or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("MultipartEncoder перематывается только в начало")
+        self._chunks = None
+        self._pending = b""
+        self._position = 0
+        return 0
+
+    def read(self, size=-1):
+        """Следующие байты тела; без size — весь остаток (только для небольших тел)."""
+        if self._chunks is None:
+            self._chunks = self._iter_chunks(size if size and size > 0 else CHUNK_SIZE)
+        buffer = [self._pending]
+        available = len(self._pending)
+        while size is None or size < 0 or available < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            buffer.append(chunk)
+            available += len(chunk)
+        data = b"".join(buffer)
+        if size is not None and size >= 0:
+            data, self._pending = data[:size], data[size:]
+        else:
+            self._pending = b""
+        self._position += len(data)
+        return data
+
+    def fingerprint(self):
+        """sha256 тела без boundary — как у собранного в памяти тела (см. utils/cassette.py)."""
+        digest = hashlib.sha256()
+        boundary = self.boundary.encode()
+        # boundary встречается только в заголовках частей, а они отдаются одним куском
+        for chunk in self._iter_chunks():
+            digest.update(chunk.replace(boundary, b""))
+        return digest.hexdigest()
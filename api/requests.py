@@ -1,17 +1,44 @@
-import requests
+from requests.utils import guess_filename
 
-from utils.attach import response_logging, response_attaching, request_attaching
+from api import session
+from api.multipart import MultipartEncoder
+from utils import capture, latency, recorder
+
+
+# Дополнительные наблюдатели ответов, например пул пользователей (utils/user_pool.py)
+_observers = []
+
+
+def add_observer(observer):
+    _observers.append(observer)
+
+
+def remove_observer(observer):
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def observe(response, curl=False):
+    """
+    Передаёт ответ всем наблюдателям вызова: буферу/логу, JSONL-рекордеру,
+    гистограммам задержек и наблюдателям из add_observer.
+    """
+    capture.record(response, curl=curl)
+    recorder.record(response)
+    latency.record(response)
+    for observer in list(_observers):
+        observer(response)
 
 
 def get_request(url, params=None, headers=None, data=None):
-    response = requests.get(
+    response = session.request(
+        "GET",
         url=url,
         params=params,
         headers=headers,
         data=data
     )
-    response_logging(response)
-    response_attaching(response)
+    observe(response)
     return response
 
 
@@ -23,27 +50,35 @@ def post_request(url, json=None, data=None, headers=None, files=None):
     if headers:
         default_headers.update(headers)
 
-    response = requests.post(
+    if files:
+        # Файлы уходят потоком с Content-Length, тело не собирается в памяти целиком
+        # Файл без кортежа requests отправляет с именем из fileobj.name или именем поля
+        files = {
+            name: value if isinstance(value, tuple) else (guess_filename(value) or name, value)
+            for name, value in files.items()
+        }
+        data = MultipartEncoder(dict(data or {}, **files))
+        default_headers = dict(headers or {}, **{"Content-Type": data.content_type})
+
+    response = session.request(
+        "POST",
         url=url,
-        headers=default_headers if not files else headers,
+        headers=default_headers,
         json=json,
-        data=data,
-        files=files
+        data=data
     )
-    request_attaching(response)
-    response_logging(response)
-    response_attaching(response)
+    observe(response, curl=True)
     return response
 
 
 def delete_request(url, params=None, headers=None):
-    response = requests.delete(
+    response = session.request(
+        "DELETE",
         url=url,
         params=params,
         headers=headers
     )
-    response_logging(response)
-    response_attaching(response)
+    observe(response)
     return response
 
 
@@ -58,12 +93,29 @@ def patch_request(url, json, headers=None):
         default_headers.update(headers)
 
     # Выполняем PATCH-запрос
-    response = requests.patch(
+    response = session.request(
+        "PATCH",
         url=url,
         headers=default_headers,
         json=json
     )
-    request_attaching(response)
-    response_logging(response)
-    response_attaching(response)
+    observe(response, curl=True)
+    return response
+
+
+def put_request(url, data=None, headers=None):
+    default_headers = {
+        "Content-Type": "application/octet-stream",
+        "accept": "application/json"
+    }
+    if headers:
+        default_headers.update(headers)
+
+    response = session.request(
+        "PUT",
+        url=url,
+        headers=default_headers,
+        data=data
+    )
+    observe(response)
     return response
@@ -0,0 +1,285 @@
+import os
+import socket
+import threading
+import time
+import urllib.request
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+def _env_proxies():
+    # urllib.request.getproxies() перебирает os.environ целиком. requests с
+    # trust_env делает это на каждом запросе, а pytest в главном потоке в это
+    # время ставит и удаляет PYTEST_CURRENT_TEST: у фоновых потоков (пул
+    # пользователей, очередь удаления) перебор изредка падал с KeyError.
+    # Поэтому окружение читается один раз, при создании движка.
+    return urllib.request.getproxies()
+
+
+class ConnectionStats:
+    """
+    Счётчики HTTP-соединений текущего процесса: сколько TCP-соединений
+    было открыто и сколько запросов ушло по уже открытым (keep-alive).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def connection_opened(self):
+        with self._lock:
+            self.opened += 1
+
+    def request_sent(self):
+        with self._lock:
+            self.requests += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "reused": max(self.requests - self.opened, 0),
+                "requests": self.requests,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.opened = 0
+            self.requests = 0
+
+
+stats = ConnectionStats()
+
+
+# Замеры фаз соединения для текущего запроса потока (см. PooledAdapter.send)
+_timing = threading.local()
+_timings_enabled = False
+
+
+def enable_timings(enabled=True):
+    """
+    Включает раздельный замер DNS и установки соединения. Для этого адрес
+    резолвится отдельно и соединение открывается на первый из адресов.
+    """
+    global _timings_enabled
+    _timings_enabled = enabled
+
+
+class _TimedConnectionMixin:
+    def connect(self):
+        timing = getattr(_timing, "current", None)
+        started = time.perf_counter()
+        super().connect()
+        stats.connection_opened()
+        if timing is not None:
+            # В connect входит и TLS-рукопожатие; время DNS из него вычитается
+            timing["connect"] += time.perf_counter() - started - timing["dns"]
+
+    def _new_conn(self):
+        timing = getattr(_timing, "current", None)
+        if timing is None or not _timings_enabled:
+            return super()._new_conn()
+
+        started = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)[0][4][0]
+        except socket.gaierror:
+            # Ошибку резолва пусть сформулирует urllib3
+            return super()._new_conn()
+        timing["dns"] += time.perf_counter() - started
+
+        dns_host = self._dns_host
+        self._dns_host = address
+        try:
+            return super()._new_conn()
+        finally:
+            self._dns_host = dns_host
+
+
+class _CountingHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CountingHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CountingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountingHTTPSConnection
+
+
+class PooledAdapter(HTTPAdapter):
+    """
+    HTTPAdapter с настраиваемым пулом keep-alive соединений и подсчётом
+    открытых соединений.
+    """
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        stats.request_sent()
+        _timing.current = {"dns": 0.0, "connect": 0.0}
+        try:
+            response = super().send(request, **kwargs)
+        finally:
+            timing, _timing.current = _timing.current, None
+        response.timings = timing
+        return response
+
+
+class ClientEngine:
+    """
+    Общий движок HTTP-клиента: по одному адаптеру с пулом соединений на хост
+    и отдельная requests.Session на каждый поток. Состояние привязано к PID,
+    поэтому воркеры pytest-xdist (и любые fork) получают собственные пулы.
+
+    Параметры по умолчанию берутся из переменных окружения:
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK, HTTP_KEEP_ALIVE.
+
+    wrap_adapter(adapter) -> adapter позволяет подменить транспорт
+    (например, кассетой записи/воспроизведения из utils/cassette.py).
+
+    Прокси (HTTP_PROXY, HTTPS_PROXY, NO_PROXY) и CA-бандл (REQUESTS_CA_BUNDLE,
+    CURL_CA_BUNDLE) читаются из окружения один раз при создании движка,
+    сессии создаются с trust_env = False.
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=None, keep_alive=None,
+                 wrap_adapter=None):
+        self.pool_connections = pool_connections or _env_int("HTTP_POOL_CONNECTIONS", 10)
+        self.pool_maxsize = pool_maxsize or _env_int("HTTP_POOL_MAXSIZE", 32)
+        self.pool_block = _env_bool("HTTP_POOL_BLOCK", False) if pool_block is None else pool_block
+        self.keep_alive = _env_bool("HTTP_KEEP_ALIVE", True) if keep_alive is None else keep_alive
+        self.wrap_adapter = wrap_adapter
+        self.proxies = _env_proxies()
+        self.verify = os.getenv("REQUESTS_CA_BUNDLE") or os.getenv("CURL_CA_BUNDLE") or True
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._adapters = {}
+        self._local = threading.local()
+
+    def _check_pid(self):
+        # После fork пул соединений родителя использовать нельзя
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._adapters = {}
+                    self._local = threading.local()
+                    self._pid = os.getpid()
+                    stats.reset()
+
+    def adapter_for(self, url):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        self._check_pid()
+        with self._lock:
+            adapter = self._adapters.get(host)
+            if adapter is None:
+                adapter = PooledAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    pool_block=self.pool_block,
+                )
+                if self.wrap_adapter is not None:
+                    adapter = self.wrap_adapter(adapter)
+                self._adapters[host] = adapter
+        return host, adapter
+
+    def session_for(self, url):
+        host, adapter = self.adapter_for(url)
+        sessions = getattr(self._local, "sessions", None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        session = sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            # Куки между вызовами не сохраняем: хелперы должны оставаться без состояния
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            # Окружение не перечитываем на каждом запросе, см. _env_proxies
+            session.trust_env = False
+            session.verify = self.verify
+            if not urllib.request.proxy_bypass_environment(urlsplit(host).hostname, self.proxies):
+                session.proxies.update({scheme: proxy for scheme, proxy in self.proxies.items() if scheme != "no"})
+            if not self.keep_alive:
+                session.headers["Connection"] = "close"
+            session.mount(host + "/", adapter)
+            sessions[host] = session
+        return session
+
+    def request(self, method, url, **kwargs):
+        started = time.perf_counter()
+        response = self.session_for(url).request(method=method, url=url, **kwargs)
+        timings = getattr(response, "timings", None)
+        if timings is not None:
+            # elapsed у requests — время до получения заголовков ответа, total — вместе с телом
+            timings["ttfb"] = response.elapsed.total_seconds()
+            timings["total"] = time.perf_counter() - started
+        return response
+
+    def close(self):
+        with self._lock:
+            for adapter in self._adapters.values():
+                adapter.close()
+            self._adapters = {}
+            self._local = threading.local()
+
+
+_engine = ClientEngine()
+
+
+def get_engine():
+    return _engine
+
+
+def configure(**kwargs):
+    """
+    Пересоздаёт общий движок с новыми параметрами пула
+    (pool_connections, pool_maxsize, pool_block, keep_alive, wrap_adapter).
+    """
+    global _engine
+    _engine.close()
+    _engine = ClientEngine(**kwargs)
+    return _engine
+
+
+def request(method, url, **kwargs):
+    return _engine.request(method, url, **kwargs)
+
+
+def close():
+    _engine.close()
+
+
+def connection_stats():
+    return stats.snapshot()
+
+
+def reset_connection_stats():
+    stats.reset()
@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+
+from dotenv import load_dotenv
+
+from load.flows import FLOWS, resolve
+from load.runner import LoadRunner
+from standin.server import StandinServer
+
+
+def _think_time(value):
+    low, _, high = value.partition("-")
+    return float(low), float(high or low)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Нагрузка сценариями из тестов: python -m load --standin get_user tests/x_test.py::test_y"
+    )
+    parser.add_argument("flows", nargs="+", help=f"Имена сценариев ({', '.join(FLOWS)}) или node id тестов")
+    parser.add_argument("--users", type=int, default=10, help="Число виртуальных пользователей")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="За сколько секунд стартуют все пользователи")
+    parser.add_argument("--duration", type=float, default=30.0, help="Длительность нагрузки, с")
+    parser.add_argument("--think-time", type=_think_time, default=(0.5, 1.5), metavar="MIN[-MAX]",
+                        help="Пауза между итерациями, с (по умолчанию 0.5-1.5)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--standin", action="store_true", help="Нагружать локальную заглушку вместо URL из .env")
+    parser.add_argument("--json", metavar="PATH", help="Сохранить отчёт в JSON")
+    args = parser.parse_args()
+
+    load_dotenv()
+    server = None
+    if args.standin:
+        server = StandinServer().start()
+        os.environ.update(server.env)
+    try:
+        runner = LoadRunner(
+            os.getenv("URL"),
+            resolve(args.flows),
+            users=args.users,
+            ramp_up=args.ramp_up,
+            duration=args.duration,
+            think_time=args.think_time,
+            seed=args.seed,
+        )
+        report = runner.run()
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(report.render())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import inspect
+
+from utils import fixtures
+from utils.teardown import TeardownQueue
+from utils.token_cache import admin_token
+from utils.translation_cache import TranslationCache
+from utils.user_pool import UserPool, pool_size
+
+
+class LoadSession:
+    """
+    Общие на весь прогон нагрузки ресурсы — аналог session-фикстур conftest:
+    пул пользователей и кэш переводов. Закрываются в close().
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._user_pool = None
+        self._translation_cache = None
+
+    @property
+    def user_pool(self):
+        if self._user_pool is None:
+            self._user_pool = UserPool(self.base_url, size=pool_size())
+        return self._user_pool
+
+    @property
+    def translation_cache(self):
+        if self._translation_cache is None:
+            self._translation_cache = TranslationCache(self.base_url)
+        return self._translation_cache
+
+    def close(self):
+        if self._translation_cache is not None:
+            self._translation_cache.close()
+        if self._user_pool is not None:
+            self._user_pool.close()
+
+
+class Iteration:
+    """
+    Одна итерация виртуального пользователя. Атрибуты называются так же,
+    как фикстуры conftest, поэтому тестовую функцию можно вызвать
+    с аргументами из итерации (см. call). Тела атрибутов общие с фикстурами
+    (utils/fixtures.py). Всё, что итерация взяла (пользователи, переводы),
+    возвращается или удаляется в close().
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.base_url = session.base_url
+        self._finalizers = []
+        self._teardown_queue = None
+
+    @property
+    def teardown_queue(self):
+        if self._teardown_queue is None:
+            self._teardown_queue = TeardownQueue(self.base_url)
+        return self._teardown_queue
+
+    @property
+    def admin_access_token(self):
+        return admin_token(self.base_url)
+
+    @property
+    def signin_user(self):
+        def _signin_user(email, password):
+            return fixtures.signin_user(self.base_url, email, password)
+
+        return _signin_user
+
+    @property
+    def create_user_with_login(self):
+        pool = self.session.user_pool
+        user = pool.lease()
+        self._finalizers.append(lambda: pool.release(user["id"]))
+        return user
+
+    @property
+    def add_translation(self):
+        def _add_translation(access_token, file_path, mime_type="video/mp4"):
+            return fixtures.add_translation(self.base_url, access_token, file_path, mime_type=mime_type)
+
+        return _add_translation
+
+    @property
+    def lease_translation(self):
+        cache = self.session.translation_cache
+
+        def _lease_translation(access_token, file_path, readonly=False):
+            translation = cache.lease(access_token, file_path, readonly=readonly)
+            if not readonly:
+                self._finalizers.append(
+                    lambda: fixtures.release_translations(cache, self.teardown_queue, [translation["id"]])
+                )
+            return translation
+
+        return _lease_translation
+
+    @property
+    def delete_translation(self):
+        cache = self.session.translation_cache
+
+        def _delete_translation(access_token, translation_id):
+            fixtures.delete_translation(cache, self.teardown_queue, access_token, translation_id)
+
+        return _delete_translation
+
+    @property
+    def delete_user(self):
+        pool = self.session.user_pool
+
+        def _delete_user(user_id, immediately=False):
+            fixtures.delete_user(pool, self.teardown_queue, user_id, immediately=immediately)
+
+        return _delete_user
+
+    def call(self, func):
+        """Вызывает тестовую функцию, подставляя аргументы по именам фикстур."""
+        kwargs = {name: getattr(self, name) for name in inspect.signature(func).parameters}
+        return func(**kwargs)
+
+    def close(self):
+        while self._finalizers:
+            self._finalizers.pop()()
+        if self._teardown_queue is not None:
+            leaks = self._teardown_queue.flush()
+            if leaks:
+                raise Exception(f"Не удалось удалить: {', '.join(str(leak) for leak in leaks)}")
+
+
+SUPPORTED_FIXTURES = {
+    name for name, value in vars(Iteration).items() if isinstance(value, property)
+} | {"base_url"}
+
+
+def unsupported_fixtures(func):
+    """Аргументы тестовой функции, которых нет среди атрибутов Iteration."""
+    return [name for name in inspect.signature(func).parameters if name not in SUPPORTED_FIXTURES]
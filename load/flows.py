@@ -0,0 +1,62 @@
+import importlib
+import os
+
+from load.context import unsupported_fixtures
+
+# Готовые сценарии: имя -> тесты, которые выполняются как итерации виртуального пользователя
+FLOWS = {
+    "signin": [
+        "tests/auth_signin_test.py::test_signin_success",
+    ],
+    "get_translate": [
+        "tests/get_translate_test.py::test_user_sees_only_own_translations",
+        "tests/get_translate_test.py::test_pagination_with_limit",
+        "tests/get_translate_test.py::test_invalid_my_param",
+    ],
+    "get_user": [
+        "tests/get_user_test.py::test_get_users_with_offset_and_limit_as_admin",
+        "tests/get_user_test.py::test_get_users_as_regular_user",
+    ],
+    "get_statistics": [
+        "tests/get_statistics_test.py::test_get_statistics_with_valid_date_range",
+    ],
+    "post_translate_id_price": [
+        "tests/post_translate_id_price_test.py::test_calculate_price_free_plan",
+        "tests/post_translate_id_price_test.py::test_calculate_price_with_invalid_translation_id",
+    ],
+}
+
+
+class Scenario:
+    """Тестовая функция, которую виртуальный пользователь выполняет как одну итерацию."""
+
+    def __init__(self, name, func):
+        self.name = name
+        self.func = func
+
+    def run(self, iteration):
+        return iteration.call(self.func)
+
+
+def load_test(node_id):
+    """Функция теста по node id pytest: tests/get_user_test.py::test_get_users_as_regular_user."""
+    path, sep, name = node_id.partition("::")
+    if not sep or "[" in name:
+        raise ValueError(f"Ожидается node id вида tests/файл.py::test_имя без параметров: {node_id}")
+    module_name = os.path.normpath(path)[:-len(".py")].replace(os.sep, ".")
+    func = getattr(importlib.import_module(module_name), name, None)
+    if func is None:
+        raise ValueError(f"Тест не найден: {node_id}")
+    missing = unsupported_fixtures(func)
+    if missing:
+        raise ValueError(f"{node_id}: фикстуры {', '.join(missing)} нельзя использовать под нагрузкой")
+    return Scenario(node_id, func)
+
+
+def resolve(specs):
+    """Сценарии по списку имён из FLOWS и node id тестов."""
+    scenarios = []
+    for spec in specs:
+        for node_id in FLOWS.get(spec, [spec]):
+            scenarios.append(load_test(node_id))
+    return scenarios
@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+
+from dotenv import load_dotenv
+
+from api import async_requests
+from standin.server import StandinServer
+from utils import latency
+from utils.latency import Histogram
+from utils.token_cache import get_token
+
+
+class TimerWheel:
+    """
+    Хэшированное колесо таймеров на asyncio: slots корзин по tick секунд.
+    Таймер попадает в корзину своего тика; таймеры дальше одного оборота
+    колеса ждут нужное число оборотов (rounds). Постановка и срабатывание
+    — O(1), сколько бы запросов ни было запланировано.
+
+    Колесо просыпается на границе каждого непустого тика, поэтому запрос
+    стартует не раньше запланированного момента и не позже чем через tick.
+    """
+
+    def __init__(self, tick=0.001, slots=1024):
+        self.tick = tick
+        self._slots = [[] for _ in range(slots)]
+        self._pending = 0
+        self._loop = None
+        self._origin = None
+        self._current = 0
+        self._wakeup = None
+
+    def _tick_of(self, when):
+        return max(math.ceil((when - self._origin) / self.tick), self._current)
+
+    def schedule(self, when, callback):
+        """Вызовет callback(when) в момент when по часам цикла событий (loop.time())."""
+        tick = self._tick_of(when)
+        rounds, slot = divmod(tick, len(self._slots))
+        self._slots[slot].append((rounds, when, callback))
+        self._pending += 1
+        if self._wakeup is not None and not self._wakeup.done():
+            self._wakeup.set_result(None)
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._origin = self._loop.time()
+
+    async def run(self):
+        """Крутит колесо, пока есть запланированные таймеры."""
+        while self._pending:
+            now_tick = math.floor((self._loop.time() - self._origin) / self.tick)
+            while self._current <= now_tick:
+                self._fire(self._current)
+                self._current += 1
+            if not self._pending:
+                break
+            # Спим до следующего тика; новая постановка в schedule() будит раньше
+            self._wakeup = self._loop.create_future()
+            delay = self._origin + self._current * self.tick - self._loop.time()
+            try:
+                await asyncio.wait_for(self._wakeup, max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, tick):
+        rounds_now, slot = divmod(tick, len(self._slots))
+        # Колбэк может поставить таймер в этот же тик (интервал короче tick) — разбираем, пока есть
+        while True:
+            entries = self._slots[slot]
+            due = [entry for entry in entries if entry[0] == rounds_now]
+            if not due:
+                return
+            self._slots[slot] = [entry for entry in entries if entry[0] != rounds_now]
+            for _, when, callback in due:
+                self._pending -= 1
+                callback(when)
+
+
+class FlowStats:
+    """
+    Замеры одного сценария. response — время от запланированного старта
+    до ответа (поправка на coordinated omission), service — от фактического
+    старта до ответа, lag — опоздание фактического старта относительно
+    запланированного. Всё в микросекундах.
+    """
+
+    def __init__(self):
+        self.response = Histogram()
+        self.service = Histogram()
+        self.lag = Histogram()
+        self.sent = 0
+        self.errors = {}
+
+    def add(self, intended, actual, finished, error=None):
+        self.sent += 1
+        self.response.add((finished - intended) * 1_000_000)
+        self.service.add((finished - actual) * 1_000_000)
+        self.lag.add((actual - intended) * 1_000_000)
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+
+async def signin(ctx):
+    """POST /auth/signin постоянным пользователем с балансом."""
+    return await async_requests.post(
+        f"{ctx['base_url']}/auth/signin",
+        data={"username": ctx["email"], "password": ctx["password"]}
+    )
+
+
+async def translate_count(ctx):
+    """GET /translate/count/?my=true с закэшированным токеном."""
+    return await async_requests.get(
+        f"{ctx['base_url']}/translate/count/",
+        params={"my": "true"},
+        headers={"Authorization": f"Bearer {ctx['access_token']}", "accept": "application/json"}
+    )
+
+
+FLOWS = {"signin": signin, "translate_count": translate_count}
+
+
+class OpenLoopRunner:
+    """
+    Открытая модель нагрузки: запросы стартуют с заданной частотой rate
+    (в секунду) независимо от того, успел ли ответить сервер, поэтому
+    замедление сервера видно в задержках, а не прячется в снизившейся
+    частоте запросов, как у закрытого цикла из N пользователей.
+
+    arrivals="constant" — равные интервалы 1/rate, "poisson" —
+    экспоненциальные интервалы с тем же средним. Сценарии чередуются
+    по кругу.
+    """
+
+    def __init__(self, flows, rate, duration, ctx, arrivals="constant", tick=0.001, seed=None):
+        if rate <= 0:
+            raise ValueError("rate должен быть больше нуля")
+        self.flows = flows
+        self.rate = rate
+        self.duration = duration
+        self.ctx = ctx
+        self.arrivals = arrivals
+        self.tick = tick
+        self._random = random.Random(seed)
+        self._stats = {name: FlowStats() for name in flows}
+        self._tasks = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _gap(self):
+        if self.arrivals == "poisson":
+            return self._random.expovariate(self.rate)
+        return 1 / self.rate
+
+    async def _call(self, name, intended):
+        loop = asyncio.get_running_loop()
+        actual = loop.time()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        error = None
+        try:
+            response = await self.flows[name](self.ctx)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except Exception as e:
+            error = type(e).__name__
+        finally:
+            self.in_flight -= 1
+        self._stats[name].add(intended, actual, loop.time(), error)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        wheel = TimerWheel(self.tick)
+        wheel.start()
+        names = list(self.flows)
+        end = loop.time() + self.duration
+        counter = iter(range(1 << 62))
+
+        def arrive(when):
+            number = next(counter)
+            task = loop.create_task(self._call(names[number % len(names)], when))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            # Следующий запрос планируется от запланированного, а не фактического момента,
+            # так что опоздание одного старта не сдвигает всё расписание
+            following = when + self._gap()
+            if following < end:
+                wheel.schedule(following, arrive)
+
+        wheel.schedule(loop.time(), arrive)
+        started = loop.time()
+        await wheel.run()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        elapsed = loop.time() - started
+        await async_requests.aclose()
+        return OpenLoopReport(self._stats, elapsed, self.rate, self.peak_in_flight)
+
+
+def _ms(value):
+    # Сценарий без единого замера (низкая частота, короткий прогон) — перцентилей нет
+    return f"{value:>7.1f}мс" if value is not None else f"{'—':>9}"
+
+
+class OpenLoopReport:
+    def __init__(self, stats, elapsed, rate, peak_in_flight):
+        self.elapsed = elapsed
+        self.rate = rate
+        self.peak_in_flight = peak_in_flight
+        self.flows = []
+        for name, flow in stats.items():
+            row = {
+                "flow": name,
+                "sent": flow.sent,
+                "per_second": round(flow.sent / elapsed, 2) if elapsed else 0.0,
+                "errors": sum(flow.errors.values()),
+                "error_kinds": dict(flow.errors),
+            }
+            for kind in ("response", "service", "lag"):
+                histogram = getattr(flow, kind)
+                for p in latency.PERCENTILES:
+                    value = histogram.percentile(p)
+                    row[f"{kind}_p{p}_ms"] = round(value / 1000, 2) if value is not None else None
+                row[f"{kind}_max_ms"] = round(histogram.max / 1000, 2) if histogram.max is not None else None
+            self.flows.append(row)
+
+    def to_dict(self):
+        return {
+            "target_rate": self.rate,
+            "elapsed_s": round(self.elapsed, 3),
+            "peak_in_flight": self.peak_in_flight,
+            "flows": self.flows,
+        }
+
+    def render(self):
+        sent = sum(row["sent"] for row in self.flows)
+        actual = sent / self.elapsed if self.elapsed else 0.0
+        lines = [
+            f"Целевая частота {self.rate}/с, фактическая {actual:.1f}/с за {self.elapsed:.1f} с, "
+            f"одновременно в полёте до {self.peak_in_flight}",
+            "",
+            f"{'Сценарий':<18} {'запр.':>6} {'ошибки':>7}  {'':<12} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}",
+        ]
+        labels = {"response": "с поправкой", "service": "обслуживание", "lag": "опоздание"}
+        for row in self.flows:
+            for number, kind in enumerate(("response", "service", "lag")):
+                head = f"{row['flow']:<18} {row['sent']:>6} {row['errors']:>7}" if number == 0 else " " * 33
+                values = " ".join(_ms(row[f"{kind}_{p}_ms"]) for p in ("p50", "p90", "p99", "max"))
+                lines.append(f"{head}  {labels[kind]:<12} {values}")
+            for kind, count in row["error_kinds"].items():
+                lines.append(f"    {count} × {kind}")
+        return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Открытая модель нагрузки с постоянной частотой запросов")
+    parser.add_argument("flows", nargs="+", choices=list(FLOWS), help="Сценарии, чередуются по кругу")
+    parser.add_argument("--rate", type=float, required=True, help="Запросов в секунду")
+    parser.add_argument("--duration", type=float, default=30.0, help="Длительность, с")
+    parser.add_argument("--arrivals", choices=["constant", "poisson"], default="constant")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--standin", action="store_true", help="Нагружать локальную заглушку вместо URL из .env")
+    parser.add_argument("--json", metavar="PATH", help="Сохранить отчёт в JSON")
+    args = parser.parse_args()
+
+    load_dotenv()
+    server = None
+    if args.standin:
+        server = StandinServer().start()
+        os.environ.update(server.env)
+    try:
+        base_url = os.getenv("URL")
+        email = os.getenv("SOME_BALANCE_USER_EMAIL")
+        password = os.getenv("SOME_BALANCE_USER_PASSWORD")
+        ctx = {
+            "base_url": base_url,
+            "email": email,
+            "password": password,
+            "access_token": get_token(base_url, email, password)["access_token"],
+        }
+        runner = OpenLoopRunner({name: FLOWS[name] for name in args.flows}, args.rate, args.duration, ctx,
+                                arrivals=args.arrivals, seed=args.seed)
+        report = asyncio.run(runner.run())
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(report.render())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
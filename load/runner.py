@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+
+from load.context import Iteration, LoadSession
+from utils import latency
+from utils.latency import Histogram
+
+
+class ScenarioStats:
+    """Итерации одного сценария: длительность (мкс) и ошибки по типам."""
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.iterations = 0
+        self.errors = {}
+
+    def add(self, seconds, error=None):
+        self.duration.add(seconds * 1_000_000)
+        self.iterations += 1
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+
+def _error_kind(e):
+    message = str(e).strip().splitlines()[0] if str(e).strip() else ""
+    return f"{type(e).__name__}: {message[:120]}" if message else type(e).__name__
+
+
+class LoadRunner:
+    """
+    Закрытая модель нагрузки: users виртуальных пользователей в отдельных
+    потоках выполняют сценарии по кругу. Пользователи стартуют равномерно
+    в течение ramp_up секунд, между итерациями ждут think_time секунд
+    (число или диапазон (от, до)), через duration секунд от старта
+    новые итерации не начинаются.
+    """
+
+    def __init__(self, base_url, scenarios, users=10, ramp_up=0.0, duration=30.0, think_time=(0.5, 1.5), seed=None):
+        if not scenarios:
+            raise ValueError("Нужен хотя бы один сценарий")
+        self.base_url = base_url
+        self.scenarios = scenarios
+        self.users = users
+        self.ramp_up = ramp_up
+        self.duration = duration
+        self.think_time = think_time if isinstance(think_time, (tuple, list)) else (think_time, think_time)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {scenario.name: ScenarioStats() for scenario in scenarios}
+        self._active = 0
+        self.peak_users = 0
+
+    def _pause(self, seconds, deadline):
+        time.sleep(max(min(seconds, deadline - time.monotonic()), 0))
+
+    def _user(self, number, session, deadline):
+        self._pause(self.ramp_up * number / self.users, deadline)
+        with self._lock:
+            self._active += 1
+            self.peak_users = max(self.peak_users, self._active)
+            rng = random.Random(self._random.random())
+        try:
+            while time.monotonic() < deadline:
+                scenario = rng.choice(self.scenarios)
+                iteration = Iteration(session)
+                error = None
+                begin = time.perf_counter()
+                try:
+                    scenario.run(iteration)
+                except Exception as e:
+                    error = _error_kind(e)
+                finally:
+                    elapsed = time.perf_counter() - begin
+                    try:
+                        iteration.close()
+                    except Exception as e:
+                        error = error or _error_kind(e)
+                with self._lock:
+                    self._stats[scenario.name].add(elapsed, error)
+                self._pause(rng.uniform(*self.think_time), deadline)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def run(self):
+        """Запускает нагрузку и возвращает LoadReport."""
+        # Свои гистограммы прогона: общие latency.stats процесса (отчёт pytest) не сбрасываются
+        endpoints = latency.LatencyStats()
+        latency.add_collector(endpoints)
+        session = LoadSession(self.base_url)
+        started = time.monotonic()
+        deadline = started + self.duration
+        threads = [
+            threading.Thread(target=self._user, args=(n, session, deadline), name=f"vu-{n}", daemon=True)
+            for n in range(self.users)
+        ]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - started
+            session.close()
+        finally:
+            latency.remove_collector(endpoints)
+        return LoadReport(self._stats, elapsed, self.peak_users, endpoints.summary())
+
+
+class LoadReport:
+    """Итоги прогона: по сценариям (итерации/с, доля ошибок, процентили) и по эндпоинтам."""
+
+    def __init__(self, scenarios, elapsed, peak_users, endpoints):
+        self.elapsed = elapsed
+        self.peak_users = peak_users
+        self.endpoints = endpoints
+        self.scenarios = []
+        for name, stats in scenarios.items():
+            errors = sum(stats.errors.values())
+            row = {
+                "scenario": name,
+                "iterations": stats.iterations,
+                "per_second": round(stats.iterations / elapsed, 2) if elapsed else 0.0,
+                "errors": errors,
+                "error_rate": round(errors / stats.iterations, 4) if stats.iterations else 0.0,
+                "error_kinds": dict(stats.errors),
+            }
+            for p in latency.PERCENTILES:
+                value = stats.duration.percentile(p)
+                row[f"p{p}_ms"] = round(value / 1000, 1) if value is not None else None
+            row["max_ms"] = round(stats.duration.max / 1000, 1) if stats.duration.max is not None else None
+            self.scenarios.append(row)
+
+    @property
+    def iterations(self):
+        return sum(row["iterations"] for row in self.scenarios)
+
+    @property
+    def errors(self):
+        return sum(row["errors"] for row in self.scenarios)
+
+    @property
+    def requests(self):
+        return sum(row["count"] for row in self.endpoints)
+
+    def to_dict(self):
+        return {
+            "elapsed_s": round(self.elapsed, 3),
+            "peak_users": self.peak_users,
+            "iterations": self.iterations,
+            "errors": self.errors,
+            "requests": self.requests,
+            "requests_per_second": round(self.requests / self.elapsed, 2) if self.elapsed else 0.0,
+            "scenarios": self.scenarios,
+            "endpoints": self.endpoints,
+        }
+
+    def render(self):
+        lines = [
+            f"Длительность {self.elapsed:.1f} с, пользователей {self.peak_users}, итераций {self.iterations}, "
+            f"ошибок {self.errors}, запросов {self.requests} ({self.requests / self.elapsed:.1f}/с)",
+            "",
+            f"{'Сценарий':<70} {'итер.':>6} {'итер/с':>7} {'ошибки':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}",
+        ]
+        for row in self.scenarios:
+            lines.append(
+                f"{row['scenario'][-70:]:<70} {row['iterations']:>6} {row['per_second']:>7} "
+                f"{row['error_rate']:>7.1%} {_ms(row['p50_ms'])} {_ms(row['p90_ms'])} {_ms(row['p99_ms'])} {_ms(row['max_ms'])}"
+            )
+            for kind, count in sorted(row["error_kinds"].items(), key=lambda item: -item[1]):
+                lines.append(f"    {count} × {kind}")
+        lines += ["", f"{'Эндпоинт':<50} {'запр.':>6} {'5xx':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}"]
+        for row in self.endpoints:
+            failed = sum(count for status, count in row["statuses"].items() if status.startswith("5"))
+            lines.append(
+                f"{(row['method'] + ' ' + row['path'])[-50:]:<50} {row['count']:>6} {failed / row['count']:>7.1%} "
+                f"{_ms(row['p50_ms'])} {_ms(row['p90_ms'])} {_ms(row['p99_ms'])} {_ms(row['max_ms'])}"
+            )
+        return "\n".join(lines)
+
+
+def _ms(value):
+    return f"{value:>6.1f}мс" if value is not None else f"{'-':>8}"
@@ -0,0 +1,400 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from api import requests
+from api.chunked_upload import ChunkedUploader
+from utils import latency, media, resource
+from utils.latency import Histogram
+from utils.teardown import TeardownQueue
+from utils.token_cache import get_token
+
+# Каталог сохранённых прогонов, как у pytest-benchmark
+DEFAULT_STORAGE = resource.path(".benchmarks/upload")
+# Видео такого битрейта получает длительность под заданный размер
+BITRATE = 2_000_000
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+# single — один multipart POST /translate/upload/, chunked — api/chunked_upload.py (только заглушка)
+MODES = ("single", "chunked")
+
+
+def parse_size(value):
+    """'512K', '16M', '1G' или число байт."""
+    value = value.strip().upper().removesuffix("B")
+    if value and value[-1] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+    return int(value)
+
+
+def format_size(size):
+    for unit in ("G", "M", "K"):
+        if size >= UNITS[unit] and size % UNITS[unit] == 0:
+            return f"{size // UNITS[unit]}{unit}"
+    return str(size)
+
+
+def _rss():
+    """Текущий RSS процесса в байтах (Linux) или None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RssSampler:
+    """Фоновый замер RSS клиента каждые interval секунд; peak — максимум за прогон."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = _rss()
+        if rss is not None:
+            self.peak = max(self.peak or 0, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+class UploadBenchmark:
+    """
+    Загрузки для каждой тройки (способ, размер, параллельность): concurrency
+    потоков загружают по rounds файлов одним multipart-запросом через
+    api/requests.post_request или частями через ChunkedUploader.
+    Перед замером каждой конфигурации делается warmup загрузок (файл в кэше
+    utils/media, соединения в пуле), загруженные переводы удаляются после неё.
+    """
+
+    def __init__(self, base_url, access_token, sizes, concurrency, rounds=3, warmup=1, modes=("single",),
+                 chunk_size=8 * UNITS["M"], chunk_workers=4):
+        self.base_url = base_url
+        self.access_token = access_token
+        self.sizes = sizes
+        self.concurrency = concurrency
+        self.rounds = rounds
+        self.warmup = warmup
+        self.modes = modes
+        self.chunk_size = chunk_size
+        self.chunk_workers = chunk_workers
+        self._lock = threading.Lock()
+
+    def _single(self, file_path):
+        headers = {"Authorization": f"Bearer {self.access_token}", "accept": "application/json"}
+        with open(file_path, "rb") as f:
+            response = requests.post_request(
+                f"{self.base_url}/translate/upload/",
+                headers=headers,
+                files={"upload": (os.path.basename(file_path), f, "video/mp4")}
+            )
+        if response.status_code != 200:
+            raise Exception(f"{response.status_code}, {response.text[:120]}")
+        return response.json()
+
+    def _chunked(self, file_path):
+        # Свой каталог манифестов: параллельные загрузки одного файла не должны продолжать чужую сессию
+        with tempfile.TemporaryDirectory(prefix="upload-bench-") as directory:
+            uploader = ChunkedUploader(self.base_url, self.access_token, chunk_size=self.chunk_size,
+                                       workers=self.chunk_workers, manifest_dir=directory)
+            return uploader.upload(file_path)
+
+    def _upload(self, mode, file_path, uploaded):
+        started = time.perf_counter()
+        try:
+            translation = self._single(file_path) if mode == "single" else self._chunked(file_path)
+        except Exception as e:
+            return time.perf_counter() - started, f"{type(e).__name__}: {str(e)[:120]}"
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            uploaded.append(translation["id"])
+        return elapsed, None
+
+    def _configuration(self, mode, size, concurrency):
+        spec = media.MediaSpec("mp4", duration=max(1.0, size * 8 / BITRATE), size=size)
+        file_path = media.path(spec)
+        uploaded = []
+        for _ in range(self.warmup):
+            self._upload(mode, file_path, uploaded)
+
+        histogram = Histogram()
+        errors = {}
+        total = self.rounds * concurrency
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="upload") as executor:
+            with RssSampler() as rss:
+                rss_before = rss.peak
+                cpu_started = time.process_time()
+                started = time.perf_counter()
+                for seconds, error in executor.map(lambda _: self._upload(mode, file_path, uploaded), range(total)):
+                    histogram.add(seconds * 1_000_000)
+                    if error is not None:
+                        errors[error] = errors.get(error, 0) + 1
+                elapsed = time.perf_counter() - started
+                cpu = time.process_time() - cpu_started
+
+        queue = TeardownQueue(self.base_url)
+        for translation_id in uploaded:
+            queue.add_translation(translation_id, self.access_token)
+        queue.flush()
+
+        failed = sum(errors.values())
+        succeeded = total - failed
+        row = {
+            "mode": mode,
+            "size": size,
+            "concurrency": concurrency,
+            "uploads": total,
+            "errors": failed,
+            "error_kinds": errors,
+            "elapsed_s": round(elapsed, 3),
+            # MB/s и загрузки в секунду — только по успешным загрузкам, ошибки считаются отдельно
+            "mb_per_s": round(succeeded * size / elapsed / UNITS["M"], 2) if elapsed else 0.0,
+            "uploads_per_s": round(succeeded / elapsed, 2) if elapsed else 0.0,
+            "errors_per_s": round(failed / elapsed, 2) if elapsed else 0.0,
+            "cpu_s": round(cpu, 3),
+            "cpu_percent": round(cpu / elapsed * 100, 1) if elapsed else 0.0,
+            "rss_peak_mb": round(rss.peak / UNITS["M"], 1) if rss.peak else None,
+            "rss_growth_mb": round((rss.peak - rss_before) / UNITS["M"], 1) if rss.peak else None,
+        }
+        for p in latency.PERCENTILES:
+            value = histogram.percentile(p)
+            row[f"p{p}_ms"] = round(value / 1000, 2) if value is not None else None
+        row["max_ms"] = round(histogram.max / 1000, 2) if histogram.max is not None else None
+        return row
+
+    def run(self, progress=None):
+        rows = []
+        for size in self.sizes:
+            for concurrency in self.concurrency:
+                for mode in self.modes:
+                    row = self._configuration(mode, size, concurrency)
+                    rows.append(row)
+                    if progress is not None:
+                        progress(row)
+        return rows
+
+
+def _key(row):
+    # Прогоны, сохранённые до появления --modes, — однозапросные
+    return row.get("mode", "single"), row["size"], row["concurrency"]
+
+
+def _change(old, new):
+    if not old or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def _percent(change):
+    return f"{change:+6.1f}%" if change is not None else f"{'—':>7}"
+
+
+def compare(baseline, rows, threshold=None):
+    """
+    Сравнение с сохранённым прогоном: изменение MB/s и p99 по конфигурациям.
+    Возвращает (строки отчёта, список регрессий больше threshold процентов).
+    """
+    previous = {_key(row): row for row in baseline["results"]}
+    lines = [f"Сравнение с {baseline.get('saved_at', '?')} ({baseline.get('commit') or 'без коммита'})"]
+    regressions = []
+    for row in rows:
+        old = previous.get(_key(row))
+        label = f"{row['mode']:<7} {format_size(row['size']):>6} × {row['concurrency']:<3}"
+        if old is None:
+            lines.append(f"  {label} нет в базовом прогоне")
+            continue
+        throughput = _change(old["mb_per_s"], row["mb_per_s"])
+        p99 = _change(old["p99_ms"], row["p99_ms"])
+        lines.append(
+            f"  {label} MB/s {old['mb_per_s']:>8.1f} → {row['mb_per_s']:>8.1f} ({_percent(throughput)})   "
+            f"p99 {old['p99_ms']:>8.1f} → {row['p99_ms']:>8.1f} мс ({_percent(p99)})"
+        )
+        if threshold is not None:
+            if throughput is not None and throughput < -threshold:
+                regressions.append(f"{label.strip()}: MB/s {throughput:+.1f}%")
+            if p99 is not None and p99 > threshold:
+                regressions.append(f"{label.strip()}: p99 {p99:+.1f}%")
+    return lines, regressions
+
+
+def render(rows):
+    lines = [
+        f"{'способ':<7} {'размер':>6} {'парал.':>6} {'загр.':>6} {'ошибки':>6} {'MB/s':>8} {'загр/с':>7} {'ош/с':>7} "
+        f"{'p50':>9} {'p99':>9} {'max':>9} {'CPU':>7} {'RSS':>9} {'прирост':>9}",
+    ]
+    for row in rows:
+        rss = f"{row['rss_peak_mb']:>7.1f}МБ" if row["rss_peak_mb"] is not None else f"{'—':>9}"
+        growth = f"{row['rss_growth_mb']:>7.1f}МБ" if row["rss_growth_mb"] is not None else f"{'—':>9}"
+        lines.append(
+            f"{row['mode']:<7} {format_size(row['size']):>6} {row['concurrency']:>6} {row['uploads']:>6} {row['errors']:>6} "
+            f"{row['mb_per_s']:>8.1f} {row['uploads_per_s']:>7.2f} {row['errors_per_s']:>7.2f} {row['p50_ms']:>7.1f}мс {row['p99_ms']:>7.1f}мс {row['max_ms']:>7.1f}мс "
+            f"{row['cpu_percent']:>6.1f}% {rss} {growth}"
+        )
+        for kind, count in row["error_kinds"].items():
+            lines.append(f"    {count} × {kind}")
+    return "\n".join(lines)
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=resource.path(""),
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def save(rows, storage, target, params):
+    """Сохраняет прогон в storage как NNNN_<время>.json и возвращает путь."""
+    os.makedirs(storage, exist_ok=True)
+    number = len([name for name in os.listdir(storage) if name.endswith(".json")]) + 1
+    saved_at = datetime.now().strftime("%Y%m%d_%H%M%S")
+    data = {
+        "saved_at": saved_at,
+        "commit": _commit(),
+        "target": target,
+        "params": params,
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": rows,
+    }
+    path = os.path.join(storage, f"{number:04d}_{saved_at}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def latest(storage):
+    names = sorted(name for name in os.listdir(storage) if name.endswith(".json")) if os.path.isdir(storage) else []
+    return os.path.join(storage, names[-1]) if names else None
+
+
+def start_standin():
+    """
+    Заглушка в отдельном процессе, чтобы её CPU и память (загруженные
+    файлы она хранит в памяти) не попадали в замеры клиента.
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "standin", "--port", "0"], cwd=resource.path(""),
+        stdout=subprocess.PIPE, text=True
+    )
+    env = {}
+    # URL печатается последним
+    for line in process.stdout:
+        key, _, value = line.rstrip("\n").partition("=")
+        env[key] = value
+        if key == "URL":
+            break
+    else:
+        process.wait()
+        raise RuntimeError(f"Заглушка завершилась с кодом {process.returncode}")
+    return process, env
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Пропускная способность /translate/upload/ по размерам файла и числу параллельных загрузок"
+    )
+    parser.add_argument("--sizes", default="1M,8M,32M", help="Размеры файлов через запятую (K, M, G)")
+    parser.add_argument("--concurrency", default="1,4,8", help="Числа параллельных загрузок через запятую")
+    parser.add_argument("--modes", default="single",
+                        help=f"Способы загрузки через запятую: {', '.join(MODES)} (chunked — только с --standin)")
+    parser.add_argument("--chunk-size", default="8M", help="Размер части для chunked (K, M)")
+    parser.add_argument("--chunk-workers", type=int, default=4, help="Параллельных частей на одну загрузку chunked")
+    parser.add_argument("--rounds", type=int, default=3, help="Загрузок на поток в каждой конфигурации")
+    parser.add_argument("--warmup", type=int, default=1, help="Прогревочных загрузок перед замером")
+    parser.add_argument("--standin", action="store_true", help="Загружать в локальную заглушку вместо URL из .env")
+    parser.add_argument("--json", metavar="PATH", help="Сохранить результаты в JSON")
+    parser.add_argument("--save", action="store_true", help="Сохранить прогон в --storage для сравнения")
+    parser.add_argument("--storage", default=DEFAULT_STORAGE, help="Каталог сохранённых прогонов")
+    parser.add_argument("--compare", nargs="?", const="latest", metavar="PATH",
+                        help="Сравнить с сохранённым прогоном (по умолчанию последним в --storage)")
+    parser.add_argument("--fail-threshold", type=float, metavar="PCT",
+                        help="Код выхода 1, если MB/s упал или p99 вырос больше чем на PCT процентов")
+    args = parser.parse_args()
+
+    sizes = [parse_size(value) for value in args.sizes.split(",")]
+    concurrency = [int(value) for value in args.concurrency.split(",")]
+    modes = [value.strip() for value in args.modes.split(",")]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"Неизвестные способы загрузки: {', '.join(unknown)}")
+
+    baseline = None
+    if args.compare:
+        baseline_path = latest(args.storage) if args.compare == "latest" else args.compare
+        if baseline_path is None:
+            parser.error(f"В {args.storage} нет сохранённых прогонов")
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    load_dotenv()
+    process = None
+    if args.standin:
+        process, env = start_standin()
+        os.environ.update(env)
+    try:
+        base_url = os.getenv("URL")
+        token = get_token(base_url, os.getenv("SOME_BALANCE_USER_EMAIL"), os.getenv("SOME_BALANCE_USER_PASSWORD"))
+        benchmark = UploadBenchmark(base_url, token["access_token"], sizes, concurrency,
+                                    rounds=args.rounds, warmup=args.warmup, modes=modes,
+                                    chunk_size=parse_size(args.chunk_size), chunk_workers=args.chunk_workers)
+        rows = benchmark.run(progress=lambda row: print(
+            f"{row['mode']} {format_size(row['size'])} × {row['concurrency']}: {row['mb_per_s']} MB/s",
+            file=sys.stderr
+        ))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(render(rows))
+    params = {
+        "modes": modes, "sizes": sizes, "concurrency": concurrency, "rounds": args.rounds, "warmup": args.warmup,
+        "chunk_size": parse_size(args.chunk_size), "chunk_workers": args.chunk_workers,
+    }
+    target = "standin" if args.standin else base_url
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"target": target, "params": params, "results": rows}, f, ensure_ascii=False, indent=2)
+    if args.save:
+        print(f"Сохранено: {save(rows, args.storage, target, params)}")
+    if baseline is not None:
+        lines, regressions = compare(baseline, rows, args.fail_threshold)
+        print()
+        print("\n".join(lines))
+        if regressions:
+            print(f"Регрессии больше {args.fail_threshold}%: " + "; ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
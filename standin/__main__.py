@@ -0,0 +1,25 @@
+import argparse
+import time
+
+from standin.server import StandinServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная заглушка VoiceCover API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = StandinServer(host=args.host, port=args.port).start()
+    # Переменные окружения для запуска тестов против заглушки из другого процесса
+    for key, value in server.env.items():
+        print(f"{key}={value}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
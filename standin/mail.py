@@ -0,0 +1,224 @@
+import json
+import logging
+import re
+import secrets
+import socketserver
+import threading
+from email import message_from_bytes
+from email.policy import default
+from email.utils import getaddresses
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from standin.state import isoformat, now
+
+LINK_RE = re.compile(r"https?://[^\s\"'<>]+")
+# Верхняя граница ожидания в одном запросе /wait, чтобы не держать соединение бесконечно
+MAX_WAIT = 60
+
+
+class MailSink:
+    """
+    Локальный приёмник почты вместо Mailsac: SMTP-сервер складывает письма
+    в ящики в памяти, а HTTP-сервер отдаёт их в формате Mailsac API.
+
+    Ожидание писем построено на threading.Condition: wait() просыпается
+    в момент доставки, без опроса через фиксированные паузы.
+    """
+
+    def __init__(self, host="127.0.0.1", smtp_port=0, http_port=0):
+        self._cond = threading.Condition()
+        self._inboxes = {}
+        self._smtp = _SMTPServer((host, smtp_port), _SMTPHandler)
+        self._smtp.sink = self
+        self._http = ThreadingHTTPServer((host, http_port), _APIHandler)
+        self._http.daemon_threads = True
+        self._http.sink = self
+        self.smtp_address = (host, self._smtp.server_address[1])
+        self.url = f"http://{host}:{self._http.server_address[1]}"
+        self._threads = []
+
+    def start(self):
+        for name, server in (("mail-smtp", self._smtp), ("mail-api", self._http)):
+            thread = threading.Thread(target=server.serve_forever, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self._smtp, self._http):
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join()
+        with self._cond:
+            self._cond.notify_all()
+
+    def deliver(self, mail_from, recipients, raw):
+        """Разбирает письмо и кладёт его в ящик каждого получателя."""
+        parsed = message_from_bytes(raw.replace(b"\r\n", b"\n"), policy=default)
+        body = parsed.get_body(preferencelist=("plain", "html"))
+        text = body.get_content() if body is not None else ""
+        message = {
+            "from": [{"address": address, "name": name} for name, address in getaddresses([parsed.get("From", mail_from)])],
+            "to": [{"address": address, "name": name} for name, address in getaddresses([parsed.get("To", "")])],
+            "subject": str(parsed.get("Subject", "")),
+            "received": isoformat(now()) + "Z",
+            "size": len(raw),
+            "links": LINK_RE.findall(text),
+            "text": text,
+        }
+        with self._cond:
+            for recipient in recipients:
+                address = recipient.lower()
+                self._inboxes.setdefault(address, []).append(
+                    dict(message, _id=secrets.token_hex(12), inbox=address, originalInbox=address)
+                )
+            self._cond.notify_all()
+
+    def messages(self, address):
+        """Письма ящика, новые первыми, как в Mailsac."""
+        with self._cond:
+            return list(reversed(self._inboxes.get(address.lower(), [])))
+
+    def message(self, address, message_id):
+        with self._cond:
+            for message in self._inboxes.get(address.lower(), []):
+                if message["_id"] == message_id:
+                    return message
+        return None
+
+    def delete(self, address, message_id=None):
+        with self._cond:
+            inbox = self._inboxes.get(address.lower(), [])
+            inbox[:] = [m for m in inbox if message_id is not None and m["_id"] != message_id]
+
+    def wait(self, address, count=0, timeout=MAX_WAIT):
+        """
+        Блокируется, пока в ящике не станет больше count писем или не истечёт
+        timeout. Возвращает письма ящика, новые первыми.
+        """
+        address = address.lower()
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._inboxes.get(address, [])) > count, timeout)
+            return list(reversed(self._inboxes.get(address, [])))
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP: HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT."""
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self._reply("220 standin SMTP ready")
+        mail_from, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode("utf-8", errors="replace").strip().partition(" ")
+            command = command.upper()
+            if command in ("HELO", "EHLO"):
+                self._reply("250 standin")
+            elif command == "MAIL":
+                mail_from, recipients = _address(argument), []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                recipients.append(_address(argument))
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                self.server.sink.deliver(mail_from, recipients, self._read_data())
+                mail_from, recipients = None, []
+                self._reply("250 OK")
+            elif command == "RSET":
+                mail_from, recipients = None, []
+                self._reply("250 OK")
+            elif command == "NOOP":
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+    def _read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            # Снимаем точку, удвоенную отправителем (RFC 5321, 4.5.2)
+            lines.append(line[1:] if line.startswith(b"..") else line)
+        return b"".join(lines)
+
+
+def _address(argument):
+    return argument.split(":", 1)[-1].strip().strip("<>").split(" ")[0]
+
+
+class _APIHandler(BaseHTTPRequestHandler):
+    """
+    Подмножество Mailsac REST API:
+
+    GET    /api/addresses/{email}/messages
+    GET    /api/addresses/{email}/messages/{id}
+    DELETE /api/addresses/{email}/messages/{id}
+    GET    /api/text/{email}/{id}
+    GET    /api/addresses/{email}/wait?count=N&timeout=S  — ожидание (нет в Mailsac)
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело уходят отдельными write; без TCP_NODELAY второй ждёт delayed ACK (~40 мс)
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        logging.debug("mail-api: " + format, *args)
+
+    def _send(self, status, payload, content_type="application/json"):
+        if content_type == "application/json":
+            payload = json.dumps(payload, ensure_ascii=False)
+        body = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        split = urlsplit(self.path)
+        parts = [unquote(part) for part in split.path.strip("/").split("/")]
+        return parts, dict(parse_qsl(split.query))
+
+    def do_GET(self):
+        sink = self.server.sink
+        parts, query = self._route()
+        if parts[:2] == ["api", "addresses"] and len(parts) == 4 and parts[3] == "messages":
+            return self._send(200, sink.messages(parts[2]))
+        if parts[:2] == ["api", "addresses"] and len(parts) == 4 and parts[3] == "wait":
+            timeout = min(float(query.get("timeout") or MAX_WAIT), MAX_WAIT)
+            return self._send(200, sink.wait(parts[2], int(query.get("count") or 0), timeout))
+        if parts[:2] == ["api", "addresses"] and len(parts) == 5 and parts[3] == "messages":
+            message = sink.message(parts[2], parts[4])
+            if message is None:
+                return self._send(404, {"message": "Message not found"})
+            return self._send(200, message)
+        if parts[:2] == ["api", "text"] and len(parts) == 4:
+            message = sink.message(parts[2], parts[3])
+            if message is None:
+                return self._send(404, {"message": "Message not found"})
+            return self._send(200, message["text"], content_type="text/plain")
+        self._send(404, {"message": "Not found"})
+
+    def do_DELETE(self):
+        parts, _ = self._route()
+        if parts[:2] == ["api", "addresses"] and len(parts) == 5 and parts[3] == "messages":
+            self.server.sink.delete(parts[2], parts[4])
+            return self._send(200, {"message": "Message was deleted."})
+        self._send(404, {"message": "Not found"})
@@ -0,0 +1,997 @@
+import hashlib
+import json
+import logging
+import re
+import secrets
+import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from email import message_from_bytes
+from email.message import EmailMessage
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from utils import resource
+from standin.mail import MailSink
+from standin.state import (
+    ACTIVATE_LINK, FILE_TYPES, LANGUAGES, PAYMENT_LINK, PREVIEW_PNG, ROLES, SETTINGS_DEFAULTS,
+    UPLOAD_CHUNK_DEFAULT, UPLOAD_CHUNK_MAX, UPLOAD_CHUNK_MIN, VOICE_GENDERS, ApiError, State,
+    public_translation, public_upload, public_user, seed, sniff_video
+)
+
+ERRORS_URL = "https://errors.pydantic.dev/2.1/v/"
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+BOOL_VALUES = {"true": True, "1": True, "yes": True, "on": True, "false": False, "0": False, "no": False, "off": False}
+
+
+def error(type_, loc, msg, input_, **ctx):
+    """Элемент detail в формате ошибок валидации FastAPI/pydantic."""
+    item = {"type": type_, "loc": list(loc), "msg": msg, "input": input_}
+    if ctx:
+        item["ctx"] = ctx
+    else:
+        item["url"] = ERRORS_URL + type_
+    return item
+
+
+class FileResponse:
+    def __init__(self, content, content_type):
+        self.content = content.encode("utf-8") if isinstance(content, str) else content
+        self.content_type = content_type
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        split = urlsplit(target)
+        self.method = method
+        self.path = split.path.rstrip("/") or "/"
+        self.query = dict(parse_qsl(split.query, keep_blank_values=True))
+        self.headers = headers
+        self.body = body
+        self.errors = []
+        self.params = {}
+
+    @property
+    def content_type(self):
+        return (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+
+    def bearer(self):
+        scheme, _, token = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        return token.strip()
+
+    # --- валидация: ошибки копятся и отдаются одним ответом 422, как в FastAPI ---
+
+    def _int(self, value, loc):
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, int):
+            return value
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            self.errors.append(error(
+                "int_parsing", loc,
+                "Input should be a valid integer, unable to parse string as an integer", value
+            ))
+            return None
+
+    def _bool(self, value, loc):
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in BOOL_VALUES:
+            return BOOL_VALUES[value.lower()]
+        if value in (0, 1):
+            return bool(value)
+        self.errors.append(error("bool_parsing", loc, "Input should be a valid boolean, unable to interpret input", value))
+        return None
+
+    def path_int(self, name):
+        return self._int(self.params[name], ["path", name])
+
+    def query_int(self, name, default=None):
+        if name not in self.query:
+            return default
+        return self._int(self.query[name], ["query", name])
+
+    def query_bool(self, name, default=None):
+        if name not in self.query:
+            return default
+        return self._bool(self.query[name], ["query", name])
+
+    def query_date(self, name):
+        value = self.query.get(name)
+        if value is None:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            self.errors.append(error(
+                "date_from_datetime_parsing", ["query", name],
+                "Input should be a valid date or datetime, invalid date separator", value
+            ))
+            return None
+
+    def json(self):
+        """Тело запроса как JSON; для не-JSON тела — строка."""
+        if not self.body:
+            return None
+        if self.content_type != "application/json":
+            return self.body.decode("utf-8", errors="replace")
+        try:
+            return json.loads(self.body)
+        except ValueError as e:
+            self.errors.append(error("json_invalid", ["body", 0], "JSON decode error", {}, error=str(e)))
+            return None
+
+    def body_dict(self):
+        data = self.json()
+        if data is None and not self.errors:
+            self.errors.append(error("missing", ["body"], "Field required", None))
+            return {}
+        if not isinstance(data, dict):
+            if not self.errors:
+                self.errors.append(error(
+                    "model_attributes_type", ["body"],
+                    "Input should be a valid dictionary or object to extract fields from", data
+                ))
+            return {}
+        return data
+
+    def form(self):
+        if self.content_type == "multipart/form-data":
+            return {name: value for name, (value, _, _) in self.multipart().items()}
+        return dict(parse_qsl(self.body.decode("utf-8", errors="replace"), keep_blank_values=True))
+
+    def multipart(self):
+        """Поля multipart-формы: имя -> (содержимое, имя файла, Content-Type)."""
+        head = f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode()
+        boundary = message_from_bytes(head, policy=HTTP).get_param("boundary")
+        fields = {}
+        if not boundary:
+            return fields
+        # Тело режется по разделителю напрямую: разбор видео в сотни мегабайт
+        # через email-парсер занимал больше времени, чем сама передача
+        body = self.body
+        delimiter = b"--" + boundary.encode()
+        start = body.find(delimiter)
+        while start >= 0 and body[start + len(delimiter):start + len(delimiter) + 2] != b"--":
+            start += len(delimiter)
+            end = body.find(b"\r\n" + delimiter, start)
+            head_end = body.find(b"\r\n\r\n", start)
+            if end < 0 or head_end < 0 or head_end > end:
+                break
+            part = message_from_bytes(body[start:head_end].lstrip(b"\r\n") + b"\r\n\r\n", policy=HTTP)
+            name = part.get_param("name", header="content-disposition")
+            if name:
+                fields[name] = (body[head_end + 4:end], part.get_filename(), part.get_content_type())
+            start = end + 2
+        return fields
+
+    def form_field(self, form, name):
+        # Пустые поля формы FastAPI считает отсутствующими
+        value = form.get(name)
+        if not value:
+            self.errors.append(error("missing", ["body", name], "Field required", None))
+            return None
+        return value
+
+    def string(self, data, name, min_length=None, max_length=None, required=True):
+        value = data.get(name)
+        loc = ["body", name]
+        if value is None:
+            if required:
+                self.errors.append(error("missing", loc, "Field required", data))
+            return None
+        if not isinstance(value, str):
+            self.errors.append(error("string_type", loc, "Input should be a valid string", value))
+            return None
+        if min_length is not None and len(value) < min_length:
+            self.errors.append(error(
+                "string_too_short", loc, f"String should have at least {min_length} characters", value
+            ))
+            return None
+        if max_length is not None and len(value) > max_length:
+            self.errors.append(error(
+                "string_too_long", loc, f"String should have at most {max_length} characters", value
+            ))
+            return None
+        return value
+
+    def email(self, data, name="email", required=True):
+        value = self.string(data, name, required=required)
+        if value is not None and not EMAIL_RE.match(value):
+            reason = "The email address is not valid. It must have exactly one @-sign."
+            self.errors.append(error(
+                "value_error", ["body", name], f"value is not a valid email address: {reason}", value, reason=reason
+            ))
+            return None
+        return value
+
+    def boolean(self, data, name):
+        if data.get(name) is None:
+            return None
+        return self._bool(data[name], ["body", name])
+
+    def integer(self, data, name):
+        if data.get(name) is None:
+            return None
+        return self._int(data[name], ["body", name])
+
+    def number(self, data, name, gt=None, required=True):
+        value = data.get(name)
+        loc = ["body", name]
+        if value is None:
+            if required:
+                self.errors.append(error("missing", loc, "Field required", data))
+            return None
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            self.errors.append(error("float_parsing", loc, "Input should be a valid number, unable to parse string as a number", value))
+            return None
+        if gt is not None and value <= gt:
+            self.errors.append(error("greater_than", loc, f"Input should be greater than {gt}", data[name], gt=gt))
+            return None
+        return value
+
+    def enum(self, data, name, choices, msg=None, type_="enum"):
+        value = data.get(name)
+        if value is None or value in choices:
+            return value
+        expected = " or ".join(f"'{choice}'" for choice in choices)
+        self.errors.append(error(type_, ["body", name], msg or f"Input should be {expected}", value))
+        return None
+
+    def validate(self):
+        if self.errors:
+            raise ApiError(422, self.errors)
+
+
+class App:
+    """
+    Маршрутизация и обработчики эндпоинтов. Маршрут задаётся шаблоном пути
+    с параметрами в фигурных скобках и уровнем доступа: None, "user" или "admin".
+    """
+
+    def __init__(self, state, base_url=""):
+        self.state = state
+        self.base_url = base_url
+        self.routes = []
+        self._register()
+
+    def route(self, method, template, handler, auth="user"):
+        pattern = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", template.rstrip("/") or "/")
+        self.routes.append((method, re.compile(f"^{pattern}$"), handler, auth))
+
+    def _register(self):
+        route = self.route
+        route("GET", "/healthcheck", self.healthcheck, auth=None)
+        route("GET", "/maintenance", self.get_maintenance, auth=None)
+        route("POST", "/maintenance", self.set_maintenance, auth="admin")
+
+        route("POST", "/auth/signup", self.signup, auth=None)
+        route("GET", "/auth/activate", self.activate, auth=None)
+        route("POST", "/auth/signin", self.signin, auth=None)
+        route("POST", "/auth/reset_password", self.reset_password, auth=None)
+        route("POST", "/auth/update_token", self.update_token, auth=None)
+
+        # Литеральные пути /user/* должны идти раньше /user/{id}
+        route("GET", "/user/me", self.get_me)
+        route("PATCH", "/user/me", self.patch_me)
+        route("GET", "/user/count", self.count_users, auth="admin")
+        route("GET", "/user/transactions", self.my_transactions)
+        route("GET", "/user/transactions/count", self.count_my_transactions)
+        route("GET", "/user/transactions/{id}", self.my_transaction)
+        route("POST", "/user/create_payment", self.create_payment)
+        route("GET", "/user", self.list_users, auth="admin")
+        route("POST", "/user", self.create_user, auth="admin")
+        route("GET", "/user/{id}", self.get_user, auth="admin")
+        route("PATCH", "/user/{id}", self.patch_user, auth="admin")
+        route("DELETE", "/user/{id}", self.delete_user, auth="admin")
+
+        route("POST", "/transaction", self.create_transaction)
+        route("GET", "/transaction/{id}", self.get_transaction)
+
+        route("GET", "/statistic", self.statistic, auth="admin")
+
+        route("GET", "/translate", self.list_translations)
+        route("GET", "/translate/count", self.count_translations)
+        route("POST", "/translate/upload", self.upload)
+        # Загрузка частями (только в заглушке): сессия, части, состояние, сборка
+        route("POST", "/translate/upload/session", self.create_upload)
+        route("GET", "/translate/upload/{upload_id}", self.get_upload)
+        route("PUT", "/translate/upload/{upload_id}/chunk/{index}", self.put_chunk)
+        route("POST", "/translate/upload/{upload_id}/complete", self.complete_upload)
+        route("GET", "/translate/{id}", self.get_translation)
+        route("DELETE", "/translate/{id}", self.delete_translation)
+        route("POST", "/translate/{id}/copy", self.copy_translation)
+        route("POST", "/translate/{id}/feedback", self.feedback)
+        route("POST", "/translate/{id}/setting", self.setting)
+        route("POST", "/translate/{id}/price", self.price)
+        route("GET", "/translate/{id}/status", self.status)
+        route("GET", "/translate/{id}/rusub", self.get_rusub)
+        route("POST", "/translate/{id}/rusub", self.post_rusub)
+        route("GET", "/translate/{id}/download/{type}", self.download)
+
+    def dispatch(self, request):
+        allowed = False
+        for method, pattern, handler, auth in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            request.params = match.groupdict()
+            user = self.authenticate(request, auth)
+            with self.state.lock:
+                return handler(request, user)
+        if allowed:
+            raise ApiError(405, "Method Not Allowed")
+        raise ApiError(404, "Not Found")
+
+    def authenticate(self, request, auth):
+        if auth is None:
+            return None
+        token = request.bearer()
+        if token is None:
+            raise ApiError(401, "Not authenticated")
+        user = self.state.user_for_token(token)
+        if user is None:
+            raise ApiError(401, "Could not validate credentials")
+        if auth == "admin" and user["role"] != "admin":
+            raise ApiError(403, "Permission denied")
+        return user
+
+    # --- служебные ---
+
+    def healthcheck(self, request, user):
+        return {"healthchek": True}
+
+    def get_maintenance(self, request, user):
+        return {"maintenance": self.state.maintenance}
+
+    def set_maintenance(self, request, user):
+        data = request.body_dict()
+        value = request.boolean(data, "maintenance")
+        request.validate()
+        self.state.maintenance = bool(value)
+        return {"maintenance": self.state.maintenance}
+
+    # --- авторизация ---
+
+    def signup(self, request, user):
+        data = request.body_dict()
+        email = request.email(data)
+        password = request.string(data, "password", min_length=6, max_length=20)
+        request.validate()
+
+        state = self.state
+        existing = state.find_user(email)
+        if existing is not None and existing["is_active"]:
+            raise ApiError(400, "User with this email exist")
+        if existing is None:
+            existing = state.add_user(email, password, is_active=False, utm=data.get("utm"))
+        else:
+            existing.update(password=password, utm=data.get("utm"))
+
+        code = secrets.token_hex(16)
+        state.activate_codes[code] = existing["id"]
+        link = f"{ACTIVATE_LINK}{code}"
+        state.send_mail(
+            email, "Активация аккаунта на Voicecover",
+            f"Для активации аккаунта перейдите по ссылке: {link}"
+        )
+        return {"success": True}
+
+    def activate(self, request, user):
+        if "activate_code" not in request.query:
+            request.errors.append(error("missing", ["query", "activate_code"], "Field required", None))
+        request.validate()
+        user_id = self.state.activate_codes.pop(request.query["activate_code"], None)
+        if user_id is None or user_id not in self.state.users:
+            raise ApiError(400, "Incorrect activate code")
+        self.state.users[user_id]["is_active"] = True
+        return {"success": True}
+
+    def signin(self, request, user):
+        form = request.form() if request.content_type != "application/json" else {}
+        username = request.form_field(form, "username")
+        password = request.form_field(form, "password")
+        request.validate()
+
+        found = self.state.find_user(username)
+        if found is None:
+            raise ApiError(404, "User not found")
+        if found["password"] != password:
+            raise ApiError(403, "Invalid credentials")
+        if not found["is_active"]:
+            raise ApiError(403, "User is not active")
+        return self.state.issue_tokens(found)
+
+    def reset_password(self, request, user):
+        # Email передаётся «сырым» телом запроса, а не полем формы или JSON
+        value = request.json()
+        if value is None:
+            request.errors.append(error("missing", ["body"], "Field required", None))
+        elif not isinstance(value, str):
+            request.errors.append(error("string_type", ["body"], "Input should be a valid string", value))
+        else:
+            request.email({"email": value})
+            for item in request.errors:
+                item["loc"] = ["body"]
+        request.validate()
+
+        found = self.state.find_user(value)
+        if found is None:
+            raise ApiError(404, "User not found")
+        password = secrets.token_urlsafe(9)
+        found["password"] = password
+        self.state.send_mail(value, "Сброс пароля на Voicecover", f"Новый пароль: {password}")
+        return {"success": True}
+
+    def update_token(self, request, user):
+        token = request.bearer()
+        if token is None:
+            raise ApiError(401, "Not authenticated")
+        found = self.state.user_for_token(token)
+        if found is None:
+            raise ApiError(401, "Could not validate credentials")
+        return self.state.issue_tokens(found)
+
+    # --- пользователи ---
+
+    def get_me(self, request, user):
+        return public_user(user)
+
+    def patch_me(self, request, user):
+        data = request.body_dict()
+        for name in ("lastname", "firstname", "avatar", "phone", "telegram"):
+            if name in data and data[name] is not None:
+                request.string(data, name)
+        request.validate()
+        for name in ("lastname", "firstname", "avatar", "phone", "telegram"):
+            if name in data:
+                user[name] = data[name]
+        return public_user(user)
+
+    def count_users(self, request, user):
+        return len(self.state.users)
+
+    def list_users(self, request, user):
+        offset = request.query_int("offset", 0)
+        limit = request.query_int("limit", 100)
+        request.validate()
+        users = sorted(self.state.users.values(), key=lambda u: u["id"])
+        return [public_user(u) for u in users[offset:offset + limit]]
+
+    def create_user(self, request, user):
+        data = request.body_dict()
+        email = request.email(data)
+        password = request.string(data, "password", min_length=6)
+        is_active = request.boolean(data, "is_active")
+        role = request.enum(data, "role", ROLES)
+        balance = request.number(data, "balance", required=False)
+        for name in ("lastname", "firstname"):
+            request.string(data, name, required=False)
+        if data.get("is_active") is None:
+            request.errors.append(error("missing", ["body", "is_active"], "Field required", data))
+        request.validate()
+
+        fields = {name: data.get(name) for name in ("lastname", "firstname", "avatar", "phone", "telegram")}
+        created = self.state.add_user(
+            email, password, role=role or "user", is_active=is_active, balance=balance or 0, **fields
+        )
+        return public_user(created)
+
+    def _user(self, request):
+        user_id = request.path_int("id")
+        request.validate()
+        found = self.state.users.get(user_id)
+        if found is None:
+            raise ApiError(404, "User not found")
+        return found
+
+    def get_user(self, request, user):
+        return public_user(self._user(request))
+
+    def patch_user(self, request, user):
+        user_id = request.path_int("id")
+        data = request.body_dict()
+        if "email" in data:
+            request.email(data)
+        if "password" in data:
+            request.string(data, "password", min_length=6)
+        request.enum(data, "role", ROLES)
+        request.boolean(data, "is_active")
+        if "balance" in data and data["balance"] is not None:
+            request.number(data, "balance")
+        request.validate()
+
+        found = self.state.users.get(user_id)
+        if found is None:
+            raise ApiError(404, "User not found")
+        for name in ("lastname", "firstname", "avatar", "email", "role", "phone", "telegram", "password", "utm"):
+            if name in data:
+                found[name] = data[name]
+        if "is_active" in data and data["is_active"] is not None:
+            found["is_active"] = request._bool(data["is_active"], ["body", "is_active"])
+        if "balance" in data and data["balance"] is not None:
+            found["balance"] = float(data["balance"])
+        return public_user(found)
+
+    def delete_user(self, request, user):
+        found = self._user(request)
+        del self.state.users[found["id"]]
+        for token, (user_id, _) in list(self.state.tokens.items()):
+            if user_id == found["id"]:
+                del self.state.tokens[token]
+        return {"success": True}
+
+    # --- транзакции и платежи ---
+
+    def _own_transactions(self, user):
+        return sorted(
+            (t for t in self.state.transactions.values() if t["user_id"] == user["id"]),
+            key=lambda t: t["id"], reverse=True
+        )
+
+    def my_transactions(self, request, user):
+        offset = request.query_int("offset", 0)
+        limit = request.query_int("limit", 100)
+        request.validate()
+        return self._own_transactions(user)[offset:offset + limit]
+
+    def count_my_transactions(self, request, user):
+        return len(self._own_transactions(user))
+
+    def my_transaction(self, request, user):
+        transaction_id = request.path_int("id")
+        request.validate()
+        transaction = self.state.transactions.get(transaction_id)
+        if transaction is None or transaction["user_id"] != user["id"]:
+            raise ApiError(404, "Transaction not found")
+        return transaction
+
+    def create_payment(self, request, user):
+        data = request.body_dict()
+        amount = request.number(data, "amount", gt=0)
+        if data.get("code") is not None:
+            request.string(data, "code")
+        request.validate()
+        payment_id = secrets.token_hex(12)
+        self.state.payments[payment_id] = {"user_id": user["id"], "amount": amount, "code": data.get("code")}
+        return {"id": payment_id, "url": f"{PAYMENT_LINK}{payment_id}"}
+
+    def create_transaction(self, request, user):
+        data = request.body_dict()
+        user_id = request.integer(data, "user_id")
+        amount = request.number(data, "amount")
+        type_transaction = request.enum(data, "type_transaction", ["credit", "debit"])
+        if data.get("user_id") is None:
+            request.errors.append(error("missing", ["body", "user_id"], "Field required", data))
+        if type_transaction is None and not any(e["loc"] == ["body", "type_transaction"] for e in request.errors):
+            request.errors.append(error("missing", ["body", "type_transaction"], "Field required", data))
+        request.validate()
+
+        target = self.state.users.get(user_id)
+        if target is None:
+            raise ApiError(404, "User not found")
+        if user["role"] != "admin" and target["id"] != user["id"]:
+            raise ApiError(403, "Permission denied")
+        return self.state.add_transaction(target, amount, type_transaction)
+
+    def get_transaction(self, request, user):
+        transaction_id = request.path_int("id")
+        request.validate()
+        transaction = self.state.transactions.get(transaction_id)
+        if transaction is None:
+            raise ApiError(404, "Transaction not found")
+        if user["role"] != "admin" and transaction["user_id"] != user["id"]:
+            raise ApiError(403, "Permission denied")
+        return transaction
+
+    def statistic(self, request, user):
+        start_date = request.query_date("start_date")
+        end_date = request.query_date("end_date")
+        if start_date and end_date and start_date > end_date:
+            request.errors.append(error(
+                "value_error", ["query", "start_date", "end_date"],
+                "Value error, start_date must be before end_date", {"start_date": str(start_date), "end_date": str(end_date)}
+            ))
+        request.validate()
+
+        def in_range(created_at):
+            day = date.fromisoformat(created_at[:10])
+            return (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+
+        state = self.state
+        translations = [t for t in state.translations.values() if t["transaction"]]
+        transactions = list(state.transactions.values())
+
+        def summary(items):
+            return {"count": len(items), "amount": -sum(t["transaction"]["amount"] for t in items)}
+
+        def income(items):
+            return {
+                "yoomoney": sum(t["amount"] for t in items if t["type_transaction"] == "debit" and t["amount"] > 0),
+                "admin": sum(t["amount"] for t in items if t["type_transaction"] == "credit" and t["amount"] > 0),
+            }
+
+        return {
+            "users": sum(1 for u in state.users.values() if in_range(u["created_at"])),
+            "users_total": len(state.users),
+            "translates": summary([t for t in translations if in_range(t["created_at"])]),
+            "translates_total": summary(translations),
+            "transactions": sum(1 for t in transactions if in_range(t["created_at"])),
+            "transactions_total": len(transactions),
+            "income": income([t for t in transactions if in_range(t["created_at"])]),
+            "income_total": income(transactions),
+        }
+
+    # --- переводы ---
+
+    def _visible(self, user):
+        return [
+            t for t in self.state.translations.values()
+            if not t["deleted"] and t["owner_id"] == user["id"]
+        ]
+
+    def _translation(self, request, user, detail="Not found", forbidden=None):
+        """
+        Перевод по id из пути. Чужой перевод для обычного пользователя считается
+        несуществующим, если не задан отдельный ответ forbidden.
+        """
+        translation_id = request.path_int("id")
+        request.validate()
+        translation = self.state.translations.get(translation_id)
+        if translation is None or translation["deleted"]:
+            raise ApiError(404, detail)
+        if user["role"] != "admin" and translation["owner_id"] != user["id"]:
+            raise ApiError(*(forbidden or (404, detail)))
+        return translation
+
+    def _public(self, translation):
+        return public_translation(self.state, translation, self.base_url)
+
+    def list_translations(self, request, user):
+        request.query_bool("my", True)
+        offset = request.query_int("offset", 0)
+        limit = request.query_int("limit", 100)
+        request.validate()
+        translations = sorted(self._visible(user), key=lambda t: t["id"], reverse=True)
+        return [self._public(t) for t in translations[offset:offset + limit]]
+
+    def count_translations(self, request, user):
+        request.query_bool("my", True)
+        request.validate()
+        return len(self._visible(user))
+
+    def upload(self, request, user):
+        field = request.multipart().get("upload") if request.content_type == "multipart/form-data" else None
+        if field is None:
+            request.errors.append(error("missing", ["body", "upload"], "Field required", None))
+        request.validate()
+
+        content, filename, _ = field
+        sniffed = sniff_video(content)
+        if sniffed is None:
+            raise ApiError(400, "Invalid file type")
+        content_type, length = sniffed
+        video = self.state.add_video(content, content_type, length, filename)
+        return self._public(self.state.add_translation(user, video))
+
+    def create_upload(self, request, user):
+        data = request.body_dict()
+        filename = request.string(data, "filename", min_length=1)
+        size = request.integer(data, "size")
+        chunk_size = request.integer(data, "chunk_size")
+        sha256 = request.string(data, "sha256", min_length=64, max_length=64, required=False)
+        if data.get("size") is None:
+            request.errors.append(error("missing", ["body", "size"], "Field required", data))
+        elif size is not None and size <= 0:
+            request.errors.append(error("greater_than", ["body", "size"], "Input should be greater than 0", size, gt=0))
+        if chunk_size is not None and not UPLOAD_CHUNK_MIN <= chunk_size <= UPLOAD_CHUNK_MAX:
+            request.errors.append(error(
+                "value_error", ["body", "chunk_size"],
+                f"Value error, chunk_size should be between {UPLOAD_CHUNK_MIN} and {UPLOAD_CHUNK_MAX}", chunk_size
+            ))
+        request.validate()
+
+        upload = self.state.add_upload(user, filename, size, chunk_size or UPLOAD_CHUNK_DEFAULT, sha256)
+        return public_upload(upload)
+
+    def _upload_session(self, request, user):
+        upload = self.state.uploads.get(request.params["upload_id"])
+        if upload is None or (user["role"] != "admin" and upload["owner_id"] != user["id"]):
+            raise ApiError(404, "Upload not found")
+        return upload
+
+    def get_upload(self, request, user):
+        return public_upload(self._upload_session(request, user))
+
+    def put_chunk(self, request, user):
+        index = request.path_int("index")
+        request.validate()
+        upload = self._upload_session(request, user)
+        if not 0 <= index < upload["chunks"]:
+            raise ApiError(400, f"Chunk index out of range 0..{upload['chunks'] - 1}")
+        if self.state.chunk_faults.get(index):
+            self.state.chunk_faults[index] -= 1
+            raise ApiError(503, "Service Unavailable")
+
+        expected = min(upload["chunk_size"], upload["size"] - index * upload["chunk_size"])
+        if len(request.body) != expected:
+            raise ApiError(400, f"Invalid chunk size: expected {expected}, got {len(request.body)}")
+        checksum = request.headers.get("X-Chunk-Sha256")
+        if checksum and checksum.lower() != hashlib.sha256(request.body).hexdigest():
+            raise ApiError(400, "Chunk checksum mismatch")
+        # Повторная отправка части перезаписывает её: клиент может повторять запрос без опаски
+        upload["parts"][index] = request.body
+        return {"index": index, "received": len(upload["parts"]), "chunks": upload["chunks"]}
+
+    def complete_upload(self, request, user):
+        upload = self._upload_session(request, user)
+        missing = [index for index in range(upload["chunks"]) if index not in upload["parts"]]
+        if missing:
+            raise ApiError(409, f"Missing chunks: {missing[:20]}")
+
+        content = b"".join(upload["parts"][index] for index in range(upload["chunks"]))
+        if upload["sha256"] and hashlib.sha256(content).hexdigest() != upload["sha256"].lower():
+            raise ApiError(400, "Checksum mismatch")
+        sniffed = sniff_video(content)
+        if sniffed is None:
+            raise ApiError(400, "Invalid file type")
+        del self.state.uploads[upload["id"]]
+        content_type, length = sniffed
+        video = self.state.add_video(content, content_type, length, upload["name"])
+        return self._public(self.state.add_translation(user, video))
+
+    def get_translation(self, request, user):
+        return self._public(self._translation(request, user))
+
+    def delete_translation(self, request, user):
+        translation_id = request.path_int("id")
+        request.validate()
+        translation = self.state.translations.get(translation_id)
+        if translation is None:
+            raise ApiError(404, "Not found")
+        if user["role"] != "admin" and translation["owner_id"] != user["id"]:
+            raise ApiError(404, "Not found")
+        # Удаление мягкое: повторный DELETE тоже успешен
+        translation["deleted"] = True
+        return {"success": True}
+
+    def copy_translation(self, request, user):
+        original = self._translation(request, user)
+        fields = {key: original[key] for key in SETTINGS_DEFAULTS}
+        fields.update(sub_origin=original["sub_origin"], sub_translate=original["sub_translate"])
+        owner = self.state.users[original["owner_id"]]
+        copy = self.state.add_translation(owner, self.state.videos[original["video_id"]], **fields)
+        return self._public(copy)
+
+    def feedback(self, request, user):
+        translation_id = request.path_int("id")
+        value = request.json()
+        if value is None and not request.errors:
+            request.errors.append(error("missing", ["body"], "Field required", None))
+        elif value is not None:
+            score = request._int(value, ["body"])
+            if score is not None and not 0 <= score <= 100:
+                type_, msg, limit = (
+                    ("greater_than_equal", "Input should be greater than or equal to 0", {"ge": 0}) if score < 0
+                    else ("less_than_equal", "Input should be less than or equal to 100", {"le": 100})
+                )
+                request.errors.append(error(type_, ["body"], msg, value, **limit))
+        request.validate()
+        request.params["id"] = translation_id
+        translation = self._translation(request, user)
+        translation["feedback"] = score
+        return self._public(translation)
+
+    def _settings(self, request):
+        data = request.body_dict()
+        request.enum(data, "language", LANGUAGES)
+        for name, default in SETTINGS_DEFAULTS.items():
+            if isinstance(default, bool):
+                request.boolean(data, name)
+        request.enum(
+            data, "voice_gender", VOICE_GENDERS, msg="Input should be a valid voice gender", type_="type_error.enum"
+        )
+        request.integer(data, "voice_count")
+        request.validate()
+
+        settings = dict(SETTINGS_DEFAULTS)
+        for name, default in SETTINGS_DEFAULTS.items():
+            value = data.get(name)
+            if value is None:
+                continue
+            if isinstance(default, bool):
+                value = request._bool(value, ["body", name])
+            elif name == "voice_count":
+                value = int(value)
+            settings[name] = value
+        return settings
+
+    def setting(self, request, user):
+        translation_id = request.path_int("id")
+        settings = self._settings(request)
+        request.params["id"] = translation_id
+        translation = self._translation(request, user)
+
+        owner = self.state.users[translation["owner_id"]]
+        price = self.state.price(translation, settings)
+        if price > owner["balance"]:
+            raise ApiError(400, "Not enough money")
+        if price:
+            translation["transaction"] = self.state.add_transaction(owner, -price, "credit")
+        translation.update(settings)
+        translation["status"] = "Обработка видео"
+        translation["current_task"] = "Обработка видео"
+        return self._public(translation)
+
+    def price(self, request, user):
+        translation_id = request.path_int("id")
+        settings = self._settings(request)
+        request.params["id"] = translation_id
+        translation = self._translation(request, user)
+        price = self.state.price(translation, settings)
+        owner = self.state.users[translation["owner_id"]]
+        return {"need_money": price > owner["balance"], "price": f"{price:.2f}"}
+
+    def status(self, request, user):
+        translation = self._translation(request, user)
+        return {"status": translation["status"]}
+
+    def get_rusub(self, request, user):
+        translation = self._translation(request, user, "Subtitle not found", forbidden=(403, "Permission denied"))
+        if not translation["sub_translate"]:
+            raise ApiError(404, "Subtitle not found")
+        return {"id": translation["id"], "vtt": translation["sub_translate"]}
+
+    def post_rusub(self, request, user):
+        translation_id = request.path_int("id")
+        data = request.body_dict()
+        request.integer(data, "id")
+        if data.get("id") is None:
+            request.errors.append(error("missing", ["body", "id"], "Field required", data))
+        vtt = request.string(data, "vtt")
+        request.validate()
+        request.params["id"] = translation_id
+        translation = self._translation(request, user, "Translation not found", forbidden=(403, "Permission denied"))
+        translation["sub_translate"] = vtt
+        if not translation["sub_origin"]:
+            translation["sub_origin"] = vtt
+        return self._public(translation)
+
+    def download(self, request, user):
+        file_type = request.params["type"]
+        if file_type not in FILE_TYPES:
+            expected = ", ".join(f"'{t}'" for t in FILE_TYPES)
+            request.errors.append(error("enum", ["path", "type"], f"Input should be {expected}", file_type))
+        translation = self._translation(request, user, "Translate not found")
+
+        video = self.state.videos[translation["video_id"]]
+        if file_type == "video_origin":
+            return FileResponse(video["content"], video["content_type"])
+        if file_type == "preview":
+            return FileResponse(PREVIEW_PNG, "image/png")
+        content = translation[file_type]
+        if not content:
+            raise ApiError(404, "File not found")
+        if file_type == "video_translate":
+            return FileResponse(content, video["content_type"])
+        return FileResponse(content, "text/vtt; charset=utf-8")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело уходят отдельными write; без TCP_NODELAY второй ждёт delayed ACK (~40 мс)
+    disable_nagle_algorithm = True
+    app = None
+
+    def log_message(self, format, *args):
+        logging.debug("standin: " + format, *args)
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        request = Request(self.command, self.path, self.headers, body)
+        try:
+            status, result = 200, self.app.dispatch(request)
+        except ApiError as e:
+            status, result = e.status, {"detail": e.detail}
+        except Exception as e:
+            logging.exception("standin: ошибка обработки %s %s", self.command, self.path)
+            status, result = 500, {"detail": f"Internal Server Error: {e}"}
+
+        if isinstance(result, FileResponse):
+            payload, content_type = result.content, result.content_type
+        else:
+            payload, content_type = json.dumps(result, ensure_ascii=False).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = do_PUT = _handle
+
+
+DEFAULT_ACCOUNTS = {
+    "ADMIN_EMAIL": "admin@standin.local",
+    "ADMIN_PASSWORD": "AdminPassword1!",
+    "EMPTY_BALANCE_USER_EMAIL": "empty@standin.local",
+    "EMPTY_BALANCE_USER_PASSWORD": "EmptyPassword1!",
+    "SOME_BALANCE_USER_EMAIL": "rich@standin.local",
+    "SOME_BALANCE_USER_PASSWORD": "RichPassword1!",
+}
+
+
+class StandinServer:
+    """
+    Локальная заглушка VoiceCover API в отдельном потоке.
+
+    Письма отправляются по SMTP в фоне, как у настоящего сервиса: по умолчанию
+    в собственный MailSink, чей Mailsac-совместимый API попадает в env
+    как MAILSAC_URL. smtp=(host, port) направляет почту во внешний приёмник.
+
+    Использование:
+        server = StandinServer().start()
+        os.environ.update(server.env)
+        ...
+        server.stop()
+    """
+
+    def __init__(self, accounts=None, video_path=None, host="127.0.0.1", port=0, smtp=None):
+        accounts = dict(DEFAULT_ACCOUNTS, **(accounts or {}))
+        video_path = video_path or resource.path("data/man_talking.mp4")
+
+        self.state = State()
+        self.httpd = ThreadingHTTPServer((host, port), type("StandinHandler", (Handler,), {}))
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self.httpd.RequestHandlerClass.app = App(self.state, self.url)
+        self.env = dict(seed(self.state, accounts, video_path), URL=self.url)
+
+        self.mail_sink = None
+        if smtp is None:
+            self.mail_sink = MailSink(host)
+            smtp = self.mail_sink.smtp_address
+            self.env["MAILSAC_URL"] = self.mail_sink.url
+        self.smtp = smtp
+        self._mail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="standin-mail")
+        self.state.mailer = lambda mail: self._mail_executor.submit(self._send_mail, mail)
+        self._thread = None
+
+    def _send_mail(self, mail):
+        message = EmailMessage()
+        message["From"] = "noreply@voicecover.ru"
+        message["To"] = mail["to"]
+        message["Subject"] = mail["subject"]
+        message.set_content(mail["text"])
+        try:
+            with smtplib.SMTP(*self.smtp) as client:
+                client.send_message(message)
+        except Exception:
+            logging.exception("standin: не удалось отправить письмо %s", mail["to"])
+
+    def start(self):
+        if self.mail_sink is not None:
+            self.mail_sink.start()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        self._mail_executor.shutdown(wait=True)
+        if self.mail_sink is not None:
+            self.mail_sink.stop()
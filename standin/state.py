@@ -0,0 +1,404 @@
+import secrets
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+ACCESS_TTL = 30 * 60
+REFRESH_TTL = 7 * 24 * 60 * 60
+
+ACTIVATE_LINK = "https://voicecover.ru/auth/activate?activate_code="
+PAYMENT_LINK = "https://yoomoney.ru/checkout/payments/v2/contract?orderId="
+
+LANGUAGES = ["en", "ru", "de", "es", "fr", "it", "pt", "zh", "ja", "ko"]
+VOICE_GENDERS = ["f-af-1", "f-af-2", "m-am-1", "m-am-2"]
+ROLES = ["user", "admin"]
+FILE_TYPES = ["video_origin", "video_translate", "sub_origin", "sub_translate", "preview"]
+
+# Цена опций за начатую минуту видео; бесплатный тариф — с логотипом и без платных опций
+OPTION_PRICES = {
+    "notification": 5,
+    "lipsync": 100,
+    "subtitle_on_video": 10,
+    "subtitle_edit": 10,
+}
+NO_LOGO_PRICE = 30
+VOICE_GENDER_PRICE = 20
+
+# Загрузка частями: допустимый размер части и размер по умолчанию
+UPLOAD_CHUNK_MIN = 64 * 1024
+UPLOAD_CHUNK_MAX = 64 * 1024 * 1024
+UPLOAD_CHUNK_DEFAULT = 8 * 1024 * 1024
+
+SETTINGS_DEFAULTS = {
+    "language": None,
+    "save_origin_voice": False,
+    "has_logo": False,
+    "notification": False,
+    "voice_clone": False,
+    "lipsync": False,
+    "subtitle_download": False,
+    "subtitle_on_video": False,
+    "subtitle_edit": False,
+    "voice_gender": None,
+    "voice_count": 0,
+}
+
+SUB_ORIGIN = """WEBVTT
+
+00:00:00.360 --> 00:00:01.879
+Знаешь, почему у тебя мало друзей?
+
+00:00:01.879 --> 00:00:02.940
+Потому что ты особен.
+
+00:00:03.240 --> 00:00:04.320
+Ты умный и вдумчивый.
+
+00:00:04.440 --> 00:00:06.820
+А людям это не нравится, потому что они поверхностные.
+
+00:00:06.980 --> 00:00:08.599
+Да? Хуйна.
+
+00:00:08.599 --> 00:00:13.580
+Если захотелось сказать «да», то у тебя, скорее всего, проблемы с нарциссизмом и с коммуникативными навыками.
+
+00:00:13.640 --> 00:00:15.339
+Развивай их, а не самолюбуйся.
+"""
+
+SUB_TRANSLATE = """WEBVTT
+
+00:00:00.360 --> 00:00:01.879
+Do you know why you have few friends?
+
+00:00:01.879 --> 00:00:02.940
+Because you're unique.
+
+00:00:03.240 --> 00:00:04.320
+You're smart and thoughtful.
+
+00:00:04.440 --> 00:00:06.820
+And people don't like it because they're superficial.
+
+00:00:08.599 --> 00:00:13.580
+If you wanted to say "yes", you probably have problems with narcissism and communication skills.
+
+00:00:13.640 --> 00:00:15.339
+Improve those skills instead of being self-absorbed.
+"""
+
+# Минимальный PNG 1x1 для превью
+PREVIEW_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+
+class ApiError(Exception):
+    """Ошибка, которую обработчик превращает в ответ {"detail": ...}."""
+
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def now():
+    return datetime.now(timezone.utc)
+
+
+def isoformat(moment):
+    return moment.replace(tzinfo=None).isoformat()
+
+
+def sniff_video(content):
+    """Возвращает (MIME-тип, длительность в секундах) или None, если это не видео."""
+    if content[4:8] == b"ftyp":
+        return "video/mp4", _mp4_duration(content)
+    if content[:4] == b"\x1a\x45\xdf\xa3":
+        return "video/webm", _webm_duration(content)
+    return None
+
+
+def _webm_duration(content):
+    # Duration (0x4489) в Segment/Info, в единицах TimecodeScale (по умолчанию 1 мс)
+    index = content.find(b"\x44\x89")
+    if index < 0:
+        return 1.0
+    size, width = _ebml_size(content, index + 2)
+    value = content[index + 2 + width:index + 2 + width + size]
+    if size not in (4, 8) or len(value) != size:
+        return 1.0
+    duration = struct.unpack(">f" if size == 4 else ">d", value)[0]
+    scale = 1_000_000
+    scale_index = content.find(b"\x2a\xd7\xb1")
+    if scale_index >= 0:
+        scale_size, scale_width = _ebml_size(content, scale_index + 3)
+        start = scale_index + 3 + scale_width
+        scale = int.from_bytes(content[start:start + scale_size], "big") or scale
+    return round(duration * scale / 1e9, 3)
+
+
+def _ebml_size(content, index):
+    """(значение, ширина) целого переменной длины EBML."""
+    first = content[index]
+    width = 9 - first.bit_length()
+    value = first & (0xFF >> width)
+    for byte in content[index + 1:index + width]:
+        value = (value << 8) | byte
+    return value, width
+
+
+def _mp4_duration(content):
+    index = content.find(b"mvhd")
+    if index < 0:
+        return 1.0
+    if content[index + 4] == 1:
+        timescale, duration = struct.unpack(">IQ", content[index + 24:index + 36])
+    else:
+        timescale, duration = struct.unpack(">II", content[index + 16:index + 24])
+    return round(duration / timescale, 3) if timescale else 1.0
+
+
+class State:
+    """
+    Состояние заглушки VoiceCover в памяти: пользователи, токены, транзакции,
+    переводы и отправленные письма. Все изменения выполняются под одной блокировкой.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.maintenance = False
+        self.users = {}
+        self.tokens = {}
+        self.activate_codes = {}
+        self.transactions = {}
+        self.payments = {}
+        self.videos = {}
+        self.translations = {}
+        # Незавершённые загрузки частями по upload_id
+        self.uploads = {}
+        # Сбои для проверки повторов на клиенте: номер части -> сколько раз ответить 503
+        self.chunk_faults = {}
+        self.outbox = []
+        # Функция доставки письма (например, по SMTP в локальный приёмник)
+        self.mailer = None
+        self._ids = {}
+
+    def next_id(self, kind):
+        self._ids[kind] = self._ids.get(kind, 0) + 1
+        return self._ids[kind]
+
+    # --- пользователи и токены ---
+
+    def add_user(self, email, password, role="user", is_active=True, balance=0.0, **fields):
+        user = {
+            "lastname": None,
+            "firstname": None,
+            "avatar": None,
+            "email": email,
+            "role": role,
+            "phone": None,
+            "telegram": None,
+            "telegram_chatid": None,
+            "balance": float(balance),
+            "is_active": is_active,
+            "id": self.next_id("user"),
+            "created_at": isoformat(now()),
+            "last_login": None,
+            "utm": None,
+        }
+        user.update(fields)
+        user["password"] = password
+        self.users[user["id"]] = user
+        return user
+
+    def find_user(self, email):
+        for user in self.users.values():
+            if user["email"] == email:
+                return user
+        return None
+
+    def issue_tokens(self, user):
+        issued = now()
+        access_token = secrets.token_urlsafe(32)
+        refresh_token = secrets.token_urlsafe(32)
+        access_expired_at = issued + timedelta(seconds=ACCESS_TTL)
+        refresh_expired_at = issued + timedelta(seconds=REFRESH_TTL)
+        self.tokens[access_token] = (user["id"], access_expired_at.timestamp())
+        self.tokens[refresh_token] = (user["id"], refresh_expired_at.timestamp())
+        user["last_login"] = isoformat(issued)
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "access_token_expired_at": isoformat(access_expired_at),
+            "refresh_token_expired_at": isoformat(refresh_expired_at),
+            "token_type": "bearer",
+            "user": public_user(user),
+        }
+
+    def user_for_token(self, token):
+        entry = self.tokens.get(token)
+        if entry is None or entry[1] < time.time():
+            return None
+        return self.users.get(entry[0])
+
+    def send_mail(self, to, subject, text):
+        mail = {"to": to, "subject": subject, "text": text, "sent": isoformat(now())}
+        self.outbox.append(mail)
+        if self.mailer is not None:
+            self.mailer(mail)
+
+    # --- деньги ---
+
+    def add_transaction(self, user, amount, type_transaction):
+        transaction = {
+            "id": self.next_id("transaction"),
+            "user_id": user["id"],
+            "amount": float(amount),
+            "type_transaction": type_transaction,
+            "created_at": isoformat(now()),
+        }
+        self.transactions[transaction["id"]] = transaction
+        # Списания за переводы хранятся с отрицательной суммой
+        user["balance"] = round(user["balance"] + transaction["amount"], 2)
+        return transaction
+
+    # --- переводы ---
+
+    def add_video(self, content, content_type, length, name):
+        video = {
+            "id": self.next_id("video"),
+            "name": name,
+            "length": length,
+            "content_type": content_type,
+            "content": content,
+        }
+        self.videos[video["id"]] = video
+        return video
+
+    def add_translation(self, owner, video, **fields):
+        translation = dict(SETTINGS_DEFAULTS)
+        translation.update({
+            "id": self.next_id("translation"),
+            "owner_id": owner["id"],
+            "video_id": video["id"],
+            "current_task": None,
+            "status": "Обработка видео",
+            "feedback": None,
+            "transaction": None,
+            "sub_origin": None,
+            "sub_translate": None,
+            "video_translate": None,
+            "deleted": False,
+            "created_at": isoformat(now()),
+        })
+        translation.update(fields)
+        self.translations[translation["id"]] = translation
+        return translation
+
+    def add_upload(self, owner, name, size, chunk_size, sha256):
+        upload = {
+            "id": secrets.token_hex(16),
+            "owner_id": owner["id"],
+            "name": name,
+            "size": size,
+            "chunk_size": chunk_size,
+            "chunks": -(-size // chunk_size),
+            "sha256": sha256,
+            "parts": {},
+            "created_at": isoformat(now()),
+        }
+        self.uploads[upload["id"]] = upload
+        return upload
+
+    def price(self, translation, settings):
+        minutes = max(1, -(-int(self.videos[translation["video_id"]]["length"]) // 60))
+        per_minute = sum(price for option, price in OPTION_PRICES.items() if settings.get(option))
+        if not settings.get("has_logo"):
+            per_minute += NO_LOGO_PRICE
+        if settings.get("voice_gender"):
+            per_minute += VOICE_GENDER_PRICE
+        return float(per_minute * minutes)
+
+
+def public_user(user):
+    return {key: value for key, value in user.items() if key != "password"}
+
+
+def public_upload(upload):
+    return {
+        "upload_id": upload["id"],
+        "filename": upload["name"],
+        "size": upload["size"],
+        "chunk_size": upload["chunk_size"],
+        "chunks": upload["chunks"],
+        "received": sorted(upload["parts"]),
+        "created_at": upload["created_at"],
+    }
+
+
+def public_translation(state, translation, base_url=""):
+    video = state.videos[translation["video_id"]]
+    owner = state.users.get(translation["owner_id"])
+    links = {
+        file_type: f"{base_url}/translate/{translation['id']}/download/{file_type}/"
+        for file_type in FILE_TYPES
+    }
+    data = {key: translation[key] for key in SETTINGS_DEFAULTS}
+    data.update({
+        "current_task": translation["current_task"],
+        "feedback": translation["feedback"],
+        "id": translation["id"],
+        "owner": public_user(owner) if owner else {"id": translation["owner_id"]},
+        "video": {"id": video["id"], "name": video["name"], "length": video["length"]},
+        "transaction": translation["transaction"],
+        "sub_origin": links["sub_origin"] if translation["sub_origin"] else None,
+        "sub_translate": links["sub_translate"] if translation["sub_translate"] else None,
+        "video_origin": links["video_origin"],
+        "video_translate": links["video_translate"] if translation["video_translate"] else None,
+        "preview": links["preview"],
+        "created_at": translation["created_at"],
+    })
+    return data
+
+
+def seed(state, accounts, video_path):
+    """
+    Заполняет состояние постоянными аккаунтами из .env: администратор,
+    пользователь без баланса с двумя готовыми переводами и пользователь с балансом.
+    Возвращает словарь переменных окружения для тестов.
+    """
+    admin = state.add_user(accounts["ADMIN_EMAIL"], accounts["ADMIN_PASSWORD"], role="admin",
+                           lastname="Admin", firstname="Standin")
+    empty = state.add_user(accounts["EMPTY_BALANCE_USER_EMAIL"], accounts["EMPTY_BALANCE_USER_PASSWORD"],
+                           lastname="Empty", firstname="Balance")
+    rich = state.add_user(accounts["SOME_BALANCE_USER_EMAIL"], accounts["SOME_BALANCE_USER_PASSWORD"],
+                          lastname="Some", firstname="Balance")
+    state.add_transaction(rich, 100000, "debit")
+
+    with open(video_path, "rb") as f:
+        content = f.read()
+    content_type, length = sniff_video(content)
+    video = state.add_video(content, content_type, length, "man_talking.mp4")
+    done = {
+        "language": "en",
+        "subtitle_download": True,
+        "subtitle_edit": True,
+        "has_logo": True,
+        "status": "Завершено",
+        "sub_origin": SUB_ORIGIN,
+        "sub_translate": SUB_TRANSLATE,
+        "video_translate": content,
+    }
+    translation = state.add_translation(empty, video, **done)
+    translation_no_edit = state.add_translation(empty, video, **dict(done, subtitle_edit=False))
+
+    return dict(
+        accounts,
+        TRANSLATION_ID=str(translation["id"]),
+        TRANSLATION_ID_NO_EDIT=str(translation_no_edit["id"]),
+        ADMIN_ID=str(admin["id"]),
+    )
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+from api import async_requests
+from utils import cassette
+
+
+def test_async_client_reused_within_loop(base_url, standin_server):
+    """
+    Проверяет, что в пределах одного цикла событий запросы идут через один клиент.
+
+    Шаги:
+    1. В одном цикле отправить два запроса к /healthcheck.
+    2. Проверить, что оба прошли через один и тот же httpx.AsyncClient.
+    """
+    async def main():
+        await async_requests.get(base_url + "/healthcheck")
+        first = async_requests._client()[0]
+        await async_requests.get(base_url + "/healthcheck")
+        second = async_requests._client()[0]
+        await async_requests.aclose()
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first is second, "Второй запрос в том же цикле создал новый клиент"
+
+
+def test_async_client_per_loop(base_url, standin_server):
+    """
+    Проверяет, что каждый цикл событий получает собственный клиент.
+
+    Шаги:
+    1. Отправить запрос к /healthcheck в двух циклах подряд.
+    2. Проверить, что клиенты разные и после завершения циклов не остались в реестре.
+    """
+    async def main():
+        response = await async_requests.get(base_url + "/healthcheck")
+        client = async_requests._client()[0]
+        await async_requests.aclose()
+        return response, client
+
+    registered = len(async_requests._clients)
+    first_response, first = asyncio.run(main())
+    second_response, second = asyncio.run(main())
+
+    assert first_response.status_code == second_response.status_code == 200
+    assert first is not second, "Второй цикл событий получил клиент первого"
+    assert len(async_requests._clients) == registered, "Клиенты завершённых циклов остались в реестре"
+
+
+def test_async_aclose_closes_client(base_url, standin_server):
+    """
+    Проверяет aclose(): клиент текущего цикла закрывается и убирается из реестра,
+    а следующий запрос в том же цикле создаёт новый.
+
+    Шаги:
+    1. Отправить запрос и закрыть клиент.
+    2. Проверить, что клиент закрыт и цикла нет в реестре.
+    3. Отправить ещё один запрос и проверить, что он прошёл через новый клиент.
+    4. Проверить, что повторный aclose() без клиента не падает.
+    """
+    async def main():
+        loop = asyncio.get_running_loop()
+
+        # Шаги 1-2: Закрытие клиента
+        await async_requests.get(base_url + "/healthcheck")
+        closed = async_requests._client()[0]
+        await async_requests.aclose()
+        assert closed.is_closed, "aclose() не закрыл клиент"
+        assert loop not in async_requests._clients, "Закрытый клиент остался в реестре"
+
+        # Шаг 3: Новый клиент после закрытия
+        response = await async_requests.get(base_url + "/healthcheck")
+        assert response.status_code == 200
+        assert async_requests._client()[0] is not closed, "После aclose() использован закрытый клиент"
+
+        # Шаг 4: Повторное закрытие
+        await async_requests.aclose()
+        await async_requests.aclose()
+
+    asyncio.run(main())
+
+
+def test_async_response_conversion(base_url, standin_server, create_user_with_login):
+    """
+    Проверяет, что ответ httpx превращается в requests.Response со статусом,
+    заголовками, JSON, телом и исходным запросом.
+
+    Шаги:
+    1. Запросить /user/me с токеном пользователя.
+    2. Проверить статус, заголовки без учёта регистра, JSON и совпадение content с телом.
+    3. Отправить форму входа с неизвестным пользователем.
+    4. Проверить статус 404, тело ошибки и что тело формы в запросе — строка.
+    """
+    if cassette.mode() == "replay":
+        pytest.skip("При воспроизведении ответ берётся из кассеты, а не из httpx")
+    user = create_user_with_login
+
+    async def main():
+        me = await async_requests.get(
+            base_url + "/user/me", headers={"Authorization": f"Bearer {user['access_token']}"}
+        )
+        signin = await async_requests.post(
+            base_url + "/auth/signin", data={"username": "missing@example.com", "password": "Password123!"}
+        )
+        await async_requests.aclose()
+        return me, signin
+
+    me, signin = asyncio.run(main())
+
+    # Шаг 2: Успешный ответ
+    assert me.status_code == 200, f"Ожидаемый статус код 200, получен: {me.status_code}, {me.text}"
+    assert me.ok and me.reason == "OK"
+    assert me.headers["content-type"] == me.headers["Content-Type"]
+    assert me.headers["Content-Type"].startswith("application/json")
+    assert me.json()["id"] == user["id"]
+    assert isinstance(me.content, bytes) and json.loads(me.content) == me.json()
+    assert me.url == base_url + "/user/me"
+    assert me.request.method == "GET"
+    assert me.request.headers["Authorization"] == f"Bearer {user['access_token']}"
+    assert me.elapsed.total_seconds() > 0
+
+    # Шаг 4: Ошибка и тело формы
+    assert signin.status_code == 404, f"Ожидаемый статус код 404, получен: {signin.status_code}"
+    assert not signin.ok
+    assert signin.json() == {"detail": "User not found"}
+    assert signin.request.method == "POST"
+    assert isinstance(signin.request.body, str), f"Тело формы должно быть строкой: {signin.request.body!r}"
+    assert "username=missing%40example.com" in signin.request.body
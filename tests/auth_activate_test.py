@@ -1,23 +1,24 @@
 from dotenv import load_dotenv
 
 from api import requests
-import time
-from utils.mailsac import get_latest_email
+from utils.mailsac import wait_for_message
 load_dotenv()
 
 
 def get_activation_code(email):
     activation_code = None
-    for attempt in range(30):
-        email_content = get_latest_email(email)
-        if email_content:
-            for link in email_content.get("links", []):
-                if "https://voicecover.ru/auth/activate?activate_code=" in link:
-                    activation_code = link.split("=")[1]
-                    break
-        if activation_code:
-            break
-        time.sleep(2)
+    email_content = wait_for_message(
+        email,
+        lambda message: any(
+            "https://voicecover.ru/auth/activate?activate_code=" in link for link in message.get("links", [])
+        ),
+        timeout=60
+    )
+    if email_content:
+        for link in email_content.get("links", []):
+            if "https://voicecover.ru/auth/activate?activate_code=" in link:
+                activation_code = link.split("=")[1]
+                break
     return activation_code
 
 
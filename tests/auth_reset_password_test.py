@@ -1,9 +1,8 @@
 import pytest
 from api import requests
 import os
-import time
 from dotenv import load_dotenv
-from utils.mailsac import get_latest_email
+from utils.mailsac import get_email_text, inbox_size, wait_for_message
 import re
 load_dotenv()
 
@@ -112,6 +111,8 @@ def test_new_password_functionality(base_url, create_user, delete_user, activate
     activate_user(email)
     user_data = signin_user(email, old_password)
     user_id = user_data["user_id"]
+    # Письма до сброса (активация) в ожидание не попадают
+    since = inbox_size(email)
 
     reset_password_response = requests.post_request(
         base_url + '/auth/reset_password',
@@ -119,25 +120,19 @@ def test_new_password_functionality(base_url, create_user, delete_user, activate
     )
 
     assert reset_password_response.status_code == 200, "Ожидается успешный сброс пароля"
-    mailsac_api_key = os.getenv("MAILSAC_API_KEY")
-
     new_password = None
-    for attempt in range(30):
-        email_content = get_latest_email(email)
-        if email_content and email_content["subject"] == "Сброс пароля на Voicecover":
-            message_id = email_content["_id"]
-            response = requests.get_request(
-                f"https://mailsac.com/api/text/{email}/{message_id}",
-                headers={"Mailsac-Key": mailsac_api_key}
-            )
-            plaintext = response.text
-
-            match = re.search(r"Новый пароль:\s*(\S+)", plaintext)
-            if match:
-                new_password = match.group(1)
-                break
-
-        time.sleep(2)
+    email_content = wait_for_message(
+        email,
+        lambda message: message.get("subject") == "Сброс пароля на Voicecover",
+        timeout=60,
+        since=since
+    )
+    if email_content:
+        plaintext = get_email_text(email, email_content["_id"])
+
+        match = re.search(r"Новый пароль:\s*(\S+)", plaintext)
+        if match:
+            new_password = match.group(1)
 
     assert new_password is not None, "Не удалось извлечь новый пароль из письма"
 
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from api import async_requests
+from utils import cassette, mailsac
+from utils.cassette import Cassette, CassetteMissError
+
+
+@pytest.fixture
+def use_cassette(monkeypatch):
+    """Включает кассету только для асинхронного клиента: общий движок синхронных запросов не подменяется."""
+    if cassette.current() is not None:
+        pytest.skip("Прогон уже идёт с кассетой")
+
+    def _use(recording, mode):
+        monkeypatch.setattr(cassette, "_cassette", recording)
+        monkeypatch.setattr(cassette, "_mode", mode)
+        return recording
+
+    return _use
+
+
+def test_async_requests_record_and_replay(base_url, standin_server, use_cassette, tmp_path):
+    """
+    Проверяет, что асинхронный клиент пишет ответы в кассету и воспроизводит их из неё.
+
+    Шаги:
+    1. Записать запрос к /healthcheck.
+    2. Воспроизвести его из сохранённой кассеты и проверить статус и тело.
+    3. Проверить, что запрос, которого нет в кассете, сразу падает с CassetteMissError.
+    """
+    async def healthcheck(path="/healthcheck"):
+        try:
+            return await async_requests.get(base_url + path)
+        finally:
+            await async_requests.aclose()
+
+    # Шаг 1: Запись
+    path = str(tmp_path / "async.json.gz")
+    recording = use_cassette(Cassette(path), "record")
+    recorded = asyncio.run(healthcheck())
+    assert len(recording.interactions) == 1
+    recording.save()
+
+    # Шаг 2: Воспроизведение
+    use_cassette(Cassette.load(path), "replay")
+    replayed = asyncio.run(healthcheck())
+    assert replayed.status_code == recorded.status_code == 200
+    assert replayed.json() == recorded.json()
+    assert replayed.connection is None, "Ответ пришёл из сети, а не из кассеты"
+
+    # Шаг 3: Промах
+    with pytest.raises(CassetteMissError):
+        asyncio.run(healthcheck("/translate/count"))
+
+
+def test_inbox_watcher_fails_fast_on_cassette_miss(monkeypatch):
+    """
+    Проверяет, что промах кассеты при опросе ящика сразу завершает ожидание
+    ошибкой, а не держит его до таймаута.
+    """
+    def missing(address):
+        raise CassetteMissError(f"В кассете нет ответа на GET /api/addresses/{address}/messages")
+
+    monkeypatch.setattr(mailsac, "_inbox", missing)
+    started = time.monotonic()
+
+    with pytest.raises(CassetteMissError):
+        mailsac.InboxWatcher().watch("someone@mailsac.com", timeout=60).result(timeout=10)
+
+    assert time.monotonic() - started < 5, "Ожидание письма не завершилось сразу после промаха кассеты"
@@ -1,14 +1,280 @@
 import os
-import time
 import pytest
 from api import requests
-from utils.mailsac import generate_unique_email, get_latest_email
+from api import session as http_session
+from utils import capture, cassette, fixtures, latency, media, recorder, resource_locks, slo, teardown
+from utils.durations import DurationStore
+from utils.mailsac import generate_unique_email, wait_for_message
+from standin.server import StandinServer
+from utils.teardown import TeardownQueue
+from utils.token_cache import admin_token, cache_stats
+from utils import translation_cache as translations
+from utils.translation_cache import TranslationCache
+from utils.user_pool import UserPool, pool_size
 from dotenv import load_dotenv
 import uuid
 load_dotenv()
 
+ACTIVATE_LINK = "https://voicecover.ru/auth/activate?activate_code="
 
-@pytest.fixture
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--standin",
+        action="store_true",
+        default=False,
+        help="Запустить тесты против локальной заглушки API (standin/) вместо URL из .env"
+    )
+    parser.addoption(
+        "--http-capture",
+        choices=["failed", "all"],
+        default=None,
+        help="failed — трафик теста попадает в отчёт только при падении (по умолчанию), "
+             "all — логировать каждый запрос"
+    )
+    parser.addoption(
+        "--record-traffic",
+        nargs="?",
+        const="traffic.jsonl",
+        default=os.getenv("HTTP_RECORD") or None,
+        metavar="PATH",
+        help="Дописывать в PATH (по умолчанию traffic.jsonl) строку JSON на каждый запрос: "
+             "метод, шаблон пути, статус, байты, тайминги DNS/connect/TTFB/total и тест"
+    )
+    parser.addoption(
+        "--latency-json",
+        nargs="?",
+        const="latency.json",
+        default=os.getenv("LATENCY_JSON") or None,
+        metavar="PATH",
+        help="Записать в PATH (по умолчанию latency.json) процентили задержек и размеров по эндпоинтам (JSON)"
+    )
+    parser.addoption(
+        "--slo-config",
+        default=None,
+        metavar="PATH",
+        help="Файл бюджетов задержек для маркера slo (по умолчанию SLO_CONFIG или slo.json)"
+    )
+    parser.addoption(
+        "--slo-report-only",
+        action="store_true",
+        default=False,
+        help="Не валить тесты, нарушившие бюджет маркера slo: нарушения только попадают в отчёт"
+    )
+    parser.addoption(
+        "--cassette",
+        default=os.getenv("HTTP_CASSETTE") or None,
+        metavar="PATH",
+        help="Кассета с записанными ответами API (gzip), см. --cassette-mode"
+    )
+    parser.addoption(
+        "--cassette-mode",
+        choices=["record", "replay"],
+        default=os.getenv("HTTP_CASSETTE_MODE") or "replay",
+        help="record — записать ответы прогона в кассету, "
+             "replay — отвечать из кассеты без обращения к сети (по умолчанию)"
+    )
+    parser.addoption(
+        "--teardown-scope",
+        choices=["session", "module"],
+        default="session",
+        help="Когда удалять созданных тестами пользователей и переводы: пакетом в конце сессии "
+             "(по умолчанию) или после каждого модуля"
+    )
+    parser.addoption(
+        "--durations-db",
+        default=os.getenv("TEST_DURATIONS_DB") or None,
+        metavar="PATH",
+        help="Записывать длительности тестов в базу PATH (или TEST_DURATIONS_DB); без этого флага и --cost-schedule "
+             "длительности не пишутся"
+    )
+    parser.addoption(
+        "--cost-schedule",
+        action="store_true",
+        default=False,
+        help="Под pytest-xdist раздавать тесты воркерам от самых долгих по истории длительностей, "
+             "группируя тесты модуля с общей дорогой фикстурой"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "slo(endpoint=None, p95_ms=None, max_ms=None): бюджет задержек вызовов API в тесте; "
+        "без endpoint проверяются все вызовы по бюджетам из slo.json; нарушение валит тест, с --slo-report-only только попадает в отчёт"
+    )
+    config.addinivalue_line(
+        "markers",
+        "uses(*resources, mode='read'): общие ресурсы теста вида 'user:SOME_BALANCE_USER_EMAIL' или "
+        "'translation:TRANSLATION_ID'; под xdist тест ждёт межпроцессную блокировку, "
+        "mode='write' — эксклюзивную, 'read' — разделяемую"
+    )
+    config.slo_budgets = slo.load_budgets(config.getoption("--slo-config"))
+    # История длительностей нужна только планировщику --cost-schedule или по явной просьбе
+    config.duration_store = None
+    if config.getoption("--cost-schedule") or config.getoption("--durations-db"):
+        config.duration_store = DurationStore(
+            config.getoption("--durations-db"),
+            target="standin" if config.getoption("--standin") else "api"
+        )
+    capture.configure(mode=config.getoption("--http-capture"))
+    if config.getoption("--record-traffic"):
+        recorder.start(config.getoption("--record-traffic"))
+    if config.getoption("--cassette"):
+        cassette.start(config.getoption("--cassette"), config.getoption("--cassette-mode"))
+    if not config.getoption("--standin"):
+        return
+    # Заглушка поднимается в каждом процессе (в том числе в каждом воркере xdist)
+    # и подменяет URL и постоянные аккаунты из .env своими
+    server = StandinServer().start()
+    os.environ.update(server.env)
+    config.standin_server = server
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    # Блокировка держится на setup, call и teardown: фикстуры тоже меняют общие ресурсы
+    # Вызовы setup, call и teardown в потоке теста записываются с его nodeid
+    token = recorder.set_current_test(item.nodeid)
+    try:
+        with resource_locks.hold(resource_locks.requirements(item.iter_markers("uses"))):
+            yield
+    finally:
+        recorder.reset_current_test(token)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    capture.start_test()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item):
+    # Для SLO считаются только вызовы самого теста, без фикстур
+    if item.get_closest_marker("slo"):
+        latency.start_samples()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    if item.config.duration_store is not None:
+        item.config.duration_store.add(item.nodeid, report.duration, item.fixturenames)
+    markers = list(item.iter_markers("slo"))
+    if report.when == "call" and markers:
+        failure = slo.evaluate(markers, latency.take_samples(), item.config.slo_budgets)
+        if failure and report.passed and not hasattr(report, "wasxfail"):
+            if not item.config.getoption("--slo-report-only"):
+                report.outcome = "failed"
+                report.longrepr = failure
+            else:
+                # Секция доходит до контроллера xdist вместе с отчётом и попадает в итог и pytest-html
+                report.sections.append(("SLO", failure))
+    buffer = capture.current()
+    # Тела и cURL сериализуются только для упавшей фазы теста
+    if report.failed and buffer:
+        report.sections.append((f"HTTP-трафик ({report.when})", buffer.render()))
+
+
+def pytest_runtest_logfinish(nodeid, location):
+    capture.finish_test()
+
+
+def pytest_sessionfinish(session):
+    http_session.close()
+    config = session.config
+    if config.duration_store is not None:
+        config.duration_store.save()
+    if hasattr(config, "workeroutput"):
+        # Воркер xdist: гистограммы уходят контроллеру, отчёт пишет он
+        config.workeroutput["latency"] = latency.stats.to_dict()
+        config.workeroutput["resource_locks"] = dict(resource_locks.stats)
+        config.workeroutput["teardown"] = teardown.stats
+        config.workeroutput["translations"] = translations.stats
+    elif latency.stats.endpoints and config.getoption("--latency-json"):
+        latency.write_json(config.getoption("--latency-json"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    data = getattr(node, "workeroutput", {}).get("latency")
+    if data:
+        latency.stats.merge(data)
+    resource_locks.merge(getattr(node, "workeroutput", {}).get("resource_locks", {}))
+    teardown.merge(getattr(node, "workeroutput", {}).get("teardown", {}))
+    translations.merge(getattr(node, "workeroutput", {}).get("translations", {}))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    if not config.getoption("--cost-schedule"):
+        return None
+    from utils.cost_scheduler import CostScheduling
+    return CostScheduling(config, log, history=config.duration_store.load())
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    rows = latency.stats.summary()
+    if rows:
+        postfix.append(latency.html_table(rows))
+
+
+def pytest_unconfigure(config):
+    recorder.stop()
+    cassette.stop()
+    server = getattr(config, "standin_server", None)
+    if server is not None:
+        server.stop()
+
+
+def pytest_terminal_summary(terminalreporter):
+    connections = http_session.connection_stats()
+    if connections["requests"]:
+        terminalreporter.write_sep("-", "HTTP-соединения")
+        terminalreporter.write_line(
+            f"Запросов: {connections['requests']}, открыто соединений: {connections['opened']}, "
+            f"переиспользовано: {connections['reused']}"
+        )
+    tokens = cache_stats()
+    if any(tokens.values()):
+        terminalreporter.write_line(
+            f"Токены: signin {tokens['signins']}, обновлений {tokens['refreshes']}, из кэша {tokens['hits']}"
+        )
+    uploads = translations.stats
+    if any(uploads.values()):
+        terminalreporter.write_line(
+            f"Переводы: загрузок {uploads['uploads']}, копий {uploads['copies']}, "
+            f"выдач общего оригинала {uploads['reused']}"
+        )
+    cleanup = teardown.stats
+    if cleanup["deleted"] or cleanup["leaks"]:
+        terminalreporter.write_line(
+            f"Очистка: удалено {cleanup['deleted']}, повторов {cleanup['retries']}, не удалено {len(cleanup['leaks'])}"
+        )
+    if cleanup["leaks"]:
+        terminalreporter.write_sep("-", "Не удалённые после тестов сущности", red=True)
+        for leak in cleanup["leaks"]:
+            terminalreporter.write_line(f"{leak['kind']} {leak['id']}: {leak['reason']}")
+    violations = [
+        (report.nodeid, content)
+        for report in terminalreporter.stats.get("passed", [])
+        for name, content in report.sections
+        if name == "SLO"
+    ]
+    if violations:
+        terminalreporter.write_sep("-", "Нарушения SLO (тесты не провалены: --slo-report-only)", yellow=True)
+        for nodeid, content in violations:
+            terminalreporter.write_line(f"{nodeid}: {content.splitlines()[0]}")
+    locked = resource_locks.stats
+    if locked["tests"]:
+        terminalreporter.write_line(
+            f"Блокировки ресурсов: тестов {locked['tests']}, ожидание {locked['waited']:.1f} с"
+        )
+
+
+@pytest.fixture(scope="session")
 def base_url():
     return os.getenv('URL')
 
@@ -30,16 +296,16 @@ def create_user(base_url):
 def activate_user(base_url):
     def _activate_user(email):
         activation_code = None
-        for attempt in range(30):
-            email_content = get_latest_email(email)
-            if email_content:
-                for link in email_content.get("links", []):
-                    if "https://voicecover.ru/auth/activate?activate_code=" in link:
-                        activation_code = link.split("=")[1]
-                        break
-            if activation_code:
-                break
-            time.sleep(2)
+        email_content = wait_for_message(
+            email,
+            lambda message: any(ACTIVATE_LINK in link for link in message.get("links", [])),
+            timeout=60
+        )
+        if email_content:
+            for link in email_content.get("links", []):
+                if ACTIVATE_LINK in link:
+                    activation_code = link.split("=")[1]
+                    break
 
         if not activation_code:
             raise Exception("Не удалось найти письмо с активацией или код активации")
@@ -54,50 +320,36 @@ def activate_user(base_url):
 @pytest.fixture
 def signin_user(base_url):
     def _signin_user(email, password):
-        signin_payload = {"username": email, "password": password}
-        signin_response = requests.post_request(base_url + '/auth/signin', data=signin_payload)
-
-        if signin_response.status_code != 200:
-            raise Exception(
-                f"Ошибка при авторизации пользователя: {signin_response.status_code}, {signin_response.json()}"
-            )
-
-        response_data = signin_response.json()
-        if "user" not in response_data:
-            raise KeyError(f"Ответ API не содержит ключ 'user': {response_data}")
-
-        return {
-            "user_id": response_data["user"]["id"],
-            "access_token": response_data["access_token"],
-            "refresh_token": response_data["refresh_token"],
-        }
+        return fixtures.signin_user(base_url, email, password)
 
     return _signin_user
 
 
-@pytest.fixture
-def delete_user(base_url):
-    """
-    Фикстура для удаления пользователя по его ID.
-    """
-    def _delete_user(user_id):
-        admin_email = os.getenv("ADMIN_EMAIL")
-        admin_password = os.getenv("ADMIN_PASSWORD")
-        payload = {"username": admin_email, "password": admin_password}
+def _teardown_scope(fixture_name, config):
+    return config.getoption("--teardown-scope")
 
-        # Авторизация под администратором
-        admin_response = requests.post_request(base_url + '/auth/signin', data=payload)
 
-        if admin_response.status_code != 200:
-            raise Exception(f"Ошибка при входе под администратором: {admin_response.status_code}, {admin_response.json()}")
+@pytest.fixture(scope=_teardown_scope)
+def teardown_queue(base_url):
+    """
+    Очередь удаления созданных тестами пользователей и переводов: удаляются
+    параллельно пакетом в конце сессии или модуля (--teardown-scope).
+    """
+    queue = TeardownQueue(base_url)
+    yield queue
+    queue.flush()
 
-        admin_access_token = admin_response.json()["access_token"]
-        headers = {"Authorization": f"Bearer {admin_access_token}", "accept": "application/json"}
 
-        # Удаление пользователя
-        response = requests.delete_request(f"{base_url}/user/{user_id}", headers=headers)
-        if response.status_code not in [200, 204]:
-            raise Exception(f"Ошибка при удалении пользователя: {response.status_code}, {response.json()}")
+@pytest.fixture
+def delete_user(user_pool, teardown_queue):
+    """
+    Фикстура для удаления пользователя по его ID.
+    Пользователи из пула не удаляются, а возвращаются в пул. Остальные
+    ставятся в очередь удаления; immediately=True — удалить сразу
+    (для тестов, которые проверяют результат удаления).
+    """
+    def _delete_user(user_id, immediately=False):
+        fixtures.delete_user(user_pool, teardown_queue, user_id, immediately=immediately)
 
     return _delete_user
 
@@ -142,20 +394,7 @@ def admin_access_token(base_url):
     """
     Фикстура для получения access_token администратора.
     """
-    admin_email = os.getenv("ADMIN_EMAIL")
-    admin_password = os.getenv("ADMIN_PASSWORD")
-
-    signin_payload = {"username": admin_email, "password": admin_password}
-    response = requests.post_request(f"{base_url}/auth/signin", data=signin_payload)
-
-    if response.status_code != 200:
-        raise Exception(f"Ошибка авторизации администратора: {response.status_code}, {response.json()}")
-
-    access_token = response.json().get("access_token")
-    if not access_token:
-        raise Exception("Не удалось получить токен администратора")
-
-    return access_token
+    return admin_token(base_url)
 
 
 @pytest.fixture
@@ -163,18 +402,8 @@ def create_admin(base_url):
     """
     Фикстура для создания администратора через существующего администратора.
     """
-    # Авторизация под постоянным администратором
-    admin_email = os.getenv("ADMIN_EMAIL")
-    admin_password = os.getenv("ADMIN_PASSWORD")
-    signin_payload = {"username": admin_email, "password": admin_password}
-    admin_signin_response = requests.post_request(
-        f"{base_url}/auth/signin",
-        data=signin_payload
-    )
-    assert admin_signin_response.status_code == 200, (
-        f"Не удалось авторизоваться под администратором: {admin_signin_response.text}"
-    )
-    admin_access_token = admin_signin_response.json()["access_token"]
+    # Токен постоянного администратора из кэша
+    admin_access_token = admin_token(base_url)
 
     # Создание нового администратора
     email = f"admin_{uuid.uuid4().hex}@test.com"
@@ -230,129 +459,110 @@ def add_translation(base_url):
     Фикстура для добавления перевода.
     """
 
-    def _add_translation(access_token, file_path):
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "accept": "application/json"
-        }
+    def _add_translation(access_token, file_path, mime_type="video/mp4"):
+        return fixtures.add_translation(base_url, access_token, file_path, mime_type=mime_type)
 
-        # Указываем MIME-тип для видео
-        mime_type = "video/mp4"  # Замените на подходящий MIME-тип вашего видео
-        files = {
-            "upload": (os.path.basename(file_path), open(file_path, "rb"), mime_type)
-        }
+    return _add_translation
 
-        response = requests.post_request(
-            f"{base_url}/translate/upload/",
-            headers=headers,
-            files=files
-        )
 
-        assert response.status_code == 200, (
-            f"Ошибка при загрузке видео: {response.status_code}, {response.text}"
-        )
-        return response.json()
+@pytest.fixture
+def standin_server(request):
+    """Локальная заглушка текущего процесса; тесты возможностей, которых нет в API, без --standin пропускаются."""
+    server = getattr(request.config, "standin_server", None)
+    if server is None:
+        pytest.skip("Проверяется только на локальной заглушке (--standin)")
+    return server
 
-    return _add_translation
 
+@pytest.fixture(scope="session")
+def synthetic_media():
+    """
+    Фабрика синтетических файлов (utils/media.py): принимает параметры MediaSpec
+    и возвращает путь к файлу в кэше MEDIA_CACHE_DIR, генерируя его при первом запросе.
+    """
 
-@pytest.fixture
-def delete_translation(base_url):
-    def _delete_translation(access_token, translation_id):
-        headers = {
-            "accept": "application/json",
-            "Authorization": f"Bearer {access_token}"
-        }
-        response = requests.delete_request(
-            url=f"{base_url}/translate/{translation_id}",
-            headers=headers
-        )
-        assert response.status_code in [200, 204], f"Не удалось удалить перевод: {response.text}"
-    return _delete_translation
+    def _synthetic_media(**params):
+        return media.path(media.MediaSpec(**params))
+
+    return _synthetic_media
+
+
+@pytest.fixture(scope="session")
+def translation_cache(base_url):
+    """
+    Кэш загруженных переводов на всю сессию: каждый файл загружается
+    один раз на пользователя.
+    """
+    cache = TranslationCache(base_url)
+    yield cache
+    cache.close()
 
 
 @pytest.fixture
-def create_user_with_login(base_url):
+def lease_translation(translation_cache, teardown_queue):
     """
-    Фикстура для создания пользователя через администратора и последующей авторизации.
+    Фикстура для получения перевода без повторной загрузки видео.
+
+    readonly=True — общий нетронутый оригинал: его нельзя настраивать и удалять.
+    Иначе — собственная копия оригинала, которая удаляется после теста,
+    если тест не удалил её сам.
     """
-    # Авторизация под постоянным администратором
-    admin_email = os.getenv("ADMIN_EMAIL")
-    admin_password = os.getenv("ADMIN_PASSWORD")
-    signin_payload = {"username": admin_email, "password": admin_password}
-    admin_signin_response = requests.post_request(
-        f"{base_url}/auth/signin",
-        data=signin_payload
-    )
-    assert admin_signin_response.status_code == 200, (
-        f"Не удалось авторизоваться под администратором: {admin_signin_response.text}"
-    )
-    admin_access_token = admin_signin_response.json()["access_token"]
+    leased = []
 
-    # Создание нового пользователя
-    email = f"user_{uuid.uuid4().hex}@test.com"
-    password = "Password123!"
-    payload = {
-        "lastname": "Test",
-        "firstname": "User",
-        "email": email,
-        "role": "user",
-        "balance": 0,
-        "is_active": True,
-        "password": password
-    }
-    headers = {
-        "Authorization": f"Bearer {admin_access_token}",
-        "accept": "application/json",
-        "Content-Type": "application/json"
-    }
+    def _lease_translation(access_token, file_path, readonly=False):
+        translation = translation_cache.lease(access_token, file_path, readonly=readonly)
+        if not readonly:
+            leased.append(translation["id"])
+        return translation
 
-    create_response = requests.post_request(
-        f"{base_url}/user/",
-        json=payload,
-        headers=headers
-    )
-    assert create_response.status_code == 200, (
-        f"Не удалось создать пользователя: {create_response.text}"
-    )
+    yield _lease_translation
 
-    # Авторизация нового пользователя
-    signin_payload = {"username": email, "password": password}
-    new_user_signin_response = requests.post_request(
-        f"{base_url}/auth/signin",
-        data=signin_payload
-    )
-    assert new_user_signin_response.status_code == 200, (
-        f"Не удалось авторизоваться новым пользователем: {new_user_signin_response.text}"
-    )
+    fixtures.release_translations(translation_cache, teardown_queue, leased)
 
-    new_user_access_token = new_user_signin_response.json()["access_token"]
-    new_user_id = create_response.json()["id"]
 
-    return {
-        "id": new_user_id,  # Возвращаем ID нового пользователя
-        "email": email,
-        "password": password,
-        "access_token": new_user_access_token
-    }
+@pytest.fixture
+def delete_translation(translation_cache, teardown_queue):
+    def _delete_translation(access_token, translation_id):
+        fixtures.delete_translation(translation_cache, teardown_queue, access_token, translation_id)
+    return _delete_translation
+
+
+@pytest.fixture(scope="session")
+def user_pool(base_url):
+    """
+    Пул временных пользователей на всю сессию. Размер задаётся USER_POOL_SIZE
+    (0 — создавать и удалять пользователя на каждый тест).
+
+    С кассетой пул отключается: пользователи, созданные в фоне заранее, попадали бы
+    при записи и воспроизведении в разные тесты.
+    """
+    pool = UserPool(base_url, size=0 if cassette.current() else pool_size())
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def create_user_with_login(user_pool):
+    """
+    Фикстура, выдающая созданного администратором и авторизованного пользователя из пула.
+    """
+    user = user_pool.lease()
+    yield user
+    user_pool.release(user["id"])
 
 
 @pytest.fixture
-def add_balance(base_url, signin_user):
+def add_balance(base_url):
     """
     Фикстура для пополнения баланса пользователя через администратора.
 
     Аргументы:
     - base_url: базовый URL API.
-    - signin_user: фикстура для входа в систему.
 
     Возвращает:
     - Функцию для выполнения транзакции с указанными параметрами.
     """
-    admin_email = os.getenv("ADMIN_EMAIL")
-    admin_password = os.getenv("ADMIN_PASSWORD")
-    admin = signin_user(admin_email, admin_password)
-    admin_access_token = admin["access_token"]
+    admin_access_token = admin_token(base_url)
 
     def _add_balance(user_id, amount):
         headers = {
@@ -1,9 +1,10 @@
 import os
 import pytest
 from api import requests
+from api.download import download
 
 
-def test_get_video_origin_success(base_url, signin_user, add_translation, delete_translation):
+def test_get_video_origin_success(base_url, signin_user, lease_translation):
     """
     Проверяет, что сервер возвращает корректный файл исходного видео для существующего перевода.
 
@@ -24,35 +25,35 @@ def test_get_video_origin_success(base_url, signin_user, add_translation, delete
     current_dir = os.path.dirname(__file__)
     test_video_path = os.path.join(current_dir, "..", "data", "man_talking.mp4")
     test_video_path = os.path.abspath(test_video_path)
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path, readonly=True)
     translation_id = translation["id"]
 
-    try:
-        # Шаг 3: Выполнить GET-запрос для получения исходного видео
-        headers = {
-            "Authorization": f"Bearer {user_access_token}",
-            "accept": "application/json"
-        }
-        response = requests.get_request(
-            f"{base_url}/translate/{translation_id}/download/video_origin/",
-            headers=headers
-        )
-
-        # Шаг 4: Проверить, что сервер возвращает статус код 200
-        assert response.status_code == 200, (
-            f"Ожидаемый статус код 200, получен: {response.status_code}"
-        )
-
-        # Шаг 5: Проверить, что файл доступен для загрузки
-        assert response.content, "Ответ не содержит содержимого файла"
-        assert response.headers["Content-Type"] == "video/mp4", (
-            f"Ожидалось 'video/mp4', получено: {response.headers.get('Content-Type')}"
-        )
-    finally:
-        # Удалить перевод
-        delete_translation(user_access_token, translation_id)
+    # Шаг 3: Выполнить GET-запрос для получения исходного видео
+    headers = {
+        "Authorization": f"Bearer {user_access_token}",
+        "accept": "application/json"
+    }
+    response = download(
+        f"{base_url}/translate/{translation_id}/download/video_origin/",
+        headers=headers
+    )
+
+    # Шаг 4: Проверить, что сервер возвращает статус код 200
+    assert response.status_code == 200, (
+        f"Ожидаемый статус код 200, получен: {response.status_code}"
+    )
+
+    # Шаг 5: Проверить, что файл доступен для загрузки
+    assert response.size, "Ответ не содержит содержимого файла"
+    assert response.mime_type == "video/mp4", (
+        f"Содержимое не похоже на MP4, сигнатура: {response.mime_type}"
+    )
+    assert response.headers["Content-Type"] == "video/mp4", (
+        f"Ожидалось 'video/mp4', получено: {response.headers.get('Content-Type')}"
+    )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_video_translate_for_user_without_balance(base_url, signin_user):
     """
     Проверяет, что сервер возвращает корректный файл переведенного видео для перевода,
@@ -79,7 +80,7 @@ def test_get_video_translate_for_user_without_balance(base_url, signin_user):
         "accept": "application/json"
     }
 
-    response = requests.get_request(
+    response = download(
         f"{base_url}/translate/{translation_id}/download/video_translate/",
         headers=headers
     )
@@ -90,12 +91,16 @@ def test_get_video_translate_for_user_without_balance(base_url, signin_user):
     )
 
     # Шаг 4: Проверить, что файл доступен для загрузки
-    assert response.content, "Ответ не содержит содержимого файла"
+    assert response.size, "Ответ не содержит содержимого файла"
+    assert response.mime_type == "video/mp4", (
+        f"Содержимое не похоже на MP4, сигнатура: {response.mime_type}"
+    )
     assert response.headers["Content-Type"] == "video/mp4", (
         f"Ожидалось 'video/mp4', получено: {response.headers.get('Content-Type')}"
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID_NO_EDIT")
 def test_get_sub_translate_for_user_without_balance(base_url, signin_user):
     """
     Проверяет, что сервер возвращает файл переведенных субтитров на целевом языке для завершенного перевода.
@@ -122,7 +127,7 @@ def test_get_sub_translate_for_user_without_balance(base_url, signin_user):
         "accept": "application/json"
     }
 
-    response = requests.get_request(
+    response = download(
         f"{base_url}/translate/{translation_id}/download/sub_translate/",
         headers=headers
     )
@@ -133,7 +138,10 @@ def test_get_sub_translate_for_user_without_balance(base_url, signin_user):
     )
 
     # Шаг 4: Проверить, что файл доступен для загрузки в формате VTT
-    assert response.content, "Ответ не содержит содержимого файла"
+    assert response.size, "Ответ не содержит содержимого файла"
+    assert response.mime_type == "text/vtt", (
+        f"Содержимое не похоже на WebVTT, сигнатура: {response.mime_type}"
+    )
     content_type = response.headers.get("Content-Type")
     assert content_type.startswith("text/vtt"), (
         f"Ожидалось 'text/vtt', получено: {content_type}"
@@ -152,6 +160,7 @@ def test_get_sub_translate_for_user_without_balance(base_url, signin_user):
 
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID_NO_EDIT")
 def test_get_sub_origin_for_user_without_balance(base_url, signin_user):
     """
     Проверяет, что сервер возвращает файл оригинальных субтитров на исходном языке для завершенного перевода.
@@ -178,7 +187,7 @@ def test_get_sub_origin_for_user_without_balance(base_url, signin_user):
         "accept": "application/json"
     }
 
-    response = requests.get_request(
+    response = download(
         f"{base_url}/translate/{translation_id}/download/sub_origin/",
         headers=headers
     )
@@ -189,7 +198,10 @@ def test_get_sub_origin_for_user_without_balance(base_url, signin_user):
     )
 
     # Шаг 4: Проверить, что файл доступен для загрузки в формате VTT
-    assert response.content, "Ответ не содержит содержимого файла"
+    assert response.size, "Ответ не содержит содержимого файла"
+    assert response.mime_type == "text/vtt", (
+        f"Содержимое не похоже на WebVTT, сигнатура: {response.mime_type}"
+    )
     content_type = response.headers.get("Content-Type")
     assert content_type.startswith("text/vtt"), (
         f"Ожидалось 'text/vtt', получено: {content_type}"
@@ -226,6 +238,7 @@ def test_get_sub_origin_for_user_without_balance(base_url, signin_user):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_preview_for_user_without_balance(base_url, signin_user):
     """
     Проверяет, что сервер возвращает файл превью для текущего перевода (если доступно).
@@ -251,7 +264,7 @@ def test_get_preview_for_user_without_balance(base_url, signin_user):
         "accept": "application/json"
     }
 
-    response = requests.get_request(
+    response = download(
         f"{base_url}/translate/{translation_id}/download/preview/",
         headers=headers
     )
@@ -262,7 +275,10 @@ def test_get_preview_for_user_without_balance(base_url, signin_user):
     )
 
     # Шаг 4: Проверить, что файл доступен для загрузки в формате изображения
-    assert response.content, "Ответ не содержит содержимого файла"
+    assert response.size, "Ответ не содержит содержимого файла"
+    assert (response.mime_type or "").startswith("image/"), (
+        f"Содержимое не похоже на изображение, сигнатура: {response.mime_type}"
+    )
     content_type = response.headers.get("Content-Type")
     assert content_type.startswith("image/"), (
         f"Ожидалось 'image/', получено: {content_type}"
@@ -313,6 +329,7 @@ def test_get_file_for_nonexistent_translation(base_url, signin_user):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_unavailable_type_file(base_url, signin_user):
 
     # Шаг 1: Логин под пользователем без баланса
@@ -341,6 +358,7 @@ def test_get_unavailable_type_file(base_url, signin_user):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_file_without_authorization(base_url):
     """
     Проверяет, что сервер запрещает доступ к эндпоинту для неавторизованных пользователей.
@@ -359,7 +377,7 @@ def test_get_file_without_authorization(base_url):
         "accept": "application/json"
     }
 
-    response = requests.get_request(
+    response = download(
         f"{base_url}/translate/{translation_id}/download/video_origin/",  # Пример типа файла
         headers=headers
     )
@@ -370,6 +388,7 @@ def test_get_file_without_authorization(base_url):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_file_for_foreign_translation(base_url, signin_user):
     """
     Проверяет, что пользователь не может получить доступ к файлу, принадлежащему другому пользователю.
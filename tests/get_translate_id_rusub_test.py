@@ -3,6 +3,7 @@ import pytest
 from api import requests
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_subtitles_for_existing_translation(base_url, signin_user):
     empty_balance_email = os.getenv("EMPTY_BALANCE_USER_EMAIL")
     empty_balance_password = os.getenv("EMPTY_BALANCE_USER_PASSWORD")
@@ -100,6 +101,7 @@ def test_get_subtitles_with_invalid_id(base_url, signin_user):
     ), "Ответ не содержит ожидаемую ошибку в поле 'id'"
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_subtitles_without_authorization(base_url):
     existing_translation_id = str(os.getenv("TRANSLATION_ID"))
 
@@ -123,8 +125,9 @@ def test_get_subtitles_without_authorization(base_url):
     )
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 @pytest.mark.xfail(reason="Баг: сервер возвращает статус код 500 вместо ожидаемого 404")
-def test_get_subtitles_for_foreign_translation(base_url, signin_user, add_translation, delete_translation):
+def test_get_subtitles_for_foreign_translation(base_url, signin_user, lease_translation):
     some_balance_email = os.getenv("SOME_BALANCE_USER_EMAIL")
     some_balance_password = os.getenv("SOME_BALANCE_USER_PASSWORD")
     balance_user = signin_user(some_balance_email, some_balance_password)
@@ -135,33 +138,30 @@ def test_get_subtitles_for_foreign_translation(base_url, signin_user, add_transl
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(balance_user_access_token, test_video_path)
+    translation = lease_translation(balance_user_access_token, test_video_path, readonly=True)
     translation_id = translation["id"]
 
-    try:
-        empty_balance_email = os.getenv("EMPTY_BALANCE_USER_EMAIL")
-        empty_balance_password = os.getenv("EMPTY_BALANCE_USER_PASSWORD")
-        empty_balance_user = signin_user(empty_balance_email, empty_balance_password)
-        empty_balance_user_access_token = empty_balance_user["access_token"]
-
-        headers = {
-            "Authorization": f"Bearer {empty_balance_user_access_token}",
-            "accept": "application/json"
-        }
+    empty_balance_email = os.getenv("EMPTY_BALANCE_USER_EMAIL")
+    empty_balance_password = os.getenv("EMPTY_BALANCE_USER_PASSWORD")
+    empty_balance_user = signin_user(empty_balance_email, empty_balance_password)
+    empty_balance_user_access_token = empty_balance_user["access_token"]
 
-        response = requests.get_request(
-            f"{base_url}/translate/{translation_id}/rusub/",
-            headers=headers
-        )
+    headers = {
+        "Authorization": f"Bearer {empty_balance_user_access_token}",
+        "accept": "application/json"
+    }
 
-        assert response.status_code == 403, (
-            f"Ожидаемый статус код 403 для доступа к чужому переводу, получен: {response.status_code}"
-        )
+    response = requests.get_request(
+        f"{base_url}/translate/{translation_id}/rusub/",
+        headers=headers
+    )
 
-    finally:
-        delete_translation(balance_user_access_token, translation_id)
+    assert response.status_code == 403, (
+        f"Ожидаемый статус код 403 для доступа к чужому переводу, получен: {response.status_code}"
+    )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_incorrect_http_method_delete(base_url, signin_user):
     empty_balance_email = os.getenv("EMPTY_BALANCE_USER_EMAIL")
     empty_balance_password = os.getenv("EMPTY_BALANCE_USER_PASSWORD")
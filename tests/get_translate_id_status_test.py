@@ -2,8 +2,10 @@ import os
 import pytest
 from api import requests
 
+pytestmark = pytest.mark.slo(endpoint="GET /translate/*/status")
 
-def test_get_status_for_new_translation(base_url, signin_user, add_translation, delete_translation):
+
+def test_get_status_for_new_translation(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что статус нового перевода корректно возвращается после настройки перевода.
 
@@ -38,7 +40,7 @@ def test_get_status_for_new_translation(base_url, signin_user, add_translation,
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     try:
@@ -184,6 +186,7 @@ def test_get_status_with_invalid_id(base_url, signin_user):
     ), "Ответ не содержит ожидаемую ошибку в поле 'id'"
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_status_without_authorization(base_url):
     """
     Проверяет реакцию сервера на запрос статуса без авторизации.
@@ -220,6 +223,7 @@ def test_get_status_without_authorization(base_url):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_get_status_for_foreign_task_as_admin(base_url, signin_user):
     """
     Проверяет, что администратор может получить статус чужой задачи.
@@ -199,7 +199,7 @@ def test_get_deleted_user_returns_404(base_url, signin_user, delete_user):
     user_id = new_user["id"]
 
     # Шаг 3: Удалить созданного пользователя через фикстуру delete_user
-    delete_user(user_id)
+    delete_user(user_id, immediately=True)
 
     # Шаг 4: Выполнить GET-запрос для получения данных удаленного пользователя
     get_response = requests.get_request(
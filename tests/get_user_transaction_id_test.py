@@ -3,6 +3,7 @@ import pytest
 from api import requests
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_get_transaction_successfully(base_url, signin_user, add_balance):
     """
     Проверяет, что авторизованный пользователь может получить информацию о своей транзакции по корректному `id`.
@@ -34,6 +35,7 @@ def test_get_transaction_successfully(base_url, signin_user, add_balance):
     )
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_get_other_user_transaction_forbidden(base_url, signin_user, add_balance):
     """
     Проверяет, что пользователь не может получить доступ к транзакции другого пользователя.
@@ -67,6 +69,7 @@ def test_get_other_user_transaction_forbidden(base_url, signin_user, add_balance
     )
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_get_transaction_as_admin(base_url, signin_user, add_balance):
     """
     Проверяет, что администратор может получить информацию о транзакции любого пользователя.
@@ -3,6 +3,7 @@ import pytest
 from api import requests
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_get_transactions_successfully(base_url, signin_user, add_balance):
     """
     Проверяет, что статичный пользователь может успешно получить список своих транзакций.
@@ -52,6 +53,7 @@ def test_get_transactions_successfully(base_url, signin_user, add_balance):
     ), "Транзакция пополнения баланса отсутствует в списке транзакций"
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_transactions_pagination(base_url, signin_user, add_balance):
     """
     Проверяет, что параметры offset и limit корректно обрабатываются:
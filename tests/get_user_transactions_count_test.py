@@ -3,6 +3,7 @@ import pytest
 from api import requests
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_get_transaction_count_successfully(base_url, signin_user, add_balance):
     """
     Проверяет, что авторизованный пользователь может получить общее количество своих транзакций.
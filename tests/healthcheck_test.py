@@ -2,6 +2,7 @@ import pytest
 from api import requests
 
 
+@pytest.mark.slo
 def test_healthcheck_success(base_url):
     response = requests.get_request(base_url + '/healthcheck')
     assert response.status_code == 200, "Ожидается статус код 200"
@@ -0,0 +1,51 @@
+import threading
+
+from utils.mailsac import generate_unique_email, inbox_size, wait_for_message
+
+
+def _deliver(server, address, subject, text):
+    raw = f"From: robot@example.com\r\nTo: {address}\r\nSubject: {subject}\r\n\r\n{text}\r\n".encode()
+    server.mail_sink.deliver("robot@example.com", [address], raw)
+
+
+def test_wait_returns_newest_match(standin_server):
+    """
+    Проверяет, что из нескольких подходящих писем возвращается самое новое.
+
+    Шаги:
+    1. Доставить в ящик два письма с одной темой.
+    2. Проверить, что ожидание вернуло второе.
+    """
+    address = generate_unique_email()
+    _deliver(standin_server, address, "Code", "first")
+    _deliver(standin_server, address, "Code", "second")
+
+    message = wait_for_message(address, lambda m: m.get("subject") == "Code", timeout=5)
+
+    assert message is not None and message["text"].strip() == "second"
+
+
+def test_wait_since_ignores_earlier_mail(standin_server):
+    """
+    Проверяет, что с since ожидание не заканчивается на письме, которое уже было в ящике.
+
+    Шаги:
+    1. Доставить письмо и снять размер ящика.
+    2. Проверить, что без новых писем ожидание возвращает None.
+    3. Доставить письмо во время ожидания и проверить, что вернулось оно.
+    """
+    address = generate_unique_email()
+    _deliver(standin_server, address, "Code", "old")
+    since = inbox_size(address)
+    assert since == 1
+
+    assert wait_for_message(address, timeout=0.3, since=since) is None, "Ожидание вернуло старое письмо"
+
+    timer = threading.Timer(0.2, _deliver, (standin_server, address, "Code", "new"))
+    timer.start()
+    try:
+        message = wait_for_message(address, timeout=5, since=since)
+    finally:
+        timer.join()
+
+    assert message is not None and message["text"].strip() == "new"
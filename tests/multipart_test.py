@@ -0,0 +1,40 @@
+import io
+
+import pytest
+import requests
+
+from api.multipart import MultipartEncoder
+
+
+def _requests_body(data, files, boundary):
+    prepared = requests.Request("POST", "http://unused/", data=data, files=files).prepare()
+    own = prepared.headers["Content-Type"].split("boundary=")[1]
+    return prepared.body.replace(own.encode(), boundary.encode())
+
+
+def test_body_matches_requests():
+    """
+    Проверяет, что тело совпадает с телом requests побайтно.
+
+    Шаги:
+    1. Собрать форму с числами, строкой и файлами в кортежах из 2, 3 и 4 элементов.
+    2. Сравнить с телом, которое собирает requests, и проверить длину.
+    """
+    data = {"count": 5, "ratio": 1.5, "title": "Видео"}
+    files = {
+        "plain": ("plain.txt", b"abc"),
+        "stream": ("clip.mp4", io.BytesIO(b"\x00\x01"), "video/mp4"),
+        "extra": ("note.txt", "text", "text/plain", {"X-Part": "1"}),
+    }
+    encoder = MultipartEncoder(dict(data, **files), boundary="boundary")
+    body = encoder.read()
+
+    files["stream"][1].seek(0)
+    assert body == _requests_body(data, files, "boundary")
+    assert len(encoder) == len(body)
+
+
+def test_rejects_unknown_file_spec():
+    """Проверяет, что кортеж не из 2-4 элементов отклоняется понятной ошибкой."""
+    with pytest.raises(ValueError, match="получено элементов: 5"):
+        MultipartEncoder({"upload": ("a.txt", b"a", "text/plain", {}, "лишний")})
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+from load.open_loop import FlowStats, OpenLoopReport, OpenLoopRunner, TimerWheel
+
+
+class _Response:
+    status_code = 200
+
+
+def _run_wheel(wheel, setup):
+    async def main():
+        wheel.start()
+        setup(asyncio.get_running_loop())
+        await wheel.run()
+
+    asyncio.run(main())
+
+
+def test_timer_wheel_fires_in_time_order():
+    """
+    Проверяет, что таймеры срабатывают по возрастанию времени, не раньше
+    запланированного момента, в том числе дальше одного оборота колеса.
+
+    Шаги:
+    1. Поставить таймеры в обратном порядке на колесо из 4 корзин по 10 мс.
+    2. Проверить порядок срабатывания и что ни один таймер не сработал раньше срока.
+    """
+    wheel = TimerWheel(tick=0.01, slots=4)
+    fired = []
+
+    def setup(loop):
+        now = loop.time()
+        # 0.12 с — три оборота колеса, 0.015 и 0.055 попадают в одну корзину
+        for offset in (0.12, 0.055, 0.03, 0.015, 0.0):
+            wheel.schedule(now + offset, lambda when: fired.append((when, loop.time())))
+
+    _run_wheel(wheel, setup)
+
+    assert [when for when, _ in fired] == sorted(when for when, _ in fired), f"Порядок срабатывания: {fired}"
+    assert len(fired) == 5
+    for when, at in fired:
+        assert at >= when, f"Таймер на {when} сработал раньше срока: {at}"
+
+
+def test_timer_wheel_fires_timer_scheduled_into_current_tick():
+    """
+    Проверяет, что таймер, поставленный колбэком в текущий тик, срабатывает
+    в этом же тике, а таймеры одного тика — в порядке постановки.
+
+    Шаги:
+    1. Поставить два таймера на один момент; первый ставит ещё один на тот же момент.
+    2. Проверить, что все три сработали в одном тике и в порядке постановки.
+    """
+    wheel = TimerWheel(tick=0.05)
+    fired = []
+
+    def first(when):
+        fired.append(("first", wheel._current))
+        wheel.schedule(when, lambda _: fired.append(("nested", wheel._current)))
+
+    def setup(loop):
+        now = loop.time()
+        wheel.schedule(now, first)
+        wheel.schedule(now, lambda _: fired.append(("second", wheel._current)))
+
+    _run_wheel(wheel, setup)
+
+    assert [name for name, _ in fired] == ["first", "second", "nested"], f"Порядок срабатывания: {fired}"
+    assert len({tick for _, tick in fired}) == 1, f"Таймеры сработали в разных тиках: {fired}"
+
+
+def test_flow_stats_records_response_service_and_lag():
+    """
+    Проверяет замеры FlowStats: время ответа считается от запланированного
+    старта, обслуживание — от фактического, опоздание — между ними; ошибки
+    считаются по видам.
+    """
+    stats = FlowStats()
+    stats.add(intended=10.0, actual=10.002, finished=10.05)
+    stats.add(intended=11.0, actual=11.0, finished=11.01, error="HTTP 503")
+    stats.add(intended=12.0, actual=12.0, finished=12.01, error="HTTP 503")
+
+    assert stats.sent == 3
+    assert stats.errors == {"HTTP 503": 2}
+    assert abs(stats.response.max - 50_000) <= 1
+    assert abs(stats.service.max - 48_000) <= 1
+    assert abs(stats.lag.max - 2_000) <= 1
+    assert stats.lag.min == 0
+
+
+def test_open_loop_response_includes_start_lag():
+    """
+    Проверяет поправку на coordinated omission: если цикл событий занят и
+    запросы стартуют позже расписания, опоздание входит во время ответа
+    (response = service + lag), а не теряется.
+
+    Шаги:
+    1. Запустить открытую модель 100 запросов/с со сценарием, который блокирует цикл на 30 мс.
+    2. Проверить, что старты опаздывали и время ответа равно обслуживанию плюс опоздание.
+    """
+    async def blocking(ctx):
+        time.sleep(0.03)
+        return _Response()
+
+    runner = OpenLoopRunner({"blocking": blocking}, rate=100, duration=0.2, ctx={})
+    report = asyncio.run(runner.run())
+    stats = runner._stats["blocking"]
+
+    # 0.2 с по 10 мс — 20 стартов, последний может попасть или не попасть на границу
+    assert 19 <= stats.sent <= 21 and not stats.errors, f"Отправлено {stats.sent}, ошибки: {stats.errors}"
+    # Каждый вызов держит цикл 30 мс при интервале 10 мс — старты копят опоздание
+    assert stats.lag.max > 100_000, f"Опоздание старта: {stats.lag.max} мкс"
+    assert stats.service.max < stats.lag.max
+    assert abs(stats.response.total - (stats.service.total + stats.lag.total)) <= stats.sent, (
+        "Время ответа не равно обслуживанию плюс опоздание"
+    )
+    assert report.flows[0]["response_max_ms"] >= report.flows[0]["lag_max_ms"]
+
+
+def test_open_loop_report_renders_flow_without_samples():
+    """Проверяет, что отчёт по сценарию без замеров выводит прочерки вместо перцентилей."""
+    report = OpenLoopReport({"signin": FlowStats()}, elapsed=0.0, rate=0.5, peak_in_flight=0)
+
+    assert report.flows[0]["response_p50_ms"] is None
+    rendered = report.render()
+    assert "signin" in rendered and "—" in rendered
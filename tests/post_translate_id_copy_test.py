@@ -3,29 +3,29 @@ import pytest
 from api import requests
 
 
-def test_copy_translation_with_feedback(base_url, create_user_with_login, add_translation, delete_translation):
+def test_copy_translation_with_feedback(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет успешное копирование перевода по корректному ID, включая поле feedback.
 
     Шаги:
-    1. Создать пользователя.
-    2. Загрузить перевод.
+    1. Авторизоваться под пользователем.
+    2. Получить собственный перевод.
     3. Создать feedback для перевода.
     4. Выполнить запрос копирования перевода.
     5. Проверить, что сервер возвращает статус код 200.
     6. Проверить корректность полей в копии (измененные и неизмененные).
     7. Удалить копию и оригинальный перевод.
     """
-    # Шаг 1: Создать пользователя
-    user = create_user_with_login
+    # Шаг 1: Авторизоваться под пользователем
+    user = signin_user(os.getenv("EMPTY_BALANCE_USER_EMAIL"), os.getenv("EMPTY_BALANCE_USER_PASSWORD"))
     user_access_token = user["access_token"]
 
-    # Шаг 2: Загрузить перевод
+    # Шаг 2: Получить собственный перевод (копию общего оригинала — тест ставит ему оценку)
     current_dir = os.path.dirname(__file__)
     test_video_path = os.path.join(current_dir, "..", "data", "man_talking.mp4")
     test_video_path = os.path.abspath(test_video_path)
 
-    original_translation = add_translation(user_access_token, test_video_path)
+    original_translation = lease_translation(user_access_token, test_video_path)
     original_id = original_translation["id"]
 
     # Шаг 3: Создать feedback для перевода
@@ -117,7 +117,7 @@ def test_copy_translation_with_nonexistent_id(base_url, create_user_with_login):
 
 
 def test_copy_translation_from_other_user(
-    base_url, create_user_with_login, add_translation, delete_translation
+    base_url, create_user_with_login, lease_translation
 ):
     """
     Проверяет, что пользователь с ролью `user` не может создать копию задания,
@@ -137,7 +137,7 @@ def test_copy_translation_from_other_user(
     test_video_path = os.path.join(current_dir, "..", "data", "man_talking.mp4")
     test_video_path = os.path.abspath(test_video_path)
 
-    original_translation = add_translation(first_user_access_token, test_video_path)
+    original_translation = lease_translation(first_user_access_token, test_video_path, readonly=True)
     original_id = original_translation["id"]
 
     # Шаг 2: Авторизоваться вторым пользователем
@@ -167,9 +167,6 @@ def test_copy_translation_from_other_user(
         f"Ожидаемый статус код 404 (Not Found), получен: {copy_response.status_code}"
     )
 
-    # Удалить оригинальный перевод
-    delete_translation(first_user_access_token, original_id)
-
 
 def test_copy_translation_with_invalid_id(base_url, create_user_with_login):
     """
@@ -236,29 +233,29 @@ def test_copy_translation_without_authorization(base_url):
     )
 
 
-def test_response_structure_and_types_for_successful_copy(base_url, create_user_with_login, add_translation, delete_translation):
+def test_response_structure_and_types_for_successful_copy(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что тело ответа при успешном создании копии задания
     содержит все ключи и значения с правильными типами данных в соответствии с ожидаемой схемой.
 
     Шаги:
-    1. Создать пользователя.
-    2. Загрузить перевод.
+    1. Авторизоваться под пользователем.
+    2. Получить собственный перевод.
     3. Выполнить запрос на создание копии задания.
     4. Проверить структуру и типы данных в ответе.
     5. Удалить копию и оригинальный перевод.
     """
-    # Шаг 1: Создать пользователя
-    user = create_user_with_login
+    # Шаг 1: Авторизоваться под пользователем
+    user = signin_user(os.getenv("EMPTY_BALANCE_USER_EMAIL"), os.getenv("EMPTY_BALANCE_USER_PASSWORD"))
     user_access_token = user["access_token"]
 
-    # Шаг 2: Загрузить перевод
+    # Шаг 2: Получить собственный перевод
     current_dir = os.path.dirname(__file__)
     test_video_path = os.path.join(current_dir, "..", "data", "man_talking.mp4")
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    original_translation = add_translation(user_access_token, test_video_path)
+    original_translation = lease_translation(user_access_token, test_video_path)
     original_id = original_translation["id"]
 
     # Шаг 3: Выполнить запрос на создание копии задания
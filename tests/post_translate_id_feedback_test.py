@@ -3,6 +3,7 @@ import pytest
 from api import requests
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID", mode="write")
 def test_submit_feedback_with_valid_score(base_url, signin_user):
     """
     Проверяет, что пользователь может успешно отправить отзыв для завершенного перевода
@@ -52,6 +53,7 @@ def test_submit_feedback_with_valid_score(base_url, signin_user):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_submit_feedback_with_invalid_score(base_url, signin_user):
     """
     Проверяет, что сервер корректно обрабатывает запрос с некорректным значением оценки.
@@ -134,6 +136,7 @@ def test_submit_feedback_for_nonexistent_translation(base_url, signin_user):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_submit_feedback_for_foreign_translation(base_url, signin_user):
     """
     Проверяет, что пользователь не может оставить отзыв для перевода, который ему не принадлежит.
@@ -175,6 +178,7 @@ def test_submit_feedback_for_foreign_translation(base_url, signin_user):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_submit_feedback_without_authorization(base_url):
     """
     Проверяет, что сервер запрещает доступ к эндпоинту для отправки отзыва без авторизации.
@@ -208,6 +212,7 @@ def test_submit_feedback_without_authorization(base_url):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_submit_feedback_with_empty_body(base_url, signin_user):
     """
     Проверяет, что сервер корректно обрабатывает запрос с пустым телом при отправке отзыва.
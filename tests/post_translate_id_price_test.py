@@ -3,7 +3,8 @@ import pytest
 from api import requests
 
 
-def test_calculate_price_with_balance_correct_request(base_url, signin_user, add_translation, delete_translation):
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
+def test_calculate_price_with_balance_correct_request(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет расчет стоимости перевода на аккаунте с балансом и значение параметра need_money = False.
 
@@ -74,7 +75,7 @@ def test_calculate_price_with_balance_correct_request(base_url, signin_user, add
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     try:
@@ -117,7 +118,7 @@ def test_calculate_price_with_balance_correct_request(base_url, signin_user, add
         delete_translation(user_access_token, translation_id)
 
 
-def test_calculate_price_without_balance_correct_request(base_url, signin_user, add_translation, delete_translation):
+def test_calculate_price_without_balance_correct_request(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет расчет стоимости перевода на аккаунте без баланса и значение параметра need_money = True.
 
@@ -141,7 +142,7 @@ def test_calculate_price_without_balance_correct_request(base_url, signin_user,
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     try:
@@ -188,7 +189,7 @@ def test_calculate_price_without_balance_correct_request(base_url, signin_user,
         delete_translation(user_access_token, translation_id)
 
 
-def test_calculate_price_free_plan(base_url, signin_user, add_translation, delete_translation):
+def test_calculate_price_free_plan(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет расчет стоимости перевода для опций, доступных в бесплатном тарифе.
 
@@ -212,7 +213,7 @@ def test_calculate_price_free_plan(base_url, signin_user, add_translation, delet
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     try:
@@ -319,6 +320,7 @@ def test_calculate_price_with_invalid_translation_id(base_url, signin_user):
     )
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_calculate_price_without_authorization(base_url):
     """
     Проверяет реакцию сервера на запрос расчета стоимости без авторизации.
@@ -4,6 +4,7 @@ from api import requests
 import time
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID", mode="write")
 def test_upload_valid_subtitle_string(base_url, signin_user):
     """
     Проверяет успешную передачу корректного содержимого субтитров в формате VTT с уникальным текстом.
@@ -227,6 +228,7 @@ The ID should be numeric.
     ), "Ответ не содержит ожидаемую ошибку в поле 'id'"
 
 
+@pytest.mark.uses("translation:TRANSLATION_ID")
 def test_upload_subtitle_without_authorization(base_url):
     """
     Проверяет реакцию сервера на передачу субтитров без авторизации.
@@ -285,8 +287,9 @@ This request should fail.
     )
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 @pytest.mark.xfail(reason="Сервер возвращает 500 вместо 403 (баг)")
-def test_upload_subtitle_for_foreign_translation(base_url, signin_user, add_translation, delete_translation):
+def test_upload_subtitle_for_foreign_translation(base_url, signin_user, lease_translation):
     """
     Проверяет, что пользователь с ролью `user` не может передать субтитры для перевода, принадлежащего другому пользователю.
 
@@ -298,7 +301,6 @@ def test_upload_subtitle_for_foreign_translation(base_url, signin_user, add_tran
     5. Выполнить запрос на добавление субтитров в перевод, созданный другим пользователем.
     6. Проверить, что сервер возвращает статус код 403.
     7. Проверить, что тело ответа содержит описание ошибки.
-    8. Удалить созданный перевод.
     """
 
     # Шаг 1: Логин под пользователем с балансом
@@ -312,18 +314,17 @@ def test_upload_subtitle_for_foreign_translation(base_url, signin_user, add_tran
     test_video_path = os.path.join(current_dir, "..", "data", "man_talking.mp4")
     test_video_path = os.path.abspath(test_video_path)
 
-    translation = add_translation(balance_user_access_token, test_video_path)
+    translation = lease_translation(balance_user_access_token, test_video_path, readonly=True)
     translation_id = translation["id"]
 
-    try:
-        # Шаг 3: Логин под другим пользователем без баланса
-        empty_balance_email = os.getenv("EMPTY_BALANCE_USER_EMAIL")
-        empty_balance_password = os.getenv("EMPTY_BALANCE_USER_PASSWORD")
-        empty_balance_user = signin_user(empty_balance_email, empty_balance_password)
-        empty_balance_user_access_token = empty_balance_user["access_token"]
+    # Шаг 3: Логин под другим пользователем без баланса
+    empty_balance_email = os.getenv("EMPTY_BALANCE_USER_EMAIL")
+    empty_balance_password = os.getenv("EMPTY_BALANCE_USER_PASSWORD")
+    empty_balance_user = signin_user(empty_balance_email, empty_balance_password)
+    empty_balance_user_access_token = empty_balance_user["access_token"]
 
-        # Шаг 4: Генерация содержимого VTT-файла
-        subtitle_content = f"""WEBVTT
+    # Шаг 4: Генерация содержимого VTT-файла
+    subtitle_content = f"""WEBVTT
 
 1
 00:00:00.000 --> 00:00:02.000
@@ -334,37 +335,34 @@ This is a foreign translation test.
 Access should be denied.
 """
 
-        payload = {
-            "id": translation_id,
-            "vtt": subtitle_content  # Передача содержимого VTT как строки
-        }
-
-        headers = {
-            "Authorization": f"Bearer {empty_balance_user_access_token}",
-            "accept": "application/json",
-            "Content-Type": "application/json"
-        }
-
-        # Шаг 5: Выполнить запрос
-        response = requests.post_request(
-            f"{base_url}/translate/{translation_id}/rusub/",
-            headers=headers,
-            json=payload
-        )
-
-        # Шаг 6: Проверить, что сервер возвращает статус код 403
-        assert response.status_code == 403, (
-            f"Ожидаемый статус код 403, получен: {response.status_code}"
-        )
-
-        # Шаг 7: Проверить, что тело ответа содержит описание ошибки
-        response_data = response.json()
-        assert "detail" in response_data, "Ответ не содержит ключ 'detail' с описанием ошибки"
-        assert response_data["detail"] == "Permission denied", (
-            f"Ожидалось сообщение 'Permission denied', получено: {response_data['detail']}"
-        )
-    finally:
-        # Шаг 8: Удалить созданный перевод
-        delete_translation(balance_user_access_token, translation_id)
+    payload = {
+        "id": translation_id,
+        "vtt": subtitle_content  # Передача содержимого VTT как строки
+    }
+
+    headers = {
+        "Authorization": f"Bearer {empty_balance_user_access_token}",
+        "accept": "application/json",
+        "Content-Type": "application/json"
+    }
+
+    # Шаг 5: Выполнить запрос
+    response = requests.post_request(
+        f"{base_url}/translate/{translation_id}/rusub/",
+        headers=headers,
+        json=payload
+    )
+
+    # Шаг 6: Проверить, что сервер возвращает статус код 403
+    assert response.status_code == 403, (
+        f"Ожидаемый статус код 403, получен: {response.status_code}"
+    )
+
+    # Шаг 7: Проверить, что тело ответа содержит описание ошибки
+    response_data = response.json()
+    assert "detail" in response_data, "Ответ не содержит ключ 'detail' с описанием ошибки"
+    assert response_data["detail"] == "Permission denied", (
+        f"Ожидалось сообщение 'Permission denied', получено: {response_data['detail']}"
+    )
 
 
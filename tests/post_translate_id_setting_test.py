@@ -3,8 +3,9 @@ import pytest
 from api import requests
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_successful_setting_and_start_translation_with_balance_check(
-        base_url, signin_user, add_translation, delete_translation):
+        base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что авторизованный пользователь с достаточным балансом может успешно
     применить корректные настройки и запустить перевод. Если баланс меньше 1000, он пополняется.
@@ -57,7 +58,7 @@ def test_successful_setting_and_start_translation_with_balance_check(
     test_video_path = os.path.join(current_dir, "..", "data", "man_talking.mp4")
     test_video_path = os.path.abspath(test_video_path)
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 4: Установить настройки перевода
@@ -95,7 +96,7 @@ def test_successful_setting_and_start_translation_with_balance_check(
 
 
 def test_translation_settings_insufficient_balance(
-    base_url, signin_user, add_translation, delete_translation
+    base_url, signin_user, lease_translation, delete_translation
 ):
     """
     Проверяет попытку запуска перевода с недостаточным балансом.
@@ -119,7 +120,7 @@ def test_translation_settings_insufficient_balance(
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Попытка настройки и запуска перевода
@@ -160,8 +161,9 @@ def test_translation_settings_insufficient_balance(
     delete_translation(user_access_token, translation_id)
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 def test_admin_start_translation_with_other_user_data(
-    base_url, create_user_with_login, add_translation, delete_translation, signin_user
+    base_url, create_user_with_login, lease_translation, delete_translation, signin_user
 ):
     """
     Проверяет, что администратор может выполнить запрос с настройками перевода другого пользователя,
@@ -189,7 +191,7 @@ def test_admin_start_translation_with_other_user_data(
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Логин под администратором
@@ -350,7 +352,8 @@ def test_set_translation_settings_with_invalid_id(base_url, signin_user):
     assert "detail" in response_data, "Ответ не содержит описание ошибки"
 
 
-def test_set_translation_settings_response_structure(base_url, signin_user, add_translation, delete_translation):
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
+def test_set_translation_settings_response_structure(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет структуру ответа при успешной установке настроек перевода.
 
@@ -374,7 +377,7 @@ def test_set_translation_settings_response_structure(base_url, signin_user, add_
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Установить настройки перевода
@@ -443,8 +446,9 @@ def test_set_translation_settings_response_structure(base_url, signin_user, add_
     delete_translation(user_access_token, translation_id)
 
 
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
 @pytest.mark.xfail(reason="Баг на бэкенде: сервер возвращает 500 при частично заполненных настройках")
-def test_set_translation_partial_settings(base_url, signin_user, add_translation, delete_translation):
+def test_set_translation_partial_settings(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что сервер корректно обрабатывает запрос с частичным заполнением настроек.
 
@@ -469,7 +473,7 @@ def test_set_translation_partial_settings(base_url, signin_user, add_translation
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Отправить запрос на установку настроек с частично заполненным телом
@@ -526,7 +530,8 @@ def test_set_translation_partial_settings(base_url, signin_user, add_translation
     delete_translation(user_access_token, translation_id)
 
 
-def test_set_translation_invalid_language(base_url, signin_user, add_translation, delete_translation):
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
+def test_set_translation_invalid_language(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что сервер возвращает ошибку при указании некорректного значения языка.
 
@@ -551,7 +556,7 @@ def test_set_translation_invalid_language(base_url, signin_user, add_translation
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Отправить запрос на установку настроек с некорректным значением языка
@@ -603,7 +608,8 @@ def test_set_translation_invalid_language(base_url, signin_user, add_translation
     delete_translation(user_access_token, translation_id)
 
 
-def test_set_translation_invalid_voice_clone(base_url, signin_user, add_translation, delete_translation):
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
+def test_set_translation_invalid_voice_clone(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что сервер возвращает ошибку при указании некорректного значения для voice_clone.
 
@@ -628,7 +634,7 @@ def test_set_translation_invalid_voice_clone(base_url, signin_user, add_translat
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Отправить запрос на установку настроек с некорректным значением voice_clone
@@ -679,7 +685,8 @@ def test_set_translation_invalid_voice_clone(base_url, signin_user, add_translat
     delete_translation(user_access_token, translation_id)
 
 
-def test_set_translation_invalid_voice_gender(base_url, signin_user, add_translation, delete_translation):
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
+def test_set_translation_invalid_voice_gender(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что сервер возвращает ошибку при указании некорректного значения для voice_gender.
 
@@ -704,7 +711,7 @@ def test_set_translation_invalid_voice_gender(base_url, signin_user, add_transla
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Отправить запрос на установку настроек с некорректным значением voice_gender
@@ -756,7 +763,8 @@ def test_set_translation_invalid_voice_gender(base_url, signin_user, add_transla
     delete_translation(user_access_token, translation_id)
 
 
-def test_set_translation_invalid_voice_gender(base_url, signin_user, add_translation, delete_translation):
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
+def test_set_translation_invalid_voice_gender(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что сервер возвращает ошибку при указании некорректного значения для voice_gender.
 
@@ -781,7 +789,7 @@ def test_set_translation_invalid_voice_gender(base_url, signin_user, add_transla
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Отправить запрос на установку настроек с некорректным значением voice_gender
@@ -837,7 +845,8 @@ def test_set_translation_invalid_voice_gender(base_url, signin_user, add_transla
     delete_translation(user_access_token, translation_id)
 
 
-def test_invalid_http_method_on_settings_endpoint(base_url, signin_user, add_translation, delete_translation):
+@pytest.mark.uses("user:SOME_BALANCE_USER_EMAIL", mode="write")
+def test_invalid_http_method_on_settings_endpoint(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что сервер возвращает ошибку при использовании некорректного HTTP-метода (GET вместо POST).
 
@@ -861,7 +870,7 @@ def test_invalid_http_method_on_settings_endpoint(base_url, signin_user, add_tra
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Отправить запрос на установку настроек с использованием метода GET
@@ -883,7 +892,7 @@ def test_invalid_http_method_on_settings_endpoint(base_url, signin_user, add_tra
     delete_translation(user_access_token, translation_id)
 
 
-def test_translation_with_free_settings(base_url, signin_user, add_translation, delete_translation):
+def test_translation_with_free_settings(base_url, signin_user, lease_translation, delete_translation):
     """
     Проверяет, что перевод с бесплатными параметрами выполняется успешно даже при отсутствии средств на балансе.
 
@@ -907,7 +916,7 @@ def test_translation_with_free_settings(base_url, signin_user, add_translation,
     test_video_path = os.path.abspath(test_video_path)
     assert os.path.exists(test_video_path), f"Файл {test_video_path} не найден"
 
-    translation = add_translation(user_access_token, test_video_path)
+    translation = lease_translation(user_access_token, test_video_path)
     translation_id = translation["id"]
 
     # Шаг 3: Отправить запрос на установку бесплатных параметров
@@ -0,0 +1,181 @@
+import os
+import pytest
+from api import requests
+from api.chunked_upload import ChunkedUploader, ChunkUploadError, Manifest, file_sha256
+from api.download import download
+
+CHUNK_SIZE = 256 * 1024
+
+
+def test_chunked_upload_success(base_url, standin_server, create_user_with_login, synthetic_media,
+                                delete_translation, tmp_path):
+    """
+    Проверяет загрузку видео частями через сессию загрузки.
+
+    Шаги:
+    1. Авторизоваться под пользователем.
+    2. Сгенерировать MP4 размером чуть больше 1 МБ (последняя часть неполная).
+    3. Загрузить файл частями по 256 КБ в три потока.
+    4. Проверить, что создан перевод с длиной видео, равной длительности файла.
+    5. Проверить, что скачанное исходное видео совпадает с файлом по sha256.
+    6. Проверить, что манифест загрузки удалён.
+    """
+    # Шаг 1: Авторизация пользователя
+    user = create_user_with_login
+    user_access_token = user["access_token"]
+
+    # Шаг 2: Генерация видео
+    test_video_path = synthetic_media(container="mp4", duration=6, size=4 * CHUNK_SIZE + 100)
+
+    # Шаг 3: Загрузка частями
+    uploader = ChunkedUploader(base_url, user_access_token, chunk_size=CHUNK_SIZE, workers=3,
+                               manifest_dir=str(tmp_path))
+    translation = uploader.upload(test_video_path)
+    try:
+        assert uploader.stats["sent"] == 5, f"Ожидалось 5 частей, отправлено: {uploader.stats}"
+        assert uploader.stats["bytes"] == os.path.getsize(test_video_path)
+
+        # Шаг 4: Проверка перевода
+        assert translation["id"] > 0
+        assert abs(translation["video"]["length"] - 6) < 0.1, (
+            f"Ожидаемая длина видео 6 с, получена: {translation['video']['length']}"
+        )
+
+        # Шаг 5: Сверка содержимого
+        response = download(
+            f"{base_url}/translate/{translation['id']}/download/video_origin/",
+            headers={"Authorization": f"Bearer {user_access_token}"}
+        )
+        assert response.status_code == 200
+        assert response.sha256 == file_sha256(test_video_path), "Собранный файл не совпадает с исходным"
+
+        # Шаг 6: Манифест удалён после успешной загрузки
+        assert not os.listdir(tmp_path), f"Остались манифесты: {os.listdir(tmp_path)}"
+    finally:
+        delete_translation(user_access_token, translation["id"])
+
+
+def test_chunked_upload_retries_failed_chunk(base_url, standin_server, create_user_with_login, synthetic_media,
+                                             delete_translation, tmp_path):
+    """
+    Проверяет, что часть, на которую сервер ответил 503, отправляется повторно.
+
+    Шаги:
+    1. Настроить заглушку: два раза ответить 503 на часть 1.
+    2. Загрузить файл частями с тремя попытками на часть.
+    3. Проверить, что загрузка успешна и было ровно два повтора.
+    """
+    user = create_user_with_login
+    user_access_token = user["access_token"]
+    test_video_path = synthetic_media(container="mp4", duration=3, size=3 * CHUNK_SIZE)
+
+    # Шаг 1: Сбои на части 1
+    standin_server.state.chunk_faults[1] = 2
+    try:
+        # Шаг 2: Загрузка с повторами
+        uploader = ChunkedUploader(base_url, user_access_token, chunk_size=CHUNK_SIZE, workers=2, attempts=3,
+                                   backoff=0.01, manifest_dir=str(tmp_path))
+        translation = uploader.upload(test_video_path)
+    finally:
+        standin_server.state.chunk_faults.clear()
+
+    # Шаг 3: Проверки
+    try:
+        assert translation["id"] > 0
+        assert uploader.stats["retries"] == 2, f"Ожидалось 2 повтора, получено: {uploader.stats}"
+        assert uploader.stats["sent"] == 3
+    finally:
+        delete_translation(user_access_token, translation["id"])
+
+
+def test_chunked_upload_resumes_from_manifest(base_url, standin_server, create_user_with_login, synthetic_media,
+                                              delete_translation, tmp_path):
+    """
+    Проверяет продолжение оборванной загрузки по манифесту на диске.
+
+    Шаги:
+    1. Настроить заглушку так, чтобы часть 2 не принималась.
+    2. Запустить загрузку и проверить, что она завершается ChunkUploadError.
+    3. Проверить, что в манифесте записаны все части, кроме 2.
+    4. Снять сбой и повторить загрузку новым клиентом.
+    5. Проверить, что отправлена только недостающая часть и перевод создан.
+    """
+    user = create_user_with_login
+    user_access_token = user["access_token"]
+    test_video_path = synthetic_media(container="mp4", duration=4, size=4 * CHUNK_SIZE)
+
+    # Шаги 1-2: Оборванная загрузка
+    standin_server.state.chunk_faults[2] = 100
+    try:
+        uploader = ChunkedUploader(base_url, user_access_token, chunk_size=CHUNK_SIZE, workers=2, attempts=2,
+                                   backoff=0.01, manifest_dir=str(tmp_path))
+        with pytest.raises(ChunkUploadError, match="часть 2"):
+            uploader.upload(test_video_path)
+    finally:
+        standin_server.state.chunk_faults.clear()
+
+    # Шаг 3: Состояние манифеста
+    manifest = Manifest.for_file(test_video_path, base_url, CHUNK_SIZE, str(tmp_path))
+    assert manifest.data["upload_id"], "В манифесте нет сессии загрузки"
+    assert manifest.received == {0, 1, 3}, f"Ожидались части 0, 1, 3, в манифесте: {manifest.received}"
+
+    # Шаги 4-5: Продолжение загрузки
+    resumed = ChunkedUploader(base_url, user_access_token, chunk_size=CHUNK_SIZE, workers=2,
+                              manifest_dir=str(tmp_path))
+    translation = resumed.upload(test_video_path)
+    try:
+        assert resumed.stats["sent"] == 1 and resumed.stats["skipped"] == 3, (
+            f"Ожидалась отправка только части 2, статистика: {resumed.stats}"
+        )
+        assert translation["id"] > 0
+    finally:
+        delete_translation(user_access_token, translation["id"])
+
+
+def test_chunked_upload_rejects_invalid_chunks(base_url, standin_server, create_user_with_login):
+    """
+    Проверяет проверки сервера при загрузке частями.
+
+    Шаги:
+    1. Открыть сессию загрузки файла из двух частей.
+    2. Отправить часть с неверной контрольной суммой и проверить статус 400.
+    3. Отправить часть неверного размера и проверить статус 400.
+    4. Завершить загрузку без частей и проверить статус 409.
+    """
+    user = create_user_with_login
+    headers = {
+        "Authorization": f"Bearer {user['access_token']}",
+        "accept": "application/json",
+    }
+
+    # Шаг 1: Сессия загрузки
+    response = requests.post_request(
+        f"{base_url}/translate/upload/session/",
+        json={"filename": "video.mp4", "size": CHUNK_SIZE + 10, "chunk_size": CHUNK_SIZE},
+        headers=headers
+    )
+    assert response.status_code == 200, (
+        f"Ожидаемый статус код 200, получен: {response.status_code}, {response.text}"
+    )
+    upload = response.json()
+    assert upload["chunks"] == 2 and upload["received"] == []
+    chunk_url = f"{base_url}/translate/upload/{upload['upload_id']}/chunk"
+
+    # Шаг 2: Неверная контрольная сумма
+    response = requests.put_request(
+        f"{chunk_url}/0/", data=bytes(CHUNK_SIZE), headers=dict(headers, **{"X-Chunk-Sha256": "0" * 64})
+    )
+    assert response.status_code == 400, f"Ожидаемый статус код 400, получен: {response.status_code}"
+    assert response.json() == {"detail": "Chunk checksum mismatch"}
+
+    # Шаг 3: Неверный размер последней части
+    response = requests.put_request(f"{chunk_url}/1/", data=bytes(11), headers=headers)
+    assert response.status_code == 400, f"Ожидаемый статус код 400, получен: {response.status_code}"
+    assert response.json() == {"detail": "Invalid chunk size: expected 10, got 11"}
+
+    # Шаг 4: Завершение без частей
+    response = requests.post_request(
+        f"{base_url}/translate/upload/{upload['upload_id']}/complete/", headers=headers
+    )
+    assert response.status_code == 409, f"Ожидаемый статус код 409, получен: {response.status_code}"
+    assert response.json() == {"detail": "Missing chunks: [0, 1]"}
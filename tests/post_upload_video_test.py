@@ -178,3 +178,70 @@ def test_upload_without_authorization(base_url):
     assert response_data["detail"] == "Not authenticated", (
         f"Ожидаемое сообщение об ошибке 'Not authenticated', получено: {response_data['detail']}"
     )
+
+
+def test_successful_synthetic_webm_upload(base_url, standin_server, create_user_with_login, synthetic_media,
+                                          add_translation, delete_translation):
+    """
+    Проверяет загрузку видео в формате WebM, сгенерированного utils/media.py.
+
+    Шаги:
+    1. Авторизоваться под пользователем.
+    2. Сгенерировать WebM длительностью 4 секунды и размером 300 КБ.
+    3. Загрузить файл и проверить, что возвращается статус код 200.
+    4. Проверить, что длина видео в ответе совпадает с длительностью файла.
+    """
+    # Шаг 1: Авторизация пользователя
+    user = create_user_with_login
+    user_access_token = user["access_token"]
+
+    # Шаг 2: Генерация видео (повторные запуски берут файл из кэша)
+    test_video_path = synthetic_media(container="webm", duration=4, size=300 * 1024)
+    assert os.path.getsize(test_video_path) == 300 * 1024
+
+    # Шаг 3: Загрузка видео
+    translation = add_translation(user_access_token, test_video_path, mime_type="video/webm")
+    try:
+        # Шаг 4: Проверка длины видео
+        video_data = translation.get("video", {})
+        assert abs(video_data["length"] - 4) < 0.1, (
+            f"Ожидаемая длина видео 4 с, получена: {video_data['length']}"
+        )
+    finally:
+        delete_translation(user_access_token, translation["id"])
+
+
+def test_upload_corrupted_video(base_url, standin_server, create_user_with_login, synthetic_media):
+    """
+    Проверяет, что сервер отклоняет видео с повреждённым заголовком контейнера.
+
+    Шаги:
+    1. Авторизоваться под пользователем.
+    2. Сгенерировать MP4, у которого затёрта сигнатура ftyp.
+    3. Проверить, что сервер возвращает статус код 400 и "detail": "Invalid file type".
+    """
+    # Шаг 1: Авторизация пользователя
+    user = create_user_with_login
+    user_access_token = user["access_token"]
+    headers = {
+        "Authorization": f"Bearer {user_access_token}",
+        "accept": "application/json",
+    }
+
+    # Шаг 2: Генерация повреждённого видео
+    test_video_path = synthetic_media(container="mp4", duration=2, variant="corrupt")
+
+    with open(test_video_path, "rb") as f:
+        response = requests.post_request(
+            f"{base_url}/translate/upload/",
+            headers=headers,
+            files={"upload": (os.path.basename(test_video_path), f, "video/mp4")}
+        )
+
+    # Шаг 3: Проверки ответа
+    assert response.status_code == 400, (
+        f"Ожидаемый статус код 400, получен: {response.status_code}"
+    )
+    assert response.json() == {"detail": "Invalid file type"}, (
+        f"Ожидаемое сообщение об ошибке 'Invalid file type', получено: {response.json()}"
+    )
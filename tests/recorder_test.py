@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from utils.recorder import current_test, path_template
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("http://host/translate/123/setting/", "/translate/{id}/setting"),
+    ("http://host/translate/abc/rusub/", "/translate/{id}/rusub"),
+    ("http://host/translate/upload/", "/translate/upload"),
+    ("http://host/translate/upload/session/", "/translate/upload/session"),
+    ("http://host/translate/upload/up-1/chunk/3", "/translate/upload/{id}/chunk/{id}"),
+    ("http://host/user/me/?limit=5", "/user/me"),
+    ("http://host/user/transactions/count/", "/user/transactions/count"),
+    ("http://host/user/someone/", "/user/{id}"),
+    ("http://host/transaction/tx/", "/transaction/{id}"),
+    ("http://host/", "/"),
+])
+def test_path_template(url, expected):
+    """Проверяет шаблон пути: без query и завершающего слэша, сегменты после коллекций — {id}, кроме постоянных подпутей."""
+    assert path_template(url) == expected
+
+
+def test_current_test_only_in_test_context(request):
+    """
+    Проверяет, что вызовы относятся к тесту только в его собственном контексте.
+
+    Шаги:
+    1. Проверить, что в потоке теста current_test() — nodeid теста.
+    2. Проверить, что в потоке, запущенном без контекста теста, current_test() — None.
+    """
+    assert current_test() == request.node.nodeid
+
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(current_test()))
+    thread.start()
+    thread.join()
+
+    assert seen == [None], "Фоновый поток унаследовал тест"
@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from load import upload_bench
+from load.upload_bench import UploadBenchmark, compare, parse_size
+
+
+def _row(mb_per_s, p99_ms, mode="single", size=1024 ** 2, concurrency=4):
+    return {"mode": mode, "size": size, "concurrency": concurrency, "mb_per_s": mb_per_s, "p99_ms": p99_ms}
+
+
+def _baseline(*rows):
+    return {"saved_at": "20260101_120000", "commit": "abc1234", "results": list(rows)}
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("512K", 512 * 1024),
+    ("16M", 16 * 1024 ** 2),
+    ("1G", 1024 ** 3),
+    ("1.5M", 1536 * 1024),
+    ("16mb", 16 * 1024 ** 2),
+    (" 8K ", 8 * 1024),
+    ("2048", 2048),
+])
+def test_parse_size(value, expected):
+    """Проверяет разбор размеров: суффиксы K, M, G в любом регистре, необязательный B, дробные значения и байты."""
+    assert parse_size(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "M", "16X", "много"])
+def test_parse_size_rejects_invalid(value):
+    """Проверяет, что нераспознанный размер завершается ValueError."""
+    with pytest.raises(ValueError):
+        parse_size(value)
+
+
+def test_compare_reports_changes_per_configuration():
+    """
+    Проверяет отчёт сравнения с базовым прогоном.
+
+    Шаги:
+    1. Сравнить три конфигурации: есть в базовом прогоне, нет в нём и с нулевой базовой скоростью.
+    2. Проверить изменения в процентах, прочерк там, где изменение не считается, и строку про новую конфигурацию.
+    3. Проверить, что прогон без поля mode сопоставляется однозапросной загрузке.
+    """
+    baseline = _baseline(
+        {key: value for key, value in _row(100.0, 50.0).items() if key != "mode"},
+        _row(0.0, 50.0, concurrency=8),
+    )
+    rows = [_row(110.0, 40.0), _row(10.0, 50.0, concurrency=8), _row(5.0, 50.0, mode="chunked")]
+
+    lines, regressions = compare(baseline, rows)
+
+    assert lines[0] == "Сравнение с 20260101_120000 (abc1234)"
+    assert "+10.0%" in lines[1] and "-20.0%" in lines[1], f"Строка сравнения: {lines[1]}"
+    assert "—" in lines[2] and "+0.0%" in lines[2], f"Строка сравнения: {lines[2]}"
+    assert lines[3].strip().startswith("chunked") and lines[3].endswith("нет в базовом прогоне")
+    assert regressions == [], "Без threshold регрессии не считаются"
+
+
+@pytest.mark.parametrize("mb_per_s, p99_ms, expected", [
+    (80.0, 50.0, ["single      1M × 4: MB/s -20.0%"]),
+    (100.0, 65.0, ["single      1M × 4: p99 +30.0%"]),
+    (70.0, 70.0, ["single      1M × 4: MB/s -30.0%", "single      1M × 4: p99 +40.0%"]),
+    (85.0, 57.5, []),
+    (130.0, 20.0, []),
+])
+def test_compare_threshold(mb_per_s, p99_ms, expected):
+    """
+    Проверяет порог регрессий: падение MB/s или рост p99 больше threshold
+    процентов — регрессия, изменение ровно на порог и улучшения — нет.
+    """
+    _, regressions = compare(_baseline(_row(100.0, 50.0)), [_row(mb_per_s, p99_ms)], threshold=15)
+
+    assert regressions == expected
+
+
+def test_configuration_rates_count_successes_and_errors_separately(monkeypatch):
+    """
+    Проверяет, что MB/s и загрузки в секунду считаются по успешным загрузкам,
+    а ошибки — отдельной частотой.
+
+    Шаги:
+    1. Подменить загрузку так, чтобы каждая третья завершалась ошибкой.
+    2. Проверить число загрузок и ошибок.
+    3. Проверить, что MB/s и загрузки в секунду соответствуют успешным загрузкам, а частота ошибок — ошибкам.
+    """
+    class FailingBenchmark(UploadBenchmark):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.calls = 0
+
+        def _upload(self, mode, file_path, uploaded):
+            with self._lock:
+                self.calls += 1
+                call = self.calls
+            time.sleep(0.005)
+            return 0.005, "HTTP 503" if call % 3 == 0 else None
+
+    monkeypatch.setattr(upload_bench.media, "path", lambda spec: "unused.mp4")
+    size = 1024 ** 2
+    benchmark = FailingBenchmark("http://unused", "token", [size], [1], rounds=9, warmup=0)
+
+    row = benchmark._configuration("single", size, 1)
+
+    assert row["uploads"] == 9 and row["errors"] == 3 and row["error_kinds"] == {"HTTP 503": 3}
+    elapsed = row["elapsed_s"]
+    assert row["uploads_per_s"] * elapsed == pytest.approx(6, rel=0.05), f"Строка результата: {row}"
+    assert row["errors_per_s"] * elapsed == pytest.approx(3, rel=0.05), f"Строка результата: {row}"
+    assert row["mb_per_s"] == pytest.approx(row["uploads_per_s"], rel=0.05), "MB/s не совпадает с успешными загрузками 1 МБ"
+    assert "3 × HTTP 503" in upload_bench.render([row])
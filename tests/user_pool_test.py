@@ -0,0 +1,83 @@
+import os
+import time
+
+from api import requests
+from utils.user_pool import UserPool
+
+
+def _ready_ids(pool):
+    return [user["id"] for user in list(pool._ready.queue) if isinstance(user, dict)]
+
+
+def _wait_ready(pool, user_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if user_id in _ready_ids(pool):
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_untouched_user_returns_to_pool_with_same_token(base_url, standin_server):
+    """
+    Проверяет, что пользователь, которого тест только читал, возвращается
+    в пул сразу и с тем же токеном, без сброса профиля.
+
+    Шаги:
+    1. Взять пользователя из пула и прочитать его профиль.
+    2. Вернуть пользователя и проверить, что он сразу стоит в очереди с тем же токеном.
+    """
+    pool = UserPool(base_url, size=1)
+    try:
+        user = pool.lease()
+        headers = {"Authorization": f"Bearer {user['access_token']}", "accept": "application/json"}
+        assert requests.get_request(f"{base_url}/user/me/", headers=headers).status_code == 200
+
+        pool.release(user["id"])
+
+        returned = [ready for ready in list(pool._ready.queue) if isinstance(ready, dict) and ready["id"] == user["id"]]
+        assert returned, "Нетронутый пользователь не вернулся в пул сразу"
+        assert returned[0]["access_token"] == user["access_token"]
+    finally:
+        pool.close()
+
+
+def test_changed_user_is_reset_or_dropped(base_url, standin_server, synthetic_media):
+    """
+    Проверяет учёт изменений выданных пользователей.
+
+    Шаги:
+    1. Отклонённый запрос (422) не отмечает пользователя изменённым.
+    2. Изменение профиля отмечает пользователя для сброса; после сброса он возвращается в пул.
+    3. Загрузка перевода отмечает пользователя как невозвратного; в пул он не возвращается.
+    """
+    pool = UserPool(base_url, size=1)
+    try:
+        # Шаги 1-2: Профиль
+        user = pool.lease()
+        headers = {"Authorization": f"Bearer {user['access_token']}", "accept": "application/json"}
+        rejected = requests.patch_request(f"{base_url}/user/me/", json={"firstname": 5}, headers=headers)
+        assert rejected.status_code == 422, f"Ожидаемый статус код 422, получен: {rejected.status_code}"
+        assert user["id"] not in pool._changed, "Отклонённый запрос отметил пользователя изменённым"
+
+        response = requests.patch_request(f"{base_url}/user/me/", json={"firstname": "Changed"}, headers=headers)
+        assert response.status_code == 200
+        assert pool._changed[user["id"]] == "reset"
+        pool.release(user["id"])
+        assert _wait_ready(pool, user["id"]), "Пользователь после сброса профиля не вернулся в пул"
+
+        # Шаг 3: Перевод
+        uploader = pool.lease()
+        headers = {"Authorization": f"Bearer {uploader['access_token']}", "accept": "application/json"}
+        file_path = synthetic_media(container="mp4", duration=1)
+        with open(file_path, "rb") as f:
+            response = requests.post_request(
+                f"{base_url}/translate/upload/", headers=headers,
+                files={"upload": (os.path.basename(file_path), f, "video/mp4")}
+            )
+        assert response.status_code == 200
+        assert pool._changed[uploader["id"]] == "drop"
+        pool.release(uploader["id"])
+        assert not _wait_ready(pool, uploader["id"], timeout=0.5), "Пользователь с переводом вернулся в пул"
+    finally:
+        pool.close()
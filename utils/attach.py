@@ -1,52 +1,99 @@
 import logging
+import os
 from curlify import to_curl
 from requests import Response
 
+logger = logging.getLogger(__name__)
 
-def response_logging(response: Response):
-    logging.info("Request: " + response.request.url)
+# Сколько байт тела запроса/ответа попадает в лог; остальное обрезается
+BODY_LIMIT = int(os.getenv("LOG_BODY_LIMIT") or 4096)
 
-    if response.request.body:
-        if isinstance(response.request.body, bytes):
-            logging.info("[INFO] Тело запроса содержит бинарные данные и не будет декодировано.")
-        else:
-            logging.info("Request body: " + str(response.request.body))
+TEXT_CONTENT_TYPES = ("text/", "application/json", "application/xml", "application/x-www-form-urlencoded", "+json", "+xml")
 
-    logging.info(f"Status code: {response.status_code}")
 
-    try:
-        logging.info("Response body: " + response.text)
-    except Exception as e:
-        logging.error(f"[ERROR] Ошибка при логировании тела ответа: {e}")
+def configure(body_limit):
+    """Меняет лимит длины тела в логе (в байтах)."""
+    global BODY_LIMIT
+    BODY_LIMIT = body_limit
 
 
-def request_attaching(response: Response):
-    try:
-        if response.request.body and isinstance(response.request.body, bytes):
-            logging.info("[INFO] Пропущена генерация cURL для запроса с бинарным телом (binary data).")
-            return
+def _is_text(content_type):
+    content_type = (content_type or "").lower()
+    return any(marker in content_type for marker in TEXT_CONTENT_TYPES)
 
-        curl = to_curl(response.request)
-        logging.info(curl)
 
-    except Exception as e:
-        logging.error(f"[ERROR] Ошибка при генерации cURL: {e}")
+def _truncate(text, size):
+    if size <= BODY_LIMIT:
+        return text
+    return f"{text} ... [обрезано, всего {size} байт]"
+
+
+def _request_is_text(request):
+    # JSON requests кодирует в bytes, поэтому смотрим на Content-Type, а не на тип тела
+    body = request.body
+    return isinstance(body, str) or _is_text(request.headers.get("Content-Type"))
 
-    logging.info(f'Status code: {response.status_code}')
 
+def _request_body(request):
+    body = request.body
+    if not _request_is_text(request):
+        return f"<бинарные данные, {len(body)} байт>"
+    if isinstance(body, bytes):
+        return _truncate(body[:BODY_LIMIT].decode("utf-8", errors="replace"), len(body))
+    return _truncate(body[:BODY_LIMIT], len(body))
 
-def response_attaching(response: Response):
-    logging.info("Request URL: " + response.request.url)
 
-    if response.request.body:
-        if isinstance(response.request.body, bytes):
-            logging.info("[INFO] Тело запроса содержит бинарные данные и не будет декодировано.")
-        else:
-            logging.info("Request Body: " + str(response.request.body))
+def body_size(response: Response):
+    """Размер тела ответа; у потоковых загрузок (api/download.py) тело в памяти не хранится."""
+    size = getattr(response, "body_size", None)
+    return size if size is not None else len(response.content or b"")
 
-    logging.info(f"Status Code: {response.status_code}")
 
+def _response_body(response: Response):
+    content_type = response.headers.get("Content-Type")
+    size = body_size(response)
+    if not size:
+        return ""
+    if not _is_text(content_type):
+        # Видео, картинки и прочее бинарное не декодируем
+        return f"<{content_type or 'без Content-Type'}, {size} байт>"
+    # Декодируется только попадающий в лог кусок, а не весь ответ
+    text = response.content[:BODY_LIMIT].decode(response.encoding or "utf-8", errors="replace")
+    return _truncate(text, size)
+
+
+def _curl(response: Response):
+    """cURL для запроса или None, если тело бинарное или слишком большое для лога."""
+    body = response.request.body
+    if body and (not _request_is_text(response.request) or len(body) > BODY_LIMIT):
+        return None
+    return to_curl(response.request)
+
+
+def format_exchange(response: Response, curl=False):
+    """
+    Текст записи о запросе и ответе: метод, URL, статус, cURL (если curl=True)
+    или тело запроса и тело ответа.
+    """
+    request = response.request
+    lines = [f"{request.method} {request.url} -> {response.status_code}"]
     try:
-        logging.info("Response Body: " + response.text)
+        reproduction = _curl(response) if curl else None
+        if reproduction:
+            # Тело уже есть в cURL, второй раз его не пишем
+            lines.append(reproduction)
+        elif request.body:
+            lines.append(f"Request body: {_request_body(request)}")
+        lines.append(f"Response body: {_response_body(response)}")
     except Exception as e:
-        logging.error(f"[ERROR] Ошибка при логировании тела ответа: {e}")
+        logger.error(f"[ERROR] Ошибка при логировании запроса {request.url}: {e}")
+    return "\n".join(lines)
+
+
+def log_exchange(response: Response, curl=False):
+    """
+    Логирует запрос и ответ одной записью. Сообщение собирается, только если
+    уровень INFO включён; curl=True добавляет cURL для воспроизведения запроса.
+    """
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(format_exchange(response, curl))
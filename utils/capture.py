@@ -0,0 +1,85 @@
+import os
+import threading
+from collections import deque
+
+from utils.attach import body_size, format_exchange, log_exchange
+
+# Режим записи трафика: "failed" — только в отчёт упавшего теста, "all" — лог каждого вызова
+MODE = (os.getenv("HTTP_CAPTURE") or "failed").lower()
+MAX_ENTRIES = int(os.getenv("HTTP_CAPTURE_ENTRIES") or 50)
+MAX_BYTES = int(os.getenv("HTTP_CAPTURE_BYTES") or 8 * 1024 * 1024)
+
+
+class TrafficBuffer:
+    """
+    Кольцевой буфер последних ответов теста, ограниченный числом записей
+    и суммарным размером тел. На горячем пути хранится только ссылка
+    на Response; тела и cURL форматируются лишь при вызове render().
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = deque()
+        self._bytes = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def append(self, response, curl=False):
+        size = body_size(response) + len(response.request.body or b"")
+        with self._lock:
+            self._entries.append((response, curl, size))
+            self._bytes += size
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, _, evicted = self._entries.popleft()
+                self._bytes -= evicted
+                self.dropped += 1
+
+    def render(self):
+        with self._lock:
+            entries = list(self._entries)
+            dropped = self.dropped
+        parts = [format_exchange(response, curl) for response, curl, _ in entries]
+        if dropped:
+            parts.insert(0, f"[{dropped} более ранних запросов вытеснено из буфера]")
+        return "\n\n".join(parts)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_buffer = None
+
+
+def configure(mode=None, max_entries=None, max_bytes=None):
+    global MODE, MAX_ENTRIES, MAX_BYTES
+    MODE = mode or MODE
+    MAX_ENTRIES = max_entries or MAX_ENTRIES
+    MAX_BYTES = max_bytes or MAX_BYTES
+
+
+def start_test():
+    """Начинает новый буфер для очередного теста."""
+    global _buffer
+    _buffer = TrafficBuffer(MAX_ENTRIES, MAX_BYTES) if MODE != "all" else None
+
+
+def finish_test():
+    global _buffer
+    _buffer = None
+
+
+def current():
+    return _buffer
+
+
+def record(response, curl=False):
+    """Вызывается хелперами api/ на каждый ответ."""
+    if MODE == "all":
+        log_exchange(response, curl)
+        return
+    buffer = _buffer
+    if buffer is not None:
+        buffer.append(response, curl)
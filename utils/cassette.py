@@ -0,0 +1,366 @@
+import base64
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from api import session as http_session
+from utils.attach import _is_text
+from utils.recorder import current_test, path_template
+
+FORMAT_VERSION = 1
+
+# Значения, которые тесты генерируют заново при каждом прогоне: email и UUID/hex-идентификаторы
+_VOLATILE = re.compile(
+    r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+"
+    r"|\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+    r"|\b[0-9a-fA-F]{32}\b"
+)
+_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?")
+# Заголовки, которые нет смысла хранить: тело отдаётся целиком и уже распакованным
+_SKIP_HEADERS = {"content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+
+class CassetteMissError(Exception):
+    """В кассете нет ответа на запрос, а режим воспроизведения в сеть не ходит."""
+
+
+def _text(body):
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        return body.decode("utf-8", errors="replace")
+    return body
+
+
+def _normalized_body(request, substitute):
+    """
+    Тело запроса без того, что меняется от прогона к прогону: JSON с отсортированными
+    ключами, форма с отсортированными полями, multipart без случайного boundary.
+    Email и UUID в текстовом теле проходят через substitute.
+    """
+    body = request.body
+    if not body:
+        return ""
+    content_type = (request.headers.get("Content-Type") or "").lower()
+    if hasattr(body, "fingerprint"):
+        # Потоковое тело (api.multipart): хэш считается чтением файлов, а не из памяти
+        return "multipart:" + body.fingerprint()
+    if content_type.startswith("multipart/"):
+        boundary = content_type.partition("boundary=")[2].encode()
+        raw = body if isinstance(body, bytes) else body.encode()
+        return "multipart:" + hashlib.sha256(raw.replace(boundary, b"")).hexdigest()
+    if "json" in content_type:
+        try:
+            text = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False)
+        except ValueError:
+            text = _text(body)
+    elif "x-www-form-urlencoded" in content_type:
+        text = urlencode(sorted(parse_qsl(_text(body), keep_blank_values=True)))
+    elif _is_text(content_type) or isinstance(body, str):
+        text = _text(body)
+    else:
+        return "bytes:" + hashlib.sha256(body).hexdigest()
+    return _VOLATILE.sub(substitute, unquote(text))
+
+
+def _volatile_values(request):
+    """Email и UUID из URL и тела запроса в порядке появления."""
+    values = _VOLATILE.findall(unquote(request.url))
+    content_type = (request.headers.get("Content-Type") or "").lower()
+    if request.body and not content_type.startswith("multipart/") and (
+        _is_text(content_type) or isinstance(request.body, str)
+    ):
+        values += _VOLATILE.findall(unquote(_text(request.body)))
+    return values
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16] if text else "-"
+
+
+def match_key(request):
+    """Ключ поиска ответа: метод, шаблон пути, имена query-параметров и нормализованное тело."""
+    query = sorted({name for name, _ in parse_qsl(urlsplit(request.url).query, keep_blank_values=True)})
+    body = _normalized_body(request, "{volatile}")
+    return f"~{request.method} {path_template(request.url)}?{'&'.join(query)} {_digest(body)}"
+
+
+def exact_key(request, recorded=None):
+    """
+    Точный ключ: путь и query целиком, тело и токен авторизации. Значения
+    из recorded (текущее -> записанное) подставляются вместо текущих.
+    """
+    recorded = recorded or {}
+
+    def substitute(match):
+        return recorded.get(match.group(0), match.group(0))
+
+    parts = urlsplit(request.url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    url = _VOLATILE.sub(substitute, unquote(f"{parts.path}?{query}"))
+    body = _normalized_body(request, substitute)
+    authorization = _digest(request.headers.get("Authorization") or "")
+    return f"={request.method} {url} {_digest(body)} {authorization}"
+
+
+def _shift_timestamps(text, delta):
+    def shift(match):
+        # Секунды и дробная часть разбираются отдельно: fromisoformat до 3.11 не принимает 1-5 знаков
+        value, _, fraction = match.group(0).partition(".")
+        shifted = datetime.fromisoformat(value) + timedelta(microseconds=int(fraction.ljust(6, "0") or 0)) + delta
+        if not fraction:
+            return shifted.isoformat(timespec="seconds")
+        return shifted.strftime("%Y-%m-%dT%H:%M:%S.%f")[:20 + len(fraction)]
+
+    return _TIMESTAMP.sub(shift, text)
+
+
+class Cassette:
+    """
+    Записанные ответы API для прогона без сети.
+
+    Файл — gzip с JSON: список взаимодействий (тест, ключи запроса, статус,
+    заголовки, хэш тела) и словарь тел по sha256, так что одинаковые ответы
+    (видео, превью, списки) хранятся один раз.
+
+    У запроса два ключа: точный (путь, тело, токен) и по шаблону (метод,
+    шаблон пути, тело без email и UUID). При загрузке строится индекс
+    (тест, ключ) -> ответы и ключ -> ответы, поэтому поиск ответа —
+    несколько обращений к словарю. Ответы на одинаковые
+    запросы отдаются в порядке записи; последний повторяется, если запрос
+    выполняется чаще, чем при записи (опрос статуса). Ответы, записанные
+    в сессионных фикстурах под другим тестом, находятся по одному ключу.
+
+    Email и UUID, которые тесты генерируют заново, запоминаются при записи;
+    при воспроизведении записанные значения в ответах заменяются текущими,
+    а даты в ответах сдвигаются на время, прошедшее с записи.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.recorded_at = time.time()
+        self.interactions = []
+        self.bodies = {}
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = {}
+        self._positions = defaultdict(int)
+        self._served = set()
+        self._aliases = {}
+        self._recorded = {}
+        self._delta = timedelta(0)
+
+    @classmethod
+    def load(cls, path):
+        cassette = cls(path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise Exception(f"Неподдерживаемая версия кассеты {path}: {data.get('version')}")
+        cassette.recorded_at = data["recorded_at"]
+        cassette.bodies = data["bodies"]
+        cassette.interactions = data["interactions"]
+        cassette._delta = timedelta(seconds=time.time() - cassette.recorded_at)
+        for index, interaction in enumerate(cassette.interactions):
+            for key in (interaction["exact"], interaction["key"]):
+                cassette._index.setdefault((interaction["test"], key), []).append(index)
+                cassette._index.setdefault((None, key), []).append(index)
+        return cassette
+
+    def save(self, path=None):
+        data = {
+            "version": FORMAT_VERSION,
+            "recorded_at": self.recorded_at,
+            "bodies": self.bodies,
+            "interactions": self.interactions,
+        }
+        with gzip.open(path or self.path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def merge(self, other):
+        """Добавляет взаимодействия другой кассеты (части, записанной воркером xdist)."""
+        self.recorded_at = min(self.recorded_at, other.recorded_at)
+        self.bodies.update(other.bodies)
+        self.interactions.extend(other.interactions)
+
+    def record(self, request, response):
+        content = response.content or b""
+        digest = hashlib.sha256(content).hexdigest()
+        interaction = {
+            "test": current_test(),
+            "key": match_key(request),
+            "exact": exact_key(request),
+            "values": _volatile_values(request),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_HEADERS},
+            "body": digest,
+        }
+        with self._lock:
+            if digest not in self.bodies:
+                self.bodies[digest] = base64.b64encode(content).decode("ascii")
+            self.interactions.append(interaction)
+
+    def _next(self, scope):
+        # Взаимодействие есть в нескольких списках индекса, но отдаётся один раз;
+        # указатель только растёт, так что пропуск отданных в сумме линеен
+        indexes = self._index[scope]
+        position = self._positions[scope]
+        while position < len(indexes) - 1 and indexes[position] in self._served:
+            position += 1
+        self._positions[scope] = position + 1
+        index = indexes[min(position, len(indexes) - 1)]
+        self._served.add(index)
+        return self.interactions[index]
+
+    def find(self, request):
+        """
+        Записанное взаимодействие для запроса и замены записанных значений
+        на текущие, или None. Сначала ищется точное совпадение (в тесте,
+        затем во всей кассете), потом совпадение по шаблону.
+        """
+        test = current_test()
+        values = _volatile_values(request)
+        with self._lock:
+            keys = (exact_key(request, self._recorded), match_key(request))
+            scope = next(((t, k) for k in keys for t in (test, None) if (t, k) in self._index), None)
+            if scope is None:
+                self.misses += 1
+                return None
+            interaction = self._next(scope)
+            for recorded, current in zip(interaction["values"], values):
+                if recorded != current and recorded not in self._aliases:
+                    self._aliases[recorded] = current
+                    self._recorded[current] = recorded
+            aliases = dict(self._aliases)
+        return interaction, aliases
+
+    def _content(self, interaction, aliases):
+        content = base64.b64decode(self.bodies[interaction["body"]])
+        if not content or not _is_text(interaction["headers"].get("Content-Type")):
+            return content
+        text = content.decode("utf-8", errors="replace")
+        if aliases:
+            text = _VOLATILE.sub(lambda m: aliases.get(m.group(0), m.group(0)), text)
+        if self._delta:
+            text = _shift_timestamps(text, self._delta)
+        return text.encode("utf-8")
+
+    def replay(self, request, connection):
+        found = self.find(request)
+        if found is None:
+            raise CassetteMissError(
+                f"В кассете {self.path} нет ответа на {request.method} {request.url} "
+                f"(ключ {match_key(request)}, тест {current_test()})"
+            )
+        interaction, aliases = found
+        content = self._content(interaction, aliases)
+
+        response = Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction["reason"]
+        response.headers = CaseInsensitiveDict(interaction["headers"])
+        if "Content-Length" in response.headers:
+            response.headers["Content-Length"] = str(len(content))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        # Тело уже в памяти: iter_content (stream=True, api/download.py) отдаёт его кусками
+        response._content_consumed = True
+        response.url = request.url
+        response.request = request
+        response.connection = connection
+        response.elapsed = timedelta(0)
+        return response
+
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    Транспорт поверх адаптера с пулом: в режиме "record" запрос уходит
+    в сеть и ответ дописывается в кассету, в режиме "replay" ответ берётся
+    из кассеты, а сеть не используется.
+    """
+
+    def __init__(self, cassette, mode, adapter):
+        super().__init__()
+        self.cassette = cassette
+        self.mode = mode
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        if self.mode == "replay":
+            return self.cassette.replay(request, self)
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+_cassette = None
+_mode = None
+
+
+def _part_path(path):
+    # Каждый воркер xdist пишет свою часть, контроллер склеивает их в pytest_unconfigure
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    return f"{path}.{worker}" if worker else path
+
+
+def start(path, mode):
+    """
+    Включает кассету: mode="record" записывает ответы в path,
+    mode="replay" отвечает на запросы из path без обращения к сети.
+    """
+    global _cassette, _mode
+    if mode == "replay":
+        _cassette = Cassette.load(path)
+    else:
+        if not os.getenv("PYTEST_XDIST_WORKER"):
+            for part in glob.glob(glob.escape(path) + ".gw*"):
+                os.remove(part)
+        _cassette = Cassette(path)
+    _mode = mode
+    cassette = _cassette
+    http_session.configure(wrap_adapter=lambda adapter: CassetteAdapter(cassette, mode, adapter))
+    return _cassette
+
+
+def stop():
+    """Выключает кассету; в режиме записи сохраняет её (и склеивает части воркеров)."""
+    global _cassette, _mode
+    if _cassette is None:
+        return
+    cassette, mode = _cassette, _mode
+    _cassette = _mode = None
+    http_session.configure()
+    if mode != "record":
+        return
+    parts = [] if os.getenv("PYTEST_XDIST_WORKER") else sorted(glob.glob(glob.escape(cassette.path) + ".gw*"))
+    for part in parts:
+        cassette.merge(Cassette.load(part))
+    cassette.save(_part_path(cassette.path))
+    for part in parts:
+        os.remove(part)
+
+
+def current():
+    return _cassette
+
+
+def mode():
+    """Режим включённой кассеты ("record" или "replay") или None."""
+    return _mode
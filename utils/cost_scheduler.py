@@ -0,0 +1,98 @@
+from xdist.scheduler import LoadScopeScheduling
+
+from utils.durations import default_cost
+
+# Дорогие фикстуры, результат которых кэшируется в процессе воркера: тесты модуля
+# с такой фикстурой выгоднее выполнить на одном воркере (видео загрузится один раз)
+AFFINITY_FIXTURES = ("lease_translation",)
+
+
+def _module(nodeid):
+    return nodeid.split("::", 1)[0]
+
+
+def plan(collection, history, workers):
+    """
+    Разбивает тесты на единицы работы и упорядочивает их по убыванию
+    стоимости (LPT). Тест — отдельная единица, кроме тестов одного модуля
+    с общей дорогой фикстурой: они объединяются в группу, а слишком
+    большая группа (дольше доли одного воркера) делится на части.
+    Возвращает [(единица, [nodeid], секунды)].
+    """
+    fallback = default_cost(history)
+    cost = {nodeid: history[nodeid][0] if nodeid in history else fallback for nodeid in collection}
+    share = sum(cost.values()) / max(workers, 1)
+
+    groups = {}
+    for nodeid in collection:
+        fixtures = history[nodeid][1] if nodeid in history else []
+        shared = next((name for name in AFFINITY_FIXTURES if name in fixtures), None)
+        key = f"{_module(nodeid)}::[{shared}]" if shared else nodeid
+        groups.setdefault(key, []).append(nodeid)
+
+    units = []
+    for key, nodeids in groups.items():
+        chunks = [[]]
+        for nodeid in nodeids:
+            if chunks[-1] and sum(cost[n] for n in chunks[-1]) + cost[nodeid] > share:
+                chunks.append([])
+            chunks[-1].append(nodeid)
+        for number, chunk in enumerate(chunks):
+            scope = key if len(chunks) == 1 else f"{key}#{number}"
+            units.append((scope, chunk, sum(cost[nodeid] for nodeid in chunk)))
+    units.sort(key=lambda unit: -unit[2])
+    return units
+
+
+class CostScheduling(LoadScopeScheduling):
+    """
+    Планировщик xdist по длительностям прошлых прогонов: единицы работы
+    из plan() раздаются свободным воркерам от самых долгих к коротким,
+    поэтому в конце прогона не остаётся одного воркера с длинным тестом.
+    """
+
+    def __init__(self, config, log=None, history=None):
+        super().__init__(config, log)
+        self.history = history or {}
+        self._scopes = {}
+
+    def _split_scope(self, nodeid):
+        return self._scopes.get(nodeid, nodeid)
+
+    def schedule(self):
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self._reschedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = list(next(iter(self.registered_collections.values())))
+        if not self.collection:
+            return
+
+        units = plan(self.collection, self.history, len(self.nodes))
+        for scope, nodeids, seconds in units:
+            self.workqueue[scope] = {nodeid: False for nodeid in nodeids}
+            self._scopes.update((nodeid, scope) for nodeid in nodeids)
+        known = sum(1 for nodeid in self.collection if nodeid in self.history)
+        self.log(f"Единиц работы: {len(units)}, тестов с историей: {known} из {len(self.collection)}, "
+                 f"оценка: {sum(unit[2] for unit in units):.1f} с")
+
+        extra_nodes = len(self.nodes) - len(self.workqueue)
+        for _ in range(max(extra_nodes, 0)):
+            unused_node, _ = self.assigned_work.popitem()
+            unused_node.shutdown()
+
+        for node in self.nodes:
+            self._assign_work_unit(node)
+        for node in self.nodes:
+            self._reschedule(node)
+
+        if not self.workqueue:
+            for node in self.nodes:
+                node.shutdown()
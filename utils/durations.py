@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import statistics
+import time
+
+# База длительностей по умолчанию: в корне репозитория, рядом с .env
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".test_durations.sqlite")
+# Вес последнего прогона в скользящем среднем: один медленный прогон не перекраивает расписание
+SMOOTHING = 0.3
+# Длительность теста без истории, если истории нет вообще ни у одного теста
+UNKNOWN_COST = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS durations (
+    target TEXT NOT NULL,
+    nodeid TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    runs INTEGER NOT NULL,
+    fixtures TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (target, nodeid)
+)
+"""
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute(_SCHEMA)
+    return connection
+
+
+class DurationStore:
+    """
+    Длительности тестов прошлых прогонов в sqlite: сумма фаз setup, call
+    и teardown, сглаженная по прогонам, и фикстуры теста. target разделяет
+    историю прогонов против заглушки и против настоящего API.
+    """
+
+    def __init__(self, path=None, target="api"):
+        self.path = path or os.getenv("TEST_DURATIONS_DB") or DEFAULT_PATH
+        self.target = target
+        self._current = {}
+        self._fixtures = {}
+
+    def add(self, nodeid, seconds, fixtures=()):
+        """Добавляет длительность фазы теста текущего прогона."""
+        self._current[nodeid] = self._current.get(nodeid, 0.0) + seconds
+        self._fixtures[nodeid] = sorted(fixtures)
+
+    def save(self):
+        """Сохраняет замеры прогона. Воркеры xdist пишут в одну базу, sqlite сам их упорядочивает."""
+        if not self._current:
+            return
+        now = time.time()
+        with _connect(self.path) as connection:
+            for nodeid, seconds in self._current.items():
+                row = connection.execute(
+                    "SELECT seconds, runs FROM durations WHERE target = ? AND nodeid = ?", (self.target, nodeid)
+                ).fetchone()
+                if row is not None:
+                    seconds = row[0] + SMOOTHING * (seconds - row[0])
+                connection.execute(
+                    "INSERT OR REPLACE INTO durations VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.target, nodeid, seconds, (row[1] if row else 0) + 1,
+                     json.dumps(self._fixtures.get(nodeid, [])), now)
+                )
+        connection.close()
+        self._current.clear()
+
+    def load(self):
+        """История: {nodeid: (секунды, [фикстуры])}."""
+        if not os.path.exists(self.path):
+            return {}
+        connection = _connect(self.path)
+        try:
+            rows = connection.execute(
+                "SELECT nodeid, seconds, fixtures FROM durations WHERE target = ?", (self.target,)
+            ).fetchall()
+        finally:
+            connection.close()
+        return {nodeid: (seconds, json.loads(fixtures)) for nodeid, seconds, fixtures in rows}
+
+
+def default_cost(history):
+    """Оценка теста без истории — медиана известных длительностей."""
+    if not history:
+        return UNKNOWN_COST
+    return statistics.median(seconds for seconds, _ in history.values())
@@ -0,0 +1,78 @@
+import os
+
+from api import requests
+
+
+# Тела фикстур, общие для tests/conftest.py и итераций нагрузки (load/context.py):
+# фикстура и атрибут Iteration отличаются только тем, откуда берут пул
+# пользователей, кэш переводов и очередь удаления
+
+
+def signin_user(base_url, email, password):
+    signin_payload = {"username": email, "password": password}
+    signin_response = requests.post_request(base_url + '/auth/signin', data=signin_payload)
+
+    if signin_response.status_code != 200:
+        raise Exception(
+            f"Ошибка при авторизации пользователя: {signin_response.status_code}, {signin_response.text}"
+        )
+
+    response_data = signin_response.json()
+    if "user" not in response_data:
+        raise KeyError(f"Ответ API не содержит ключ 'user': {response_data}")
+
+    return {
+        "user_id": response_data["user"]["id"],
+        "access_token": response_data["access_token"],
+        "refresh_token": response_data["refresh_token"],
+    }
+
+
+def add_translation(base_url, access_token, file_path, mime_type="video/mp4"):
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "accept": "application/json"
+    }
+
+    with open(file_path, "rb") as f:
+        response = requests.post_request(
+            f"{base_url}/translate/upload/",
+            headers=headers,
+            files={"upload": (os.path.basename(file_path), f, mime_type)}
+        )
+
+    assert response.status_code == 200, (
+        f"Ошибка при загрузке видео: {response.status_code}, {response.text}"
+    )
+    return response.json()
+
+
+def delete_translation(translation_cache, teardown_queue, access_token, translation_id):
+    # Оригиналы из кэша общие для всей сессии и удаляются в конце
+    if translation_cache.is_original(translation_id):
+        raise Exception(
+            f"Перевод {translation_id} — общий оригинал из lease_translation, удалять его нельзя; "
+            f"для перевода, который тест меняет или удаляет, возьмите копию: lease_translation без readonly"
+        )
+
+    # Копии из кэша и загруженные тестом переводы удаляются пакетом после тестов
+    translation_cache.release(translation_id)
+    teardown_queue.add_translation(translation_id, access_token)
+
+
+def release_translations(translation_cache, teardown_queue, translation_ids):
+    # Копии, которые тест не удалил сам, удаляются вместе с остальными его сущностями
+    for translation_id in translation_ids:
+        access_token = translation_cache.release(translation_id)
+        if access_token is not None:
+            teardown_queue.add_translation(translation_id, access_token)
+
+
+def delete_user(user_pool, teardown_queue, user_id, immediately=False):
+    # Пользователи из пула не удаляются, а возвращаются в пул
+    if user_pool.is_leased(user_id):
+        user_pool.release(user_id)
+    elif immediately:
+        teardown_queue.delete_user_now(user_id)
+    else:
+        teardown_queue.add_user(user_id)
@@ -0,0 +1,271 @@
+import html
+import json
+import os
+import threading
+
+from utils.attach import body_size
+from utils.recorder import path_template
+
+# 2^7 подкорзин на каждую степень двойки: относительная погрешность значения меньше 1/64 (~1.6%)
+SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS // 2
+
+PERCENTILES = (50, 90, 99)
+
+
+def endpoint(request):
+    """Ключ эндпоинта: метод и шаблон пути, например "GET /translate/{id}"."""
+    return f"{request.method} {path_template(request.url)}"
+
+
+def duration(response):
+    """Полное время вызова в секундах (с телом ответа), если оно замерено, иначе elapsed."""
+    timings = getattr(response, "timings", None) or {}
+    return timings.get("total", response.elapsed.total_seconds())
+
+
+class Histogram:
+    """
+    Гистограмма в духе HdrHistogram для неотрицательных целых значений
+    (микросекунды, байты): значения до 128 хранятся точно, дальше корзины
+    растут вместе со значением, так что память не зависит от числа замеров,
+    а погрешность процентилей остаётся в пределах ~1.6%.
+
+    Корзины хранятся разреженно в словаре, поэтому гистограммы разных
+    процессов складываются простым слиянием (merge).
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def _index(value):
+        if value < _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return _SUB_BUCKETS + (shift - 1) * _HALF + (value >> shift) - _HALF
+
+    @staticmethod
+    def _highest_equivalent(index):
+        # Верхняя граница корзины: процентиль не занижается
+        if index < _SUB_BUCKETS:
+            return index
+        shift, offset = divmod(index - _SUB_BUCKETS, _HALF)
+        shift += 1
+        return ((offset + _HALF) << shift) + (1 << shift) - 1
+
+    def add(self, value):
+        value = max(int(value), 0)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for attr, pick in (("min", min), ("max", max)):
+            values = [v for v in (getattr(self, attr), getattr(other, attr)) if v is not None]
+            setattr(self, attr, pick(values) if values else None)
+
+    def to_dict(self):
+        return {
+            "counts": {str(k): v for k, v in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        histogram.counts = {int(k): v for k, v in data["counts"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+
+class EndpointStats:
+    """Задержка (мкс), размер запроса и ответа (байты) для одного метода и шаблона пути."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.bytes_out = Histogram()
+        self.bytes_in = Histogram()
+        self.statuses = {}
+
+    def merge(self, other):
+        self.latency.merge(other.latency)
+        self.bytes_out.merge(other.bytes_out)
+        self.bytes_in.merge(other.bytes_in)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+
+    def to_dict(self):
+        return {
+            "latency_us": self.latency.to_dict(),
+            "bytes_out": self.bytes_out.to_dict(),
+            "bytes_in": self.bytes_in.to_dict(),
+            "statuses": self.statuses,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.latency = Histogram.from_dict(data["latency_us"])
+        stats.bytes_out = Histogram.from_dict(data["bytes_out"])
+        stats.bytes_in = Histogram.from_dict(data["bytes_in"])
+        stats.statuses = dict(data["statuses"])
+        return stats
+
+
+class LatencyStats:
+    """Гистограммы по эндпоинтам (метод, шаблон пути) за сессию."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, response):
+        request = response.request
+        seconds = duration(response)
+        bytes_out = request.headers.get("Content-Length")
+        if bytes_out is None:
+            bytes_out = len(request.body) if isinstance(request.body, (str, bytes)) else 0
+        key = endpoint(request)
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats()
+            stats.latency.add(seconds * 1_000_000)
+            stats.bytes_out.add(int(bytes_out))
+            stats.bytes_in.add(body_size(response))
+            status = str(response.status_code)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def merge(self, data):
+        """Добавляет выгрузку to_dict() другого процесса (воркера xdist)."""
+        with self._lock:
+            for key, exported in data.items():
+                other = EndpointStats.from_dict(exported)
+                if key in self.endpoints:
+                    self.endpoints[key].merge(other)
+                else:
+                    self.endpoints[key] = other
+
+    def to_dict(self):
+        with self._lock:
+            return {key: stats.to_dict() for key, stats in self.endpoints.items()}
+
+    def summary(self):
+        """Строки отчёта: процентили задержки в мс и размеров в байтах, самые медленные первыми."""
+        rows = []
+        with self._lock:
+            for key, stats in self.endpoints.items():
+                method, _, path = key.partition(" ")
+                row = {"method": method, "path": path, "count": stats.latency.count, "statuses": dict(stats.statuses)}
+                for p in PERCENTILES:
+                    row[f"p{p}_ms"] = round(stats.latency.percentile(p) / 1000, 1)
+                row["max_ms"] = round(stats.latency.max / 1000, 1)
+                row["mean_ms"] = round(stats.latency.mean() / 1000, 1)
+                for direction in ("bytes_out", "bytes_in"):
+                    histogram = getattr(stats, direction)
+                    row[f"{direction}_p50"] = histogram.percentile(50)
+                    row[f"{direction}_max"] = histogram.max
+                rows.append(row)
+        return sorted(rows, key=lambda row: row["p99_ms"], reverse=True)
+
+
+class Sample:
+    """Один вызов, попавший в проверку SLO теста."""
+
+    def __init__(self, endpoint, ms, status, url):
+        self.endpoint = endpoint
+        self.ms = ms
+        self.status = status
+        self.url = url
+
+
+stats = LatencyStats()
+# Дополнительные получатели замеров со своими LatencyStats (прогон нагрузки);
+# общие stats сессии они не трогают
+_collectors = []
+# Вызовы текущего теста для проверки SLO; None — тест без маркера slo
+_samples = None
+
+
+def add_collector(collector):
+    _collectors.append(collector)
+
+
+def remove_collector(collector):
+    if collector in _collectors:
+        _collectors.remove(collector)
+
+
+def start_samples():
+    global _samples
+    _samples = []
+
+
+def take_samples():
+    global _samples
+    samples, _samples = _samples or [], None
+    return samples
+
+
+def record(response):
+    stats.record(response)
+    for collector in list(_collectors):
+        collector.record(response)
+    samples = _samples
+    if samples is not None:
+        samples.append(Sample(endpoint(response.request), duration(response) * 1000, response.status_code, response.request.url))
+
+
+def write_json(path):
+    """Артефакт с процентилями и сырыми гистограммами (для сравнения прогонов)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"summary": stats.summary(), "histograms": stats.to_dict()}, f, ensure_ascii=False, indent=2)
+
+
+def html_table(rows):
+    """Таблица процентилей для отчёта pytest-html."""
+    header = ["Метод", "Путь", "Запросов", "p50, мс", "p90, мс", "p99, мс", "max, мс",
+              "Ответ p50, байт", "Ответ max, байт", "Статусы"]
+    lines = ["<h2>Задержки по эндпоинтам</h2>", "<table>", "<tr>" + "".join(f"<th>{h}</th>" for h in header) + "</tr>"]
+    for row in rows:
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(row["statuses"].items()))
+        cells = [row["method"], row["path"], row["count"], row["p50_ms"], row["p90_ms"], row["p99_ms"],
+                 row["max_ms"], row["bytes_in_p50"], row["bytes_in_max"], statuses]
+        lines.append("<tr>" + "".join(f"<td>{html.escape(str(cell))}</td>" for cell in cells) + "</tr>")
+    lines.append("</table>")
+    return "\n".join(lines)
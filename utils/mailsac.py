@@ -1,43 +1,298 @@
-import requests
+import logging
 import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future
 from dotenv import load_dotenv
 
+from api import session as http_session
+from utils.cassette import CassetteMissError
+
 load_dotenv()
 API_KEY = os.getenv("MAILSAC_API_KEY")
+MAILSAC_URL = "https://mailsac.com"
+# Сколько секунд сверх timeout ждать результата фонового ожидания письма
+RESULT_MARGIN = 30
+
+
+def _api_url():
+    # MAILSAC_URL читается при каждом вызове: --standin подменяет его после импорта модуля
+    return (os.getenv("MAILSAC_URL") or MAILSAC_URL).rstrip("/")
+
+
+def _is_local():
+    """Локальный приёмник (standin/mail.py) вместо mailsac.com: ключ не нужен, есть ожидание."""
+    return _api_url() != MAILSAC_URL
+
+
+def _headers():
+    return {"Mailsac-Key": os.getenv("MAILSAC_API_KEY") or API_KEY or ""}
+
+
+def _email_prefix():
+    # Под pytest-xdist в адрес попадает id воркера (gw0, gw1...), чтобы по ящику было видно, чей он
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    return f"testuser{worker}-" if worker else "testuser"
 
 
 def generate_unique_email():
-    if not API_KEY:
+    if not API_KEY and not _is_local():
         raise Exception("MAILSAC_API_KEY не найден в .env файле")
 
-    base_email = "testuser"
     domain = "mailsac.com"
-    unique_email = f"{base_email}{requests.get('https://www.uuidgenerator.net/api/version4').text.strip()}@{domain}"
+    unique_email = f"{_email_prefix()}{uuid.uuid4()}@{domain}"
 
     return unique_email
 
 
+def generate_unique_emails(count):
+    """Список из count уникальных адресов для фикстур, которым нужно много ящиков сразу."""
+    if not API_KEY and not _is_local():
+        raise Exception("MAILSAC_API_KEY не найден в .env файле")
+
+    prefix = _email_prefix()
+    return [f"{prefix}{uuid.uuid4()}@mailsac.com" for _ in range(count)]
+
+
+def _get(url, **kwargs):
+    # Общий пул keep-alive соединений из api/session.py вместо нового соединения на каждый запрос
+    return http_session.request("GET", url, headers=_headers(), **kwargs)
+
+
 def get_latest_email(email_address):
     """Получает последнее письмо для указанного email через API Mailsac."""
-    response = requests.get(
-        f"https://mailsac.com/api/addresses/{email_address}/messages",
-        headers={"Mailsac-Key": API_KEY}
-    )
+    response = _get(f"{_api_url()}/api/addresses/{email_address}/messages")
     if response.status_code != 200:
         raise Exception(f"Ошибка при получении писем: {response.status_code}, {response.text}")
 
     messages = response.json()
     if messages:
         message_id = messages[0]["_id"]
-        message_response = requests.get(
-            f"https://mailsac.com/api/addresses/{email_address}/messages/{message_id}",
-            headers={"Mailsac-Key": API_KEY}
-        )
+        message_response = _get(f"{_api_url()}/api/addresses/{email_address}/messages/{message_id}")
         if message_response.status_code == 200:
             return message_response.json()
     return None
 
 
+def get_email_text(email_address, message_id):
+    """Текст письма (plain text) по его ID."""
+    response = _get(f"{_api_url()}/api/text/{email_address}/{message_id}")
+    if response.status_code != 200:
+        raise Exception(f"Ошибка при получении текста письма: {response.status_code}, {response.text}")
+    return response.text
+
+
+# Уже полученные письма по ящикам: адрес -> {id: письмо}. Тело каждого письма запрашивается один раз
+_seen = {}
+_seen_lock = threading.Lock()
+
+
+def _inbox(email_address, listing=None):
+    """
+    Все письма ящика в порядке доставки. Для новых ID догружает тело письма,
+    уже виденные берёт из кэша.
+    """
+    if listing is None:
+        response = _get(f"{_api_url()}/api/addresses/{email_address}/messages")
+        if response.status_code != 200:
+            raise Exception(f"Ошибка при получении писем: {response.status_code}, {response.text}")
+        listing = response.json()
+
+    with _seen_lock:
+        cache = _seen.setdefault(email_address.lower(), {})
+        missing = [m for m in listing if m["_id"] not in cache]
+    for meta in missing:
+        message = meta
+        # Локальный приёмник отдаёт письма целиком, mailsac.com — только метаданные
+        if "text" not in meta:
+            response = _get(f"{_api_url()}/api/addresses/{email_address}/messages/{meta['_id']}")
+            if response.status_code != 200:
+                raise Exception(f"Ошибка при получении письма: {response.status_code}, {response.text}")
+            message = response.json()
+        with _seen_lock:
+            cache[meta["_id"]] = message
+    with _seen_lock:
+        return [cache[m["_id"]] for m in reversed(listing)]
+
+
+def inbox_size(email_address):
+    """
+    Сколько писем сейчас в ящике. Снимается до действия, которое отправляет
+    письмо, и передаётся в wait_for_message(since=...), чтобы ждать только новые.
+    """
+    response = _get(f"{_api_url()}/api/addresses/{email_address}/messages")
+    if response.status_code != 200:
+        raise Exception(f"Ошибка при получении писем: {response.status_code}, {response.text}")
+    return len(response.json())
+
+
+def _newest_match(messages, predicate, since=0):
+    # messages идут в порядке доставки; первые since писем были в ящике до ожидания
+    for message in reversed(messages[since:]):
+        if predicate is None or predicate(message):
+            return message
+    return None
+
+
+class _Watch:
+    def __init__(self, address, predicate, timeout, base_delay, since):
+        self.address = address
+        self.predicate = predicate
+        self.since = since
+        self.deadline = time.monotonic() + timeout
+        self.delay = base_delay
+        self.next_poll = time.monotonic()
+        self.future = Future()
+
+
+class InboxWatcher:
+    """
+    Один фоновый поток, который следит сразу за многими ящиками.
+
+    Каждый ящик опрашивается с экспоненциально растущей паузой (base_delay,
+    удваивается до max_delay) и случайным разбросом, чтобы параллельные
+    ожидания не били в API синхронно. За один проход ящик запрашивается
+    один раз, сколько бы ожиданий на нём ни висело.
+    """
+
+    def __init__(self, base_delay=0.5, max_delay=8.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        self._watches = []
+        self._thread = None
+
+    def watch(self, email_address, predicate=None, timeout=60, since=0):
+        """
+        Начинает ждать письмо и сразу возвращает Future: результат — самое
+        новое подходящее письмо (из пришедших после первых since) или None,
+        если за timeout секунд подходящего письма не пришло.
+        """
+        watch = _Watch(email_address, predicate, timeout, self.base_delay, since)
+        with self._cond:
+            self._watches.append(watch)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="inbox-watcher", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return watch.future
+
+    def _backoff(self, watch, now):
+        watch.delay = min(watch.delay * 2, self.max_delay)
+        # Половина паузы фиксирована, половина случайна
+        watch.next_poll = now + watch.delay / 2 + random.uniform(0, watch.delay / 2)
+
+    def _run(self):
+        # Поток один на все ожидания: любая ошибка итерации логируется, а не останавливает его
+        while True:
+            try:
+                self._step()
+            except Exception:
+                logging.exception("[ERROR] Ошибка в потоке ожидания писем")
+                time.sleep(self.base_delay)
+
+    def _resolve(self, watch, match=None, error=None):
+        if error is not None:
+            watch.future.set_exception(error)
+        else:
+            watch.future.set_result(match)
+        with self._cond:
+            self._watches.remove(watch)
+
+    def _step(self):
+        """Один проход: дождаться ближайшего опроса и проверить ящики, которым пора."""
+        with self._cond:
+            while not self._watches:
+                self._cond.wait()
+            now = time.monotonic()
+            wake_at = min(min(w.next_poll, w.deadline) for w in self._watches)
+            if wake_at > now:
+                self._cond.wait(wake_at - now)
+                return
+            due = [w for w in self._watches if w.next_poll <= now or w.deadline <= now]
+
+        for address in {w.address.lower() for w in due}:
+            watches = [w for w in due if w.address.lower() == address]
+            try:
+                messages = _inbox(watches[0].address)
+            except CassetteMissError as e:
+                # Ответа нет в кассете и при следующем опросе не появится: ожидание падает сразу, а не по таймауту
+                for watch in watches:
+                    self._resolve(watch, error=e)
+                continue
+            except Exception as e:
+                logging.warning(f"[WARNING] Не удалось проверить ящик {address}: {e}")
+                messages = []
+            now = time.monotonic()
+            for watch in watches:
+                try:
+                    match = _newest_match(messages, watch.predicate, watch.since)
+                except Exception as e:
+                    # Ошибка в predicate получает тот, кто ждёт письмо
+                    self._resolve(watch, error=e)
+                    continue
+                if match is not None or now >= watch.deadline:
+                    self._resolve(watch, match)
+                else:
+                    self._backoff(watch, now)
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def get_watcher():
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            _watcher = InboxWatcher()
+        return _watcher
+
+
+def _wait_local(email_address, predicate, timeout, since):
+    deadline = time.monotonic() + timeout
+    count = since
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        # Сервер держит запрос, пока в ящике не станет больше count писем
+        response = _get(
+            f"{_api_url()}/api/addresses/{email_address}/wait",
+            params={"count": count, "timeout": remaining},
+            timeout=remaining + 10
+        )
+        if response.status_code != 200:
+            raise Exception(f"Ошибка при получении писем: {response.status_code}, {response.text}")
+        listing = response.json()
+        count = len(listing)
+        match = _newest_match(_inbox(email_address, listing), predicate, since)
+        if match is not None:
+            return match
+
+
+def wait_for_message(email_address, predicate=None, timeout=60, since=0):
+    """
+    Ждёт письмо на email_address, для которого predicate(письмо) истинен
+    (без predicate — любое), и возвращает его целиком; из нескольких
+    подходящих — самое новое. Если письма нет за timeout секунд, возвращает None.
+
+    since — число писем в ящике до действия, которое отправляет письмо
+    (inbox_size()): они не рассматриваются, и ожидание не закончится на
+    старом письме. Снимать его нужно до действия, а не в момент ожидания:
+    письмо может прийти раньше, чем начнётся ожидание.
+
+    С локальным приёмником ожидание блокирующее и завершается в момент доставки;
+    с mailsac.com ящик опрашивается фоновым InboxWatcher с растущей паузой.
+    Для ожидания нескольких ящиков сразу используйте get_watcher().watch().
+    """
+    if _is_local():
+        return _wait_local(email_address, predicate, timeout, since)
+    # Запас на последний опрос ящика после дедлайна: если поток ожидания всё же завис, тест упадёт, а не повиснет
+    return get_watcher().watch(email_address, predicate, timeout, since).result(timeout=timeout + RESULT_MARGIN)
+
 
 def get_latest_email_text(email):
     """
@@ -46,15 +301,15 @@ def get_latest_email_text(email):
     :param email: Email, для которого нужно получить последнее письмо.
     :return: Текст содержимого последнего письма или None, если письма нет.
     """
-    if not API_KEY:
+    if not API_KEY and not _is_local():
         raise ValueError("MAILSAC_API_KEY не найден. Проверьте .env файл.")
 
     # URL для получения списка сообщений
-    messages_url = f"https://mailsac.com/api/addresses/{email}/messages"
-    headers = {"Mailsac-Key": API_KEY}
+    messages_url = f"{_api_url()}/api/addresses/{email}/messages"
+    headers = _headers()
 
     # Получаем список сообщений
-    response = requests.get(messages_url, headers=headers)
+    response = http_session.request("GET", messages_url, headers=headers)
     if response.status_code != 200:
         print(f"Ошибка при получении списка сообщений: {response.status_code}, {response.text}")
         return None
@@ -69,8 +324,8 @@ def get_latest_email_text(email):
     message_id = latest_message["_id"]
 
     # URL для получения содержимого письма
-    email_text_url = f"https://mailsac.com/api/addresses/{email}/messages/{message_id}"
-    email_response = requests.get(email_text_url, headers=headers)
+    email_text_url = f"{_api_url()}/api/addresses/{email}/messages/{message_id}"
+    email_response = http_session.request("GET", email_text_url, headers=headers)
 
     if email_response.status_code != 200:
         print(f"Ошибка при получении тела письма: {email_response.status_code}, {email_response.text}")
@@ -0,0 +1,343 @@
+import hashlib
+import json
+import os
+import random
+import struct
+import uuid
+
+from utils import resource
+from utils.locks import file_lock
+
+# Каталог кэша сгенерированных файлов (переопределяется MEDIA_CACHE_DIR)
+DEFAULT_CACHE_DIR = resource.path(".media_cache")
+CHUNK_SIZE = 256 * 1024
+# Блок псевдослучайных данных, из которого нарезаются кадры
+NOISE_SIZE = 1024 * 1024
+
+CONTAINERS = {"mp4": "video/mp4", "webm": "video/webm", "pdf": "application/pdf"}
+VARIANTS = ("valid", "truncated", "corrupt")
+
+# Единичная матрица преобразования для mvhd/tkhd
+_MATRIX = struct.pack(">9I", 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+
+
+class MediaSpec:
+    """
+    Параметры синтетического файла. Размер задаётся либо битрейтом (бит/с),
+    либо точным size в байтах; длительность — в секундах.
+
+    variant: "valid" — корректный контейнер, "truncated" — обрезан до доли
+    truncate от полного размера, "corrupt" — затёрта сигнатура в начале.
+    container="pdf" даёт небольшой PDF для проверок неподдерживаемого формата.
+
+    Контейнер корректен (длительность, дорожка, таблицы сэмплов), а кадры —
+    псевдослучайные байты: файл подходит для проверок загрузки, но не для
+    декодирования.
+    """
+
+    def __init__(self, container="mp4", duration=5.0, bitrate=800_000, size=None, fps=25,
+                 width=640, height=360, variant="valid", truncate=0.5, seed=0):
+        if container not in CONTAINERS:
+            raise ValueError(f"Неизвестный контейнер {container}, доступны: {', '.join(CONTAINERS)}")
+        if variant not in VARIANTS:
+            raise ValueError(f"Неизвестный вариант {variant}, доступны: {', '.join(VARIANTS)}")
+        self.container = container
+        self.duration = float(duration)
+        self.bitrate = int(bitrate)
+        self.size = size
+        self.fps = int(fps)
+        self.width = int(width)
+        self.height = int(height)
+        self.variant = variant
+        self.truncate = float(truncate)
+        self.seed = int(seed)
+
+    @property
+    def mime_type(self):
+        return CONTAINERS[self.container]
+
+    @property
+    def extension(self):
+        return "." + self.container
+
+    @property
+    def frames(self):
+        return max(1, round(self.duration * self.fps))
+
+    def key(self):
+        """Ключ кэша: sha256 от всех параметров."""
+        params = json.dumps(vars(self), sort_keys=True)
+        return hashlib.sha256(params.encode()).hexdigest()[:16]
+
+    def __repr__(self):
+        size = f"size={self.size}" if self.size is not None else f"bitrate={self.bitrate}"
+        return f"MediaSpec({self.container}, {self.duration}s, {size}, {self.variant})"
+
+
+def _noise(seed):
+    return random.Random(seed).randbytes(NOISE_SIZE)
+
+
+def _payload(noise, length):
+    """Псевдослучайные байты длины length кусками не больше CHUNK_SIZE."""
+    view = memoryview(noise)
+    offset = 0
+    while length > 0:
+        step = min(CHUNK_SIZE, length, NOISE_SIZE - offset)
+        yield view[offset:offset + step]
+        length -= step
+        offset = (offset + step) % NOISE_SIZE
+
+
+# --- MP4 (ISO BMFF) ---
+
+def _box(kind, *payload):
+    body = b"".join(payload)
+    return struct.pack(">I4s", 8 + len(body), kind) + body
+
+
+def _full_box(kind, version, flags, *payload):
+    return _box(kind, struct.pack(">I", (version << 24) | flags), *payload)
+
+
+class _Mp4:
+    """ftyp, moov (одна видеодорожка, все сэмплы одного размера в одном чанке), free, mdat."""
+
+    # Заголовок mdat с 64-битной длиной и минимальный бокс free
+    overhead = 16
+    min_padding = 8
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def _header(self, frame_size, mdat_offset):
+        spec = self.spec
+        frames = spec.frames
+        movie_duration = round(frames * 1000 / spec.fps)
+        ftyp = _box(b"ftyp", b"isom", struct.pack(">I", 512), b"isomiso2avc1mp41")
+        mvhd = _full_box(
+            b"mvhd", 0, 0,
+            struct.pack(">IIII", 0, 0, 1000, movie_duration),
+            struct.pack(">IH10x", 0x10000, 0x100), _MATRIX, bytes(24), struct.pack(">I", 2),
+        )
+        tkhd = _full_box(
+            b"tkhd", 0, 3,
+            struct.pack(">IIIII8xHHHH", 0, 0, 1, 0, movie_duration, 0, 0, 0, 0), _MATRIX,
+            struct.pack(">II", spec.width << 16, spec.height << 16),
+        )
+        mdhd = _full_box(b"mdhd", 0, 0, struct.pack(">IIIIHH", 0, 0, spec.fps, frames, 0x55C4, 0))
+        hdlr = _full_box(b"hdlr", 0, 0, bytes(4), b"vide", bytes(12), b"VideoHandler\x00")
+        vmhd = _full_box(b"vmhd", 0, 1, bytes(8))
+        dinf = _box(b"dinf", _full_box(b"dref", 0, 0, struct.pack(">I", 1), _full_box(b"url ", 0, 1)))
+        avc1 = _box(
+            b"avc1", bytes(6), struct.pack(">H", 1), bytes(16),
+            struct.pack(">HHIIIH", spec.width, spec.height, 0x480000, 0x480000, 0, 1),
+            bytes(32), struct.pack(">Hh", 0x18, -1),
+        )
+        stbl = _box(
+            b"stbl",
+            _full_box(b"stsd", 0, 0, struct.pack(">I", 1), avc1),
+            _full_box(b"stts", 0, 0, struct.pack(">III", 1, frames, 1)),
+            _full_box(b"stsc", 0, 0, struct.pack(">IIII", 1, 1, frames, 1)),
+            _full_box(b"stsz", 0, 0, struct.pack(">II", frame_size, frames)),
+            _full_box(b"stco", 0, 0, struct.pack(">II", 1, mdat_offset + 16)),
+        )
+        minf = _box(b"minf", vmhd, dinf, stbl)
+        moov = _box(b"moov", mvhd, _box(b"trak", tkhd, _box(b"mdia", mdhd, hdlr, minf)))
+        return ftyp + moov
+
+    def layout(self, frame_size, padding):
+        """(байты до mdat, длина данных mdat). Ширина всех полей фиксирована."""
+        base = len(self._header(0, 0))
+        head = self._header(frame_size, base + padding)
+        if padding:
+            head += _box(b"free", bytes(padding - 8))
+        # mdat всегда с 64-битной длиной: файлы до нескольких гигабайт
+        head += struct.pack(">I4sQ", 1, b"mdat", 16 + self.spec.frames * frame_size)
+        return head, self.spec.frames * frame_size
+
+    def base_size(self):
+        return len(self._header(0, 0)) + self.overhead
+
+
+# --- WebM (Matroska) ---
+
+def _ebml(element_id, payload=b"", size=None):
+    """Элемент EBML с 8-байтной длиной: размер заголовка не зависит от содержимого."""
+    size = len(payload) if size is None else size
+    return element_id + b"\x01" + size.to_bytes(7, "big") + payload
+
+
+def _uint(element_id, value, width=8):
+    return _ebml(element_id, value.to_bytes(width, "big"))
+
+
+class _WebM:
+    """EBML-заголовок, Segment с Info, Tracks и кластером на каждую секунду кадров."""
+
+    # ID + длина SimpleBlock, номер дорожки, смещение времени, флаги
+    frame_overhead = 9 + 4
+    # ID + длина Cluster и элемент Timecode
+    cluster_overhead = 12 + 17
+    min_padding = 9
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def _clusters(self):
+        """(время кластера в мс, число кадров) для каждого кластера."""
+        spec = self.spec
+        clusters = []
+        for first in range(0, spec.frames, spec.fps):
+            clusters.append((first * 1000 // spec.fps, min(spec.fps, spec.frames - first)))
+        return clusters
+
+    def _head(self):
+        spec = self.spec
+        header = _ebml(b"\x1a\x45\xdf\xa3", b"".join((
+            _uint(b"\x42\x86", 1, 1), _uint(b"\x42\xf7", 1, 1), _uint(b"\x42\xf2", 4, 1),
+            _uint(b"\x42\xf3", 8, 1), _ebml(b"\x42\x82", b"webm"),
+            _uint(b"\x42\x87", 2, 1), _uint(b"\x42\x85", 2, 1),
+        )))
+        info = _ebml(b"\x15\x49\xa9\x66", b"".join((
+            _uint(b"\x2a\xd7\xb1", 1_000_000, 4),
+            _ebml(b"\x44\x89", struct.pack(">d", spec.frames * 1000 / spec.fps)),
+            _ebml(b"\x4d\x80", b"voicecover-api-tests"), _ebml(b"\x57\x41", b"voicecover-api-tests"),
+        )))
+        track = _ebml(b"\xae", b"".join((
+            _uint(b"\xd7", 1, 1), _uint(b"\x73\xc5", 1), _uint(b"\x83", 1, 1), _ebml(b"\x86", b"V_VP8"),
+            _ebml(b"\xe0", _uint(b"\xb0", spec.width, 2) + _uint(b"\xba", spec.height, 2)),
+        )))
+        return header, info + _ebml(b"\x16\x54\xae\x6b", track)
+
+    def base_size(self):
+        header, segment_head = self._head()
+        clusters = self._clusters()
+        return (len(header) + 12 + len(segment_head) + len(clusters) * self.cluster_overhead
+                + self.spec.frames * self.frame_overhead)
+
+    def chunks(self, frame_size, padding, noise):
+        header, segment_head = self._head()
+        clusters = self._clusters()
+        segment_size = (len(segment_head) + len(clusters) * self.cluster_overhead
+                        + self.spec.frames * (self.frame_overhead + frame_size) + padding)
+        yield header + _ebml(b"\x18\x53\x80\x67", size=segment_size) + segment_head
+        for timecode, count in clusters:
+            cluster_size = 17 + count * (self.frame_overhead + frame_size)
+            yield _ebml(b"\x1f\x43\xb6\x75", size=cluster_size) + _uint(b"\xe7", timecode)
+            for index in range(count):
+                relative = index * 1000 // self.spec.fps
+                yield _ebml(b"\xa3", size=4 + frame_size) + struct.pack(">BhB", 0x81, relative, 0x80)
+                yield from _payload(noise, frame_size)
+        if padding:
+            yield _ebml(b"\xec", bytes(padding - 9))
+
+
+def _pdf(size):
+    """Одностраничный PDF; до size добивается комментариями перед xref."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>",
+    ]
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    xref += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    tail_template = b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%%010d\n%%%%EOF\n" % (len(objects) + 1)
+    filler = max(0, (size or 0) - len(body) - len(xref) - len(tail_template % 0))
+    if filler:
+        body += b"%" + b"0" * (filler - 2) + b"\n" if filler >= 2 else b"\n"
+    return body + xref + tail_template % len(body)
+
+
+def _frame_layout(writer, spec):
+    """(размер кадра, размер заполнителя): по битрейту или точно под spec.size."""
+    frames = spec.frames
+    if spec.size is None:
+        return max(1, round(spec.bitrate / 8 / spec.fps)), 0
+    available = spec.size - writer.base_size() - writer.min_padding
+    if available < 0:
+        raise ValueError(f"{spec}: размер меньше минимального {writer.base_size()} байт")
+    frame_size = available // frames
+    return frame_size, spec.size - writer.base_size() - frames * frame_size
+
+
+def _valid_chunks(spec):
+    if spec.container == "pdf":
+        yield _pdf(spec.size)
+        return
+    noise = _noise(spec.seed)
+    if spec.container == "mp4":
+        writer = _Mp4(spec)
+        frame_size, padding = _frame_layout(writer, spec)
+        head, length = writer.layout(frame_size, padding)
+        yield head
+        yield from _payload(noise, length)
+    else:
+        writer = _WebM(spec)
+        frame_size, padding = _frame_layout(writer, spec)
+        yield from writer.chunks(frame_size, padding, noise)
+
+
+def expected_size(spec):
+    """Размер файла, который даст spec, без генерации."""
+    if spec.container == "pdf":
+        full = len(_pdf(spec.size))
+    else:
+        writer = _Mp4(spec) if spec.container == "mp4" else _WebM(spec)
+        frame_size, padding = _frame_layout(writer, spec)
+        full = writer.base_size() + spec.frames * frame_size + padding
+    return int(full * spec.truncate) if spec.variant == "truncated" else full
+
+
+def stream(spec):
+    """
+    Лениво отдаёт содержимое файла кусками: в памяти только заголовок
+    контейнера и блок шума NOISE_SIZE, независимо от размера файла.
+    """
+    limit = expected_size(spec) if spec.variant == "truncated" else None
+    written = 0
+    for chunk in _valid_chunks(spec):
+        chunk = bytes(chunk)
+        if spec.variant == "corrupt" and written == 0:
+            chunk = bytes(min(16, len(chunk))) + chunk[16:]
+        if limit is not None:
+            chunk = chunk[:limit - written]
+        if chunk:
+            yield chunk
+            written += len(chunk)
+        if limit is not None and written >= limit:
+            return
+
+
+def cache_dir():
+    return os.getenv("MEDIA_CACHE_DIR") or DEFAULT_CACHE_DIR
+
+
+def path(spec):
+    """
+    Путь к файлу spec в кэше. Файл генерируется при первом обращении;
+    воркеры xdist ждут друг друга на блокировке, а запись идёт во временный
+    файл и переименовывается, так что недописанный файл никто не увидит.
+    """
+    directory = cache_dir()
+    name = f"{spec.container}-{spec.variant}-{spec.key()}{spec.extension}"
+    file_path = os.path.join(directory, name)
+    if os.path.exists(file_path):
+        return file_path
+    with file_lock(os.path.join(directory, name + ".lock")):
+        if not os.path.exists(file_path):
+            partial = f"{file_path}.{uuid.uuid4().hex}.part"
+            try:
+                with open(partial, "wb") as f:
+                    for chunk in stream(spec):
+                        f.write(chunk)
+                os.replace(partial, file_path)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+    return file_path
@@ -0,0 +1,159 @@
+import contextvars
+import json
+import os
+import queue
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+from api import session as http_session
+from utils.attach import body_size
+
+# Сегменты пути, которые заменяются шаблоном: числа, UUID и длинные hex-идентификаторы, email
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,})$")
+
+# Коллекции API и их постоянные подпути: любой другой сегмент после коллекции —
+# идентификатор, даже если он не похож на число или UUID (/translate/abc/rusub/)
+_COLLECTIONS = {
+    "translate": {"upload", "count"},
+    "upload": {"session"},
+    "user": {"me", "count", "transactions", "create_payment"},
+    "transactions": {"count"},
+    "transaction": set(),
+}
+
+# Тест, от имени которого идут вызовы. Отметку ставит хук pytest (set_current_test);
+# новые потоки контекст не наследуют, поэтому вызовы фоновых потоков (пул
+# пользователей, очередь удаления) записываются без теста. Потоки, которые
+# запускает сам тест, должны передавать контекст явно (contextvars.copy_context)
+_current_test = contextvars.ContextVar("current_test", default=None)
+
+
+def path_template(url):
+    """/translate/123/setting/ -> /translate/{id}/setting (query-строка и завершающий слэш отбрасываются)."""
+    segments = []
+    previous = None
+    for segment in urlsplit(url).path.rstrip("/").split("/"):
+        original = segment
+        if _ID_SEGMENT.match(segment):
+            segment = "{id}"
+        elif "@" in segment:
+            segment = "{email}"
+        elif segment and previous in _COLLECTIONS and segment not in _COLLECTIONS[previous]:
+            segment = "{id}"
+        segments.append(segment)
+        previous = original
+    return "/".join(segments) or "/"
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+def set_current_test(nodeid):
+    """Отмечает вызовы текущего контекста тестом nodeid; возвращает токен для reset_current_test."""
+    return _current_test.set(nodeid)
+
+
+def reset_current_test(token):
+    _current_test.reset(token)
+
+
+def current_test():
+    return _current_test.get()
+
+
+class TrafficRecorder:
+    """
+    Пишет по строке JSON на каждый вызов в файл path (режим дозаписи).
+
+    record() только кладёт словарь в очередь; сериализация и запись идут
+    в фоновом потоке пачками: на диск строки сбрасываются, когда их набралось
+    batch_size или прошло flush_interval секунд.
+    """
+
+    def __init__(self, path, batch_size=256, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = object()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="traffic-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, response):
+        request = response.request
+        timings = getattr(response, "timings", None) or {}
+        bytes_out = request.headers.get("Content-Length")
+        if bytes_out is None:
+            bytes_out = len(request.body) if isinstance(request.body, (str, bytes)) else 0
+        self._queue.put({
+            "ts": time.time(),
+            "test": current_test(),
+            "method": request.method,
+            "path": path_template(request.url),
+            "status": response.status_code,
+            "bytes_out": int(bytes_out),
+            "bytes_in": body_size(response),
+            "dns_ms": _ms(timings.get("dns")),
+            "connect_ms": _ms(timings.get("connect")),
+            "ttfb_ms": _ms(timings.get("ttfb", response.elapsed.total_seconds())),
+            "total_ms": _ms(timings.get("total")),
+        })
+
+    def _run(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    item = None
+                if item is not None and item is not self._closed:
+                    batch.append(json.dumps(item, ensure_ascii=False))
+                expired = time.monotonic() >= deadline
+                if batch and (len(batch) >= self.batch_size or expired or item is self._closed):
+                    # Одна запись на пачку: строки воркеров xdist в общем файле не перемешиваются
+                    f.write("\n".join(batch) + "\n")
+                    f.flush()
+                    self.recorded += len(batch)
+                    batch = []
+                if expired:
+                    deadline = time.monotonic() + self.flush_interval
+                if item is self._closed:
+                    return
+
+    def close(self):
+        self._queue.put(self._closed)
+        self._thread.join()
+
+
+_recorder = None
+
+
+def start(path):
+    """Включает запись трафика в path; повторный вызов возвращает уже работающий рекордер."""
+    global _recorder
+    if _recorder is None:
+        http_session.enable_timings()
+        _recorder = TrafficRecorder(path)
+    return _recorder
+
+
+def stop():
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+        http_session.enable_timings(False)
+
+
+def record(response):
+    recorder = _recorder
+    if recorder is not None:
+        recorder.record(response)
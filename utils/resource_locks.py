@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+
+from utils.locks import file_lock
+
+MODES = ("read", "write")
+
+# Сколько тестов брали блокировки и сколько секунд суммарно ждали их в этом процессе
+stats = {"tests": 0, "waited": 0.0}
+
+
+def _locks_dir():
+    # Блокировки нужны только между воркерами pytest-xdist одного запуска
+    run_id = os.getenv("PYTEST_XDIST_TESTRUNUID")
+    if not run_id:
+        return None
+    return os.path.join(tempfile.gettempdir(), f"voicecover-locks-{run_id}")
+
+
+def resolve(resource):
+    """
+    Имя ресурса вида "вид:ИМЯ". Если ИМЯ — переменная окружения
+    (EMPTY_BALANCE_USER_EMAIL, TRANSLATION_ID), подставляется её значение,
+    чтобы разные имена одного аккаунта или перевода давали одну блокировку.
+    """
+    kind, sep, name = resource.partition(":")
+    if not sep or not kind or not name:
+        raise ValueError(f"Ресурс должен иметь вид 'вид:имя', получено: {resource!r}")
+    return f"{kind}:{os.getenv(name) or name}"
+
+
+def requirements(markers):
+    """
+    Ресурсы из маркеров uses: {ресурс: режим}. Если один ресурс заявлен
+    и на чтение, и на запись, остаётся запись.
+    """
+    required = {}
+    for marker in markers:
+        mode = marker.kwargs.get("mode", "read")
+        if mode not in MODES:
+            raise ValueError(f"Режим ресурса должен быть read или write, получено: {mode!r}")
+        for resource in marker.args:
+            key = resolve(resource)
+            if required.get(key) != "write":
+                required[key] = mode
+    return required
+
+
+def _lock_path(directory, resource):
+    digest = hashlib.sha256(resource.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(directory, f"{digest}.lock")
+
+
+@contextmanager
+def hold(required):
+    """
+    Держит блокировки ресурсов: на чтение — разделяемую, на запись —
+    эксклюзивную. Берутся в порядке имён, поэтому тесты с пересекающимися
+    наборами ресурсов не блокируют друг друга взаимно. Вне xdist ничего
+    не делает.
+    """
+    directory = _locks_dir()
+    if directory is None or not required:
+        yield
+        return
+
+    started = time.monotonic()
+    with ExitStack() as stack:
+        for resource in sorted(required):
+            stack.enter_context(file_lock(_lock_path(directory, resource), shared=required[resource] == "read"))
+        stats["tests"] += 1
+        stats["waited"] += time.monotonic() - started
+        yield
+
+
+def merge(other):
+    """Добавляет статистику ожидания воркера xdist."""
+    stats["tests"] += other.get("tests", 0)
+    stats["waited"] += other.get("waited", 0.0)
@@ -0,0 +1,122 @@
+import json
+import os
+import re
+from fnmatch import fnmatchcase
+
+# Бюджеты по умолчанию: slo.json в корне репозитория
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "slo.json")
+
+_PERCENTILE_KEY = re.compile(r"^p(\d+(?:\.\d+)?)_ms$")
+# Сколько самых медленных замеров показывать в сообщении о нарушении
+SHOWN_SAMPLES = 10
+
+
+def normalize(endpoint):
+    """"GET /translate/{id}/status/" -> "GET /translate/{id}/status": эндпоинты замеров идут без завершающего слэша."""
+    method, _, path = endpoint.partition(" ")
+    return f"{method} {path.rstrip('/') or '/'}" if path else endpoint
+
+
+def load_budgets(path=None):
+    """
+    Читает файл бюджетов:
+    {"default": {"p95_ms": ...}, "endpoints": {"GET /translate/{id}/status": {"p95_ms": 300}}}.
+    Ключи endpoints — точные эндпоинты или шаблоны fnmatch ("* /auth/*"), завершающий слэш не важен.
+    """
+    path = path or os.getenv("SLO_CONFIG") or DEFAULT_CONFIG
+    if not os.path.exists(path):
+        return {"default": {}, "endpoints": {}}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    endpoints = {normalize(endpoint): budget for endpoint, budget in data.get("endpoints", {}).items()}
+    return {"default": data.get("default", {}), "endpoints": endpoints}
+
+
+def budget_for(endpoint, budgets):
+    """Бюджет эндпоинта: default, поверх него точное совпадение или первый подходящий шаблон."""
+    budget = dict(budgets["default"])
+    endpoints = budgets["endpoints"]
+    if endpoint in endpoints:
+        budget.update(endpoints[endpoint])
+    else:
+        for pattern, override in endpoints.items():
+            if fnmatchcase(endpoint, pattern):
+                budget.update(override)
+                break
+    return budget
+
+
+def percentile(values, percent):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def _limits(budget):
+    limits = []
+    for key, limit in budget.items():
+        match = _PERCENTILE_KEY.match(key)
+        if match:
+            limits.append((f"p{match.group(1)}", float(match.group(1)), limit))
+        elif key == "max_ms":
+            limits.append(("max", 100, limit))
+        else:
+            raise ValueError(f"Неизвестный параметр SLO: {key} (ожидаются pNN_ms и max_ms)")
+    return limits
+
+
+def _format_samples(samples, threshold):
+    offending = sorted((s for s in samples if s.ms > threshold), key=lambda s: s.ms, reverse=True)
+    lines = [f"    {s.ms:9.1f} мс  {s.status}  {s.url}" for s in offending[:SHOWN_SAMPLES]]
+    if len(offending) > SHOWN_SAMPLES:
+        lines.append(f"    ... и ещё {len(offending) - SHOWN_SAMPLES}")
+    return lines
+
+
+def check(endpoint, samples, budget):
+    """Текст нарушения бюджета для замеров одного эндпоинта или None."""
+    values = [s.ms for s in samples]
+    violations = []
+    for name, percent, limit in _limits(budget):
+        actual = percentile(values, percent)
+        if actual > limit:
+            violations.append((name, actual, limit))
+    if not violations:
+        return None
+
+    lines = [f"SLO нарушено: {endpoint} (замеров: {len(samples)})"]
+    lines += [f"  {name} {actual:.1f} мс > {limit} мс" for name, actual, limit in violations]
+    lines.append("  Замеры сверх бюджета:")
+    lines += _format_samples(samples, min(limit for _, _, limit in violations))
+    return "\n".join(lines)
+
+
+def evaluate(markers, samples, budgets):
+    """
+    Проверяет замеры теста по его маркерам slo. Маркер без endpoint проверяет
+    все вызванные эндпоинты по бюджетам из файла; с endpoint (точным или
+    шаблоном fnmatch) — только подходящие вызовы, а параметры маркера
+    (p95_ms=..., max_ms=...) перекрывают бюджет из файла.
+    Возвращает текст нарушений или None.
+    """
+    by_endpoint = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+
+    failures = []
+    for marker in markers:
+        kwargs = {key: value for key, value in marker.kwargs.items() if value is not None}
+        pattern = kwargs.pop("endpoint", None) or (marker.args[0] if marker.args else None)
+        if pattern is not None:
+            pattern = normalize(pattern)
+        matched = {e: s for e, s in by_endpoint.items() if pattern is None or fnmatchcase(e, pattern)}
+        if pattern is not None and not matched:
+            failures.append(f"SLO: тест не вызывал {pattern}")
+            continue
+        for endpoint, endpoint_samples in matched.items():
+            budget = dict(budget_for(endpoint, budgets), **kwargs)
+            failure = check(endpoint, endpoint_samples, budget)
+            if failure:
+                failures.append(failure)
+    return "\n\n".join(failures) if failures else None
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api import requests
+from utils.token_cache import admin_token
+
+# Статусы, при которых удаление стоит повторить: перегрузка и ошибки сервера
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+DELETED_STATUSES = {200, 204, 404}
+
+# Итоги всех очередей процесса: удалено, повторов, утечки (словари Leak.to_dict())
+stats = {"deleted": 0, "retries": 0, "leaks": []}
+
+
+class Leak:
+    """Сущность, которую не удалось удалить после всех попыток."""
+
+    def __init__(self, kind, entity_id, reason):
+        self.kind = kind
+        self.entity_id = entity_id
+        self.reason = reason
+
+    def to_dict(self):
+        return {"kind": self.kind, "id": self.entity_id, "reason": self.reason}
+
+    def __str__(self):
+        return f"{self.kind} {self.entity_id}: {self.reason}"
+
+
+class TeardownQueue:
+    """
+    Отложенное удаление пользователей и переводов. Тесты только ставят
+    сущности в очередь, а flush() после тестов удаляет их параллельно
+    (workers потоков): сначала переводы, затем пользователей. Временные
+    ошибки (сеть, 429, 5xx) повторяются до attempts раз с экспоненциальной
+    паузой; всё, что удалить не удалось, возвращает flush() и копит stats.
+    """
+
+    def __init__(self, base_url, workers=8, attempts=3, backoff=0.5):
+        self.base_url = base_url
+        self.workers = workers
+        self.attempts = attempts
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._users = []
+        self._translations = []
+
+    def add_user(self, user_id):
+        with self._lock:
+            if user_id not in self._users:
+                self._users.append(user_id)
+
+    def add_translation(self, translation_id, access_token):
+        with self._lock:
+            if all(queued != translation_id for queued, _ in self._translations):
+                self._translations.append((translation_id, access_token))
+
+    def _admin_headers(self):
+        return {"Authorization": f"Bearer {admin_token(self.base_url)}", "accept": "application/json"}
+
+    def _delete_user_once(self, user_id):
+        return requests.delete_request(f"{self.base_url}/user/{user_id}", headers=self._admin_headers())
+
+    def _delete_translation_once(self, translation_id, access_token):
+        # Владелец мог быть уже удалён — тогда перевод удаляет администратор
+        response = requests.delete_request(
+            f"{self.base_url}/translate/{translation_id}",
+            headers={"Authorization": f"Bearer {access_token}", "accept": "application/json"}
+        )
+        if response.status_code in (401, 403):
+            response = requests.delete_request(
+                f"{self.base_url}/translate/{translation_id}", headers=self._admin_headers()
+            )
+        return response
+
+    def _with_retries(self, delete, *args):
+        """Возвращает None при успехе или причину неудачи."""
+        reason = None
+        for attempt in range(self.attempts):
+            if attempt:
+                with self._lock:
+                    stats["retries"] += 1
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = delete(*args)
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+                continue
+            if response.status_code in DELETED_STATUSES:
+                with self._lock:
+                    stats["deleted"] += 1
+                return None
+            reason = f"{response.status_code}, {response.text[:200]}"
+            if response.status_code not in TRANSIENT_STATUSES:
+                break
+        return reason
+
+    def delete_user_now(self, user_id):
+        """Удаляет пользователя сразу, для тестов, которые проверяют само удаление."""
+        reason = self._with_retries(self._delete_user_once, user_id)
+        if reason is not None:
+            raise Exception(f"Ошибка при удалении пользователя: {reason}")
+
+    def flush(self):
+        """Удаляет всё накопленное и возвращает новые утечки."""
+        with self._lock:
+            translations, self._translations = self._translations, []
+            users, self._users = self._users, []
+        leaks = []
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="teardown") as executor:
+            # Переводы раньше пользователей: пока владелец существует, хватает его токена
+            for kind, delete, batch in (
+                ("перевод", self._delete_translation_once, translations),
+                ("пользователь", self._delete_user_once, [(user_id,) for user_id in users]),
+            ):
+                reasons = executor.map(lambda args, delete=delete: self._with_retries(delete, *args), batch)
+                for args, reason in zip(batch, reasons):
+                    if reason is not None:
+                        leaks.append(Leak(kind, args[0], reason))
+        for leak in leaks:
+            logging.error(f"[ERROR] Не удалось удалить: {leak}")
+        stats["leaks"] += [leak.to_dict() for leak in leaks]
+        return leaks
+
+
+def merge(other):
+    """Добавляет итоги воркера xdist."""
+    stats["deleted"] += other.get("deleted", 0)
+    stats["retries"] += other.get("retries", 0)
+    stats["leaks"] += other.get("leaks", [])
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+from api import requests
+from utils.locks import file_lock
+
+# За сколько секунд до истечения access_token обновлять его
+REFRESH_MARGIN = int(os.getenv("TOKEN_REFRESH_MARGIN") or 60)
+# Срок жизни токена, если API не вернул access_token_expired_at
+DEFAULT_TTL = 300
+
+
+def _parse_expiry(value):
+    if not value:
+        return time.time() + DEFAULT_TTL
+    expiry = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return expiry.timestamp()
+
+
+def _shared_dir():
+    # Под pytest-xdist все воркеры одного запуска делят кэш на диске
+    run_id = os.getenv("PYTEST_XDIST_TESTRUNUID")
+    if not run_id:
+        return None
+    return os.path.join(tempfile.gettempdir(), f"voicecover-tokens-{run_id}")
+
+
+def _prepare_shared_dir(path):
+    """
+    Каталог общего кэша с правами 0700. Если он чужой или доступен другим
+    пользователям (общий /tmp на CI), токены на диск не пишутся.
+    """
+    if not path:
+        return None
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    stat = os.stat(path)
+    if hasattr(os, "getuid") and stat.st_uid != os.getuid():
+        logging.warning(f"[WARNING] Каталог {path} принадлежит другому пользователю, кэш токенов не общий")
+        return None
+    if stat.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+class TokenCache:
+    """
+    Кэш токенов по email: хранит access/refresh токены и время истечения,
+    незадолго до истечения обновляет их через /auth/update_token и только
+    при неудачном обновлении заново выполняет /auth/signin.
+    """
+
+    def __init__(self, base_url, shared_dir=None):
+        self.base_url = base_url
+        self.shared_dir = shared_dir
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self.stats = {"hits": 0, "refreshes": 0, "signins": 0}
+
+    def _shared_path(self, email):
+        digest = hashlib.sha256(f"{self.base_url}|{email}".encode()).hexdigest()[:16]
+        return os.path.join(self.shared_dir, f"{digest}.json")
+
+    def _load_shared(self, email):
+        try:
+            with open(self._shared_path(email)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store_shared(self, email, entry):
+        # В файле живые токены: читать его может только владелец
+        path = self._shared_path(email)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _is_fresh(entry):
+        return entry is not None and entry["expires_at"] - REFRESH_MARGIN > time.time()
+
+    @staticmethod
+    def _entry(response_data):
+        return {
+            "user_id": response_data["user"]["id"],
+            "access_token": response_data["access_token"],
+            "refresh_token": response_data["refresh_token"],
+            "expires_at": _parse_expiry(response_data.get("access_token_expired_at")),
+        }
+
+    def _refresh(self, entry):
+        headers = {"Authorization": f"Bearer {entry['refresh_token']}"}
+        response = requests.post_request(f"{self.base_url}/auth/update_token", headers=headers)
+        if response.status_code != 200:
+            return None
+        self.stats["refreshes"] += 1
+        return self._entry(response.json())
+
+    def _signin(self, email, password):
+        payload = {"username": email, "password": password}
+        response = requests.post_request(f"{self.base_url}/auth/signin", data=payload)
+        if response.status_code != 200:
+            raise Exception(f"Ошибка авторизации {email}: {response.status_code}, {response.text}")
+        self.stats["signins"] += 1
+        return self._entry(response.json())
+
+    def _obtain(self, email, password, entry):
+        if entry is not None:
+            refreshed = self._refresh(entry)
+            if refreshed is not None:
+                return refreshed
+        return self._signin(email, password)
+
+    def get(self, email, password):
+        """
+        Возвращает словарь с user_id, access_token и refresh_token для email.
+        """
+        with self._lock:
+            entry = self._tokens.get(email)
+            if self._is_fresh(entry):
+                self.stats["hits"] += 1
+                return entry
+
+            if self.shared_dir is None:
+                entry = self._obtain(email, password, entry)
+            else:
+                with file_lock(self._shared_path(email) + ".lock"):
+                    shared = self._load_shared(email)
+                    if self._is_fresh(shared):
+                        self.stats["hits"] += 1
+                        entry = shared
+                    else:
+                        entry = self._obtain(email, password, shared or entry)
+                        self._store_shared(email, entry)
+
+            self._tokens[email] = entry
+            return entry
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(base_url):
+    with _caches_lock:
+        cache = _caches.get(base_url)
+        if cache is None:
+            shared_dir = _prepare_shared_dir(_shared_dir())
+            cache = _caches[base_url] = TokenCache(base_url, shared_dir)
+        return cache
+
+
+def get_token(base_url, email, password):
+    return get_cache(base_url).get(email, password)
+
+
+def admin_token(base_url):
+    """access_token постоянного администратора ADMIN_EMAIL."""
+    return get_token(base_url, os.getenv("ADMIN_EMAIL"), os.getenv("ADMIN_PASSWORD"))["access_token"]
+
+
+def cache_stats():
+    totals = {"hits": 0, "refreshes": 0, "signins": 0}
+    for cache in list(_caches.values()):
+        for key, value in cache.stats.items():
+            totals[key] += value
+    return totals
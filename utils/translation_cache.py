@@ -0,0 +1,146 @@
+import copy
+import hashlib
+import logging
+import os
+import threading
+
+from api import requests
+from utils.token_cache import admin_token
+
+# Итоги процесса: загрузки оригиналов, копии и выдачи общего оригинала
+stats = {"uploads": 0, "copies": 0, "reused": 0}
+
+
+def file_digest(file_path, chunk_size=1024 * 1024):
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class TranslationCache:
+    """
+    Кэш загруженных переводов: файл загружается один раз на пользователя
+    и содержимое (sha256), дальше тесты получают либо сам нетронутый оригинал
+    (аренда только на чтение), либо его копию через /translate/{id}/copy/
+    (аренда на изменение). Копия нового оригинала — тот же перевод, что после
+    загрузки: настройки по умолчанию, то же видео, без субтитров и оценки.
+    Оригиналы и не удалённые тестами копии удаляются в close().
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._user_ids = {}
+        self._digests = {}
+        self._originals = {}
+        self._original_ids = {}
+        self._copies = {}
+
+    @staticmethod
+    def _headers(access_token):
+        return {
+            "Authorization": f"Bearer {access_token}",
+            "accept": "application/json"
+        }
+
+    def _user_id(self, access_token):
+        if access_token not in self._user_ids:
+            response = requests.get_request(f"{self.base_url}/user/me/", headers=self._headers(access_token))
+            assert response.status_code == 200, (
+                f"Не удалось получить текущего пользователя: {response.status_code}, {response.text}"
+            )
+            self._user_ids[access_token] = response.json()["id"]
+        return self._user_ids[access_token]
+
+    def _digest(self, file_path):
+        stat = os.stat(file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._digests:
+            self._digests[key] = file_digest(file_path)
+        return self._digests[key]
+
+    def _upload(self, access_token, file_path):
+        with open(file_path, "rb") as f:
+            files = {"upload": (os.path.basename(file_path), f, "video/mp4")}
+            response = requests.post_request(
+                f"{self.base_url}/translate/upload/",
+                headers=self._headers(access_token),
+                files=files
+            )
+        assert response.status_code == 200, (
+            f"Ошибка при загрузке видео: {response.status_code}, {response.text}"
+        )
+        stats["uploads"] += 1
+        return response.json()
+
+    def _original(self, access_token, file_path):
+        with self._lock:
+            key = (self._user_id(access_token), self._digest(file_path))
+            original = self._originals.get(key)
+            if original is None:
+                original = self._upload(access_token, file_path)
+                self._originals[key] = original
+            self._original_ids[original["id"]] = access_token
+            return original
+
+    def lease(self, access_token, file_path, readonly=False):
+        """
+        Возвращает перевод для файла. readonly=True отдаёт общий оригинал,
+        который нельзя изменять и удалять; иначе создаётся собственная копия.
+        """
+        original = self._original(access_token, file_path)
+        if readonly:
+            with self._lock:
+                stats["reused"] += 1
+            return copy.deepcopy(original)
+
+        response = requests.post_request(
+            f"{self.base_url}/translate/{original['id']}/copy/",
+            headers=self._headers(access_token)
+        )
+        assert response.status_code == 200, (
+            f"Ошибка при копировании перевода: {response.status_code}, {response.text}"
+        )
+        translation = response.json()
+        with self._lock:
+            self._copies[translation["id"]] = access_token
+            stats["copies"] += 1
+        return translation
+
+    def is_original(self, translation_id):
+        return int(translation_id) in self._original_ids
+
+    def release(self, translation_id):
+        """
+        Снимает копию с учёта и возвращает токен её владельца; None — если это
+        не копия из кэша или она уже снята.
+        """
+        with self._lock:
+            return self._copies.pop(int(translation_id), None)
+
+    def _delete(self, translation_id, access_token):
+        for token in (access_token, admin_token(self.base_url)):
+            response = requests.delete_request(
+                f"{self.base_url}/translate/{translation_id}",
+                headers=self._headers(token)
+            )
+            if response.status_code in [200, 204, 404]:
+                return
+        logging.error(f"[ERROR] Не удалось удалить перевод {translation_id}: {response.status_code}")
+
+    def close(self):
+        with self._lock:
+            leftovers = list(self._copies.items()) + list(self._original_ids.items())
+            self._copies = {}
+            self._original_ids = {}
+            self._originals = {}
+        for translation_id, access_token in leftovers:
+            self._delete(translation_id, access_token)
+
+
+def merge(other):
+    """Добавляет итоги воркера xdist."""
+    for key, value in other.items():
+        stats[key] = stats.get(key, 0) + value
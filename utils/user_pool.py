@@ -0,0 +1,292 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+from api import requests
+from utils.token_cache import REFRESH_MARGIN, _parse_expiry, admin_token
+
+PASSWORD = "Password123!"
+
+# Поля, с которыми пользователь создаётся (как в create_user_with_login без пула)
+# и которые возвращаются перед повторной выдачей
+DEFAULT_PROFILE = {
+    "lastname": "Test",
+    "firstname": "User",
+    "role": "user",
+    "balance": 0,
+    "is_active": True,
+}
+# Поля, которые API сбрасывать не обязано: пользователь с изменёнными
+# значениями не возвращается в пул, а удаляется в close()
+CHECKED_FIELDS = ("phone", "telegram", "avatar")
+# Запросы, которые пользователя не меняют: чтение и выдача токенов
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+TOKEN_PATHS = ("/auth/signin", "/auth/update_token")
+# Изменения, которые не откатить: переводы, транзакции и платежи остаются в истории пользователя
+HISTORY_SEGMENTS = {"translate", "transaction", "create_payment"}
+
+
+class UserPool:
+    """
+    Пул заранее созданных временных пользователей.
+
+    Пользователи создаются фоновыми пакетами параллельно и выдаются тестам
+    через lease(). Пул наблюдает за ответами api.requests (observe): успешный
+    изменяющий запрос от имени выданного пользователя или о нём отмечает его
+    изменённым. Нетронутый пользователь после release() сразу возвращается
+    в пул с тем же токеном. Пользователь, которого удалили или у которого
+    появились переводы или транзакции, не возвращается. Остальные изменённые
+    в фоне приводятся к исходному состоянию и проверяются; если восстановить
+    пользователя нельзя (сменился пароль, заполнены phone, telegram или
+    avatar), он не возвращается. Невозвращённые пользователи ждут общего
+    удаления в close(), а пул пополняется новыми. Пока пользователь ждёт
+    в пуле, его access_token может истечь, поэтому lease() перед выдачей при
+    необходимости авторизуется заново.
+    """
+
+    def __init__(self, base_url, size=8, workers=8):
+        self.base_url = base_url
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="user-pool")
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._users = {}
+        self._expires = {}
+        self._leased = {}
+        # id выданного пользователя -> "reset" (сбросить профиль) или "drop" (не возвращать)
+        self._changed = {}
+        self._closed = False
+        requests.add_observer(self.observe)
+
+    def _admin_headers(self):
+        return {
+            "Authorization": f"Bearer {admin_token(self.base_url)}",
+            "accept": "application/json",
+            "Content-Type": "application/json",
+        }
+
+    def _signin(self, user):
+        response = requests.post_request(
+            f"{self.base_url}/auth/signin",
+            data={"username": user["email"], "password": PASSWORD}
+        )
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        with self._lock:
+            self._expires[user["id"]] = _parse_expiry(data.get("access_token_expired_at"))
+        return data["access_token"]
+
+    def _is_fresh(self, user):
+        with self._lock:
+            expires_at = self._expires.get(user["id"], 0)
+        return expires_at - REFRESH_MARGIN > time.time()
+
+    def _create(self):
+        email = f"user_{uuid.uuid4().hex}@test.com"
+        payload = dict(DEFAULT_PROFILE, email=email, password=PASSWORD)
+        response = requests.post_request(f"{self.base_url}/user/", json=payload, headers=self._admin_headers())
+        if response.status_code != 200:
+            raise Exception(f"Не удалось создать пользователя: {response.status_code}, {response.text}")
+        created = response.json()
+        user = {"id": created["id"], "email": email, "password": PASSWORD}
+        with self._lock:
+            self._users[user["id"]] = dict(user, initial={k: created.get(k) for k in CHECKED_FIELDS})
+
+        access_token = self._signin(user)
+        if access_token is None:
+            raise Exception(f"Не удалось авторизоваться новым пользователем {email}")
+        return dict(user, access_token=access_token)
+
+    def _fill(self):
+        try:
+            user = self._create()
+        except Exception as e:
+            logging.error(f"[ERROR] Пул пользователей: {e}")
+            user = e
+        finally:
+            with self._lock:
+                self._pending -= 1
+        self._ready.put(user)
+
+    def _schedule(self, count):
+        with self._lock:
+            if self._closed:
+                return
+            self._pending += count
+        for _ in range(count):
+            self._executor.submit(self._fill)
+
+    def warm(self):
+        """Запускает фоновое создание недостающих до size пользователей."""
+        with self._lock:
+            missing = self.size - self._ready.qsize() - self._pending
+        if missing > 0:
+            self._schedule(missing)
+
+    def lease(self, timeout=120):
+        """Выдаёт пользователя: словарь с id, email, password и access_token."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                starving = self._ready.empty() and self._pending == 0
+            if starving:
+                self._schedule(1)
+            user = self._ready.get(timeout=max(deadline - time.monotonic(), 0))
+            # Пополняем пул в фоне, пока тест работает с выданным пользователем
+            self.warm()
+            if isinstance(user, Exception):
+                raise user
+            if not self._is_fresh(user):
+                access_token = self._signin(user)
+                if access_token is None:
+                    # Пароль или статус изменили в обход пула — такой пользователь ждёт удаления в close()
+                    logging.error(f"[ERROR] Пул пользователей: не удалось авторизоваться {user['email']}")
+                    continue
+                user = dict(user, access_token=access_token)
+            with self._lock:
+                self._leased[user["id"]] = dict(user)
+            return user
+
+    def is_leased(self, user_id):
+        with self._lock:
+            return user_id in self._leased
+
+    def observe(self, response):
+        """
+        Наблюдатель ответов (api.requests.add_observer): отмечает выданного
+        пользователя изменённым, если тест отправил изменяющий запрос с его
+        токеном, с его id в пути (/user/{id}) или в поле user_id, с его email в теле.
+        Отклонённые запросы (4xx) ничего не меняли и не учитываются.
+        """
+        request = getattr(response, "request", None)
+        if request is None or request.method in SAFE_METHODS or 400 <= response.status_code < 500:
+            return
+        path = urlsplit(request.url).path.rstrip("/")
+        if path.endswith(TOKEN_PATHS):
+            return
+        with self._lock:
+            leased = list(self._leased.values())
+        if not leased:
+            return
+
+        authorization = request.headers.get("Authorization", "")
+        segments = path.split("/")
+        path_ids = {segments[i + 1] for i in range(len(segments) - 1) if segments[i] == "user"}
+        history = not HISTORY_SEGMENTS.isdisjoint(segments)
+        # Потоковое multipart-тело не читаем: загрузку выдаёт токен в заголовке
+        body = request.body if isinstance(request.body, (str, bytes)) else ""
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            data = None
+        body_id = data.get("user_id") if isinstance(data, dict) else None
+
+        for user in leased:
+            if (
+                authorization == f"Bearer {user['access_token']}"
+                or str(user["id"]) in path_ids
+                or body_id == user["id"]
+                or (body and (user["email"] in body or quote(user["email"]) in body))
+            ):
+                deleted = request.method == "DELETE" and str(user["id"]) in path_ids
+                with self._lock:
+                    if history or deleted:
+                        self._changed[user["id"]] = "drop"
+                    else:
+                        self._changed.setdefault(user["id"], "reset")
+
+    def release(self, user_id):
+        """Возвращает пользователя в пул. Повторный вызов ничего не делает."""
+        with self._lock:
+            user = self._leased.pop(user_id, None)
+            if user is None:
+                return
+            change = self._changed.pop(user_id, None)
+            if self._closed:
+                return
+            if self.size == 0:
+                # Пул отключён: пользователь удаляется сразу, как без пула
+                self._executor.submit(self._delete, self._users.pop(user_id)["id"])
+                return
+            if change is None:
+                # Тест пользователя не менял — проверять и сбрасывать нечего
+                self._ready.put(user)
+                return
+            if change == "reset":
+                self._pending += 1
+        if change == "reset":
+            self._executor.submit(self._recycle, self._users[user_id])
+        else:
+            # Историю не откатить: пользователь ждёт удаления в close(), вместо него создаётся новый
+            self.warm()
+
+    def _reset(self, user):
+        response = requests.patch_request(
+            f"{self.base_url}/user/{user['id']}",
+            json=DEFAULT_PROFILE,
+            headers=self._admin_headers()
+        )
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        if data.get("email") != user["email"] or any(data.get(k) != v for k, v in DEFAULT_PROFILE.items()):
+            return None
+        if any(data.get(k) != v for k, v in user["initial"].items()):
+            return None
+
+        access_token = self._signin(user)
+        if access_token is None:
+            return None
+
+        # Историю транзакций и переводы откатить нельзя — такой пользователь уже не «свежий»
+        headers = {"Authorization": f"Bearer {access_token}", "accept": "application/json"}
+        transactions = requests.get_request(f"{self.base_url}/user/transactions/", headers=headers)
+        if transactions.status_code != 200 or transactions.json():
+            return None
+        translations = requests.get_request(f"{self.base_url}/translate/count/?my=true", headers=headers)
+        if translations.status_code != 200 or translations.json():
+            return None
+        return {"id": user["id"], "email": user["email"], "password": user["password"], "access_token": access_token}
+
+    def _recycle(self, user):
+        try:
+            recycled = self._reset(user)
+        except Exception as e:
+            logging.error(f"[ERROR] Пул пользователей: не удалось вернуть {user['email']}: {e}")
+            recycled = None
+        with self._lock:
+            self._pending -= 1
+        if recycled is not None:
+            self._ready.put(recycled)
+        else:
+            self.warm()
+
+    def _delete(self, user_id):
+        response = requests.delete_request(f"{self.base_url}/user/{user_id}", headers=self._admin_headers())
+        if response.status_code not in [200, 204, 404]:
+            logging.error(f"[ERROR] Не удалось удалить пользователя {user_id}: {response.status_code}")
+
+    def close(self):
+        """Останавливает пополнение и параллельно удаляет всех созданных пользователей."""
+        with self._lock:
+            self._closed = True
+        requests.remove_observer(self.observe)
+        self._executor.shutdown(wait=True)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self._delete, list(self._users)))
+        self._users = {}
+
+
+def pool_size():
+    return int(os.getenv("USER_POOL_SIZE") or 8)